@@ -1,9 +1,25 @@
 """
 Django admin configuration for accounts app.
 """
+from itertools import islice
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from rest_framework.exceptions import ValidationError
+from raylene.pagination import EstimatedCountPaginator
+from .fields import blind_index
 from .models import User, Role, UserRole, ClientProfile, StaffProfile, AuditLog
+from .partitions import as_audit_logs, iter_archived
+from .views import datetime_param, parse_audit_filters, uuid_param
+
+ARCHIVE_FILTERS = ['entity_type', 'entity_id', 'actor', 'action', 'since', 'until']
+ARCHIVE_PAGE_SIZE = 100
+ARCHIVE_MAX_PAGE_SIZE = 1000
 
 
 @admin.register(User)
@@ -40,12 +56,21 @@ class ClientProfileAdmin(admin.ModelAdmin):
     """Admin interface for ClientProfile model."""
     list_display = ['first_name', 'last_name', 'email', 'phone', 'created_at']
     list_filter = ['created_at', 'nationality']
-    search_fields = ['first_name', 'last_name', 'user__email', 'phone']
+    # phone/passport_no are encrypted; passport numbers match through the blind index
+    search_fields = ['first_name', 'last_name', 'user__email']
     readonly_fields = ['id', 'created_at', 'updated_at']
+    exclude = ['passport_no_hash']
     
     def email(self, obj):
         return obj.user.email
     email.short_description = 'Email'
+    
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        digest = blind_index(search_term)
+        if digest:
+            results |= queryset.filter(passport_no_hash=digest)
+        return results, may_have_duplicates
 
 
 @admin.register(StaffProfile)
@@ -68,10 +93,79 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_filter = ['action', 'entity_type', 'created_at']
     search_fields = ['actor__email', 'entity_type']
     readonly_fields = ['id', 'created_at']
+    list_select_related = ['actor']
+    # Avoid COUNT(*) over the whole table on every changelist page.
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def has_add_permission(self, request):
         return False
     
     def has_change_permission(self, request, obj=None):
         return False
-
+    
+    def get_urls(self):
+        urls = [
+            path('archive/', self.admin_site.admin_view(self.archive_view),
+                 name='accounts_auditlog_archive'),
+        ]
+        return urls + super().get_urls()
+    
+    def archive_view(self, request):
+        """
+        Archived (cold) entries, newest first; linked from the changelist.
+        
+        Accepts the audit log API's entity_type, entity_id, actor, action,
+        since and until filters plus limit (at most 1000). ``before`` and
+        ``before_id`` continue after the last entry of the previous page.
+        ``format=json`` returns the entries as JSON. Invalid parameters are
+        answered with 400.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        params = request.GET
+        try:
+            filters = parse_audit_filters(params, require_subject=False)
+            limit = self._limit(params.get('limit'))
+            after = None
+            if params.get('before') or params.get('before_id'):
+                after = (datetime_param('before', params.get('before', '')),
+                         uuid_param('before_id', params.get('before_id', '')))
+        except ValidationError as exc:
+            if params.get('format') == 'json':
+                return JsonResponse({'errors': exc.detail}, status=400)
+            return HttpResponseBadRequest(
+                '; '.join(f'{name}: {error}' for name, error in exc.detail.items()),
+                content_type='text/plain',
+            )
+        entries = list(islice(iter_archived(**filters, after=after), limit + 1))
+        has_next, entries = len(entries) > limit, entries[:limit]
+        next_url = None
+        if has_next:
+            query = params.copy()
+            query['before'] = entries[-1]['created_at'].isoformat()
+            query['before_id'] = entries[-1]['id']
+            next_url = f'?{query.urlencode()}'
+        if params.get('format') == 'json':
+            return JsonResponse({'next': next_url, 'results': entries}, encoder=DjangoJSONEncoder)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Archived audit log entries',
+            'entries': as_audit_logs(entries),
+            'filters': {name: params.get(name, '') for name in ARCHIVE_FILTERS},
+            'next_url': next_url,
+        }
+        return TemplateResponse(request, 'admin/accounts/auditlog/archive.html', context)
+    
+    @staticmethod
+    def _limit(value):
+        if not value:
+            return ARCHIVE_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be a whole number.'})
+        if limit < 1:
+            raise ValidationError({'limit': 'Must be at least 1.'})
+        return min(limit, ARCHIVE_MAX_PAGE_SIZE)
@@ -2,11 +2,12 @@
 Admin-specific URLs (e.g., user management).
 """
 from django.urls import path
-from .views import MeView
+from .views import MeView, AuditLogListView, ClientImportView
 
 app_name = 'accounts_admin'
 
 urlpatterns = [
-    # Add admin-specific views here if needed
+    path('audit-logs/', AuditLogListView.as_view(), name='audit-logs'),
+    path('imports/clients/', ClientImportView.as_view(), name='import-clients'),
 ]
 
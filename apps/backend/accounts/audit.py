@@ -0,0 +1,148 @@
+"""
+Audit log sink.
+
+``record()`` queues ``AuditLog`` entries for the current transaction and
+writes them with a single ``bulk_create`` once it commits. Entries queued in
+a transaction (or savepoint) that rolls back are discarded with it. Outside
+an atomic block the entry is written immediately, as before.
+
+With ``AUDIT_LOG_ASYNC`` enabled the committed batch is handed to a Celery
+worker instead of being inserted on the request path. ``strict=True``
+writes the entry inside the current transaction, so it commits or rolls
+back together with the business change.
+"""
+import logging
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FIELDS = ('id', 'actor_id', 'action', 'entity_type', 'entity_id', 'meta',
+                'ip_address', 'user_agent', 'created_at')
+
+
+class _Batch(list):
+    """Entries queued for one transaction/savepoint; called on commit."""
+
+    def __init__(self, using):
+        super().__init__()
+        self.using = using
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        write_entries(list(self), using=self.using)
+
+
+# Per thread and database alias: {savepoint ids: weakref to the open batch}.
+# The ``on_commit`` registration holds the only strong reference to a
+# batch, so a rolled-back transaction or savepoint drops its batch and the
+# weak reference dies with it.
+_pending = threading.local()
+
+
+def build_entry(action, entity_type, entity_id, actor=None, meta=None, request=None):
+    """Build an unsaved ``AuditLog`` entry."""
+    ip_address = user_agent = None
+    if request is not None:
+        ip_address = request.META.get('REMOTE_ADDR')
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        if actor is None and getattr(request.user, 'is_authenticated', False):
+            actor = request.user
+    return AuditLog(
+        actor_id=getattr(actor, 'pk', actor),
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        meta=meta or {},
+        ip_address=ip_address,
+        user_agent=user_agent or '',
+    )
+
+
+def _current_batch(using):
+    connection = transaction.get_connection(using)
+    key = (using, tuple(connection.savepoint_ids))
+    batches = getattr(_pending, 'batches', None)
+    if batches is None:
+        batches = _pending.batches = {}
+    ref = batches.get(key)
+    batch = ref() if ref is not None else None
+    if batch is None or batch.flushed:
+        batch = _Batch(using)
+        batches[key] = weakref.ref(batch)
+        transaction.on_commit(batch, using=using)
+    # Forget batches of finished transactions and savepoints.
+    for stale in [k for k, r in batches.items() if r() is None]:
+        del batches[stale]
+    return batch
+
+
+def record(action, entity_type, entity_id, actor=None, meta=None, request=None,
+           strict=False, using=DEFAULT_DB_ALIAS):
+    """
+    Record an audit entry.
+
+    ``actor`` defaults to the authenticated user of ``request``. Returns the
+    (possibly not yet saved) ``AuditLog`` instance.
+    """
+    entry = build_entry(action, entity_type, entity_id, actor=actor, meta=meta, request=request)
+
+    if strict or not transaction.get_connection(using).in_atomic_block:
+        entry.save(using=using, force_insert=True)
+        return entry
+
+    _current_batch(using).append(entry)
+    return entry
+
+
+def record_many(entries, strict=False, using=DEFAULT_DB_ALIAS):
+    """Queue several entries built with ``build_entry()``."""
+    if strict or not transaction.get_connection(using).in_atomic_block:
+        AuditLog.objects.using(using).bulk_create(entries)
+        return entries
+    _current_batch(using).extend(entries)
+    return entries
+
+
+def write_entries(entries, using=DEFAULT_DB_ALIAS):
+    """Persist committed entries, inline or through the Celery worker."""
+    if not entries:
+        return
+    if getattr(settings, 'AUDIT_LOG_ASYNC', False):
+        from .tasks import write_audit_logs
+
+        try:
+            write_audit_logs.delay([serialize_entry(entry) for entry in entries])
+            return
+        except Exception:
+            # Broker unavailable: never lose audit entries, write them here.
+            logger.exception('Could not enqueue %d audit entries; writing inline', len(entries))
+    AuditLog.objects.using(using).bulk_create(entries)
+
+
+def serialize_entry(entry):
+    """Return a JSON-safe dict for an unsaved entry."""
+    data = {}
+    for field in AUDIT_FIELDS:
+        value = getattr(entry, field)
+        if field in ('id', 'actor_id', 'entity_id') and value is not None:
+            value = str(value)
+        elif field == 'created_at':
+            value = value.isoformat()
+        data[field] = value
+    return data
+
+
+def deserialize_entry(data):
+    """Inverse of ``serialize_entry()``."""
+    from django.utils.dateparse import parse_datetime
+
+    data = dict(data)
+    data['created_at'] = parse_datetime(data['created_at'])
+    return AuditLog(**data)
@@ -0,0 +1,163 @@
+"""
+Encrypted model fields and keyed-HMAC blind indexes.
+
+Values are encrypted with Fernet (AES-128-CBC + HMAC) using keys derived
+from ``FIELD_ENCRYPTION_KEYS``. The first key encrypts; every key is tried
+when decrypting, so keys can be rotated by prepending a new one and
+re-saving rows (see ``rotate_field_keys``).
+
+Ciphertext is randomised, so encrypted columns cannot be filtered on. A
+``BlindIndexField`` stores an HMAC of the normalised plaintext next to the
+encrypted column so exact-match lookups stay a single index probe.
+
+Rows written before encryption was enabled still hold plaintext; such
+values are returned unchanged until ``encrypt_client_fields`` rewrites them.
+"""
+import base64
+import hashlib
+import hmac
+import re
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from django.conf import settings
+from django.core.exceptions import FieldError
+from django.core.signals import setting_changed
+from django.db import models
+from django.dispatch import receiver
+
+# Every Fernet token starts with the version byte 0x80, base64-encoded.
+TOKEN_PREFIX = 'gAAAAA'
+
+
+def derive_key(secret, purpose):
+    """Derive 32 bytes for ``purpose`` from an arbitrary secret string."""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=b'raylene-fields',
+        info=purpose.encode('utf-8'),
+    ).derive(secret.encode('utf-8'))
+
+
+@lru_cache(maxsize=None)
+def get_fernet():
+    """Return the MultiFernet for ``FIELD_ENCRYPTION_KEYS`` (newest first)."""
+    keys = settings.FIELD_ENCRYPTION_KEYS
+    if isinstance(keys, str):
+        keys = [keys]
+    return MultiFernet([
+        Fernet(base64.urlsafe_b64encode(derive_key(key, 'encryption'))) for key in keys
+    ])
+
+
+@lru_cache(maxsize=None)
+def _blind_index_key():
+    return derive_key(settings.BLIND_INDEX_KEY, 'blind-index')
+
+
+@receiver(setting_changed)
+def _reset_keys(setting, **kwargs):
+    if setting in ('FIELD_ENCRYPTION_KEYS', 'BLIND_INDEX_KEY'):
+        get_fernet.cache_clear()
+        _blind_index_key.cache_clear()
+
+
+def encrypt(value):
+    return get_fernet().encrypt(value.encode('utf-8')).decode('ascii')
+
+
+def decrypt(token):
+    return get_fernet().decrypt(token.encode('ascii')).decode('utf-8')
+
+
+def is_encrypted(value):
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX)
+
+
+def rotate(token):
+    """Re-encrypt ``token`` (or plaintext) under the newest key."""
+    if not is_encrypted(token):
+        return encrypt(token) if token else token
+    return get_fernet().rotate(token.encode('ascii')).decode('ascii')
+
+
+def normalize_identifier(value):
+    """Normalise a document number: drop spaces and dashes, uppercase."""
+    return re.sub(r'[\s\-]', '', value or '').upper()
+
+
+def blind_index(value, normalizer=normalize_identifier):
+    """Return the hex HMAC-SHA256 of the normalised value ('' for blank)."""
+    value = normalizer(value)
+    if not value:
+        return ''
+    return hmac.new(_blind_index_key(), value.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class EncryptedFieldMixin:
+    """
+    Encrypt on save, decrypt on load.
+
+    Blank values are stored as-is. Only ``isnull`` lookups are supported;
+    filter on a blind index instead.
+    """
+
+    def get_internal_type(self):
+        return 'TextField'
+
+    def from_db_value(self, value, expression, connection):
+        if is_encrypted(value):
+            return decrypt(value)
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        # Not get_db_prep_save(): bulk_update() prepares values through this.
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value in (None, '') or is_encrypted(value):
+            return value
+        return encrypt(str(value))
+
+    def get_lookup(self, lookup_name):
+        if lookup_name != 'isnull':
+            raise FieldError(f'{self.__class__.__name__} does not support {lookup_name!r} lookups.')
+        return super().get_lookup(lookup_name)
+
+    def get_transform(self, lookup_name):
+        raise FieldError(f'{self.__class__.__name__} does not support transforms.')
+
+
+class EncryptedCharField(EncryptedFieldMixin, models.CharField):
+    """CharField stored encrypted; ``max_length`` applies to the plaintext."""
+
+
+class EncryptedTextField(EncryptedFieldMixin, models.TextField):
+    """TextField stored encrypted."""
+
+
+class BlindIndexField(models.CharField):
+    """
+    Indexed HMAC of another field, recomputed on every save.
+
+    Look rows up with ``filter(<name>=blind_index(value))``.
+    """
+
+    def __init__(self, source, *args, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = blind_index(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
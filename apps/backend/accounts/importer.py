@@ -0,0 +1,218 @@
+"""
+Bulk client onboarding.
+
+``import_clients()`` reads client records (from ``read_records()``, which
+streams CSV or NDJSON) and creates users, client profiles and CLIENT role
+links in chunks. Each chunk is validated in Python, checked against existing
+emails with one query and written with three ``bulk_create`` calls. Password
+hashing, the expensive part, runs in a process pool.
+
+Rows without a password get an unusable password; their owners set one
+through the set-password link sent by ``send_set_password_emails``.
+
+Invalid rows are reported in ``ImportResult.errors`` and never abort the
+rest of the import.
+"""
+import csv
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, transaction
+
+from raylene import catalogs
+
+from .models import ClientProfile, Role, User, UserRole
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ('first_name', 'last_name', 'date_of_birth', 'nationality',
+                  'passport_no', 'phone', 'address')
+ERROR_FIELDS = ('line', 'email', 'error')
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an import: rows created, users invited and per-row errors."""
+    created: int = 0
+    invited: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, email, error):
+        self.errors.append({'line': line, 'email': email or '', 'error': error})
+
+
+def read_records(fh, fmt):
+    """
+    Yield ``(line number, record dict)`` from a text stream.
+
+    ``fmt`` is ``'csv'`` (header row required) or ``'ndjson'``. Undecodable
+    NDJSON lines are yielded as ``None`` so they are reported as errors.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(fh)
+        for record in reader:
+            yield reader.line_num, {k.strip(): (v or '').strip() for k, v in record.items() if k}
+    elif fmt == 'ndjson':
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_no, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f'Unsupported import format: {fmt!r}')
+
+
+def format_for(filename):
+    """Guess the import format from a file name."""
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def write_errors(errors, fh):
+    """Write ``ImportResult.errors`` as CSV."""
+    writer = csv.DictWriter(fh, fieldnames=ERROR_FIELDS)
+    writer.writeheader()
+    writer.writerows(errors)
+
+
+def _init_worker():
+    if not apps.ready:
+        django.setup()
+    for conn in connections.all():
+        conn.close()
+
+
+@contextmanager
+def hashing_pool(workers):
+    """Yield a ``map``-like callable hashing in ``workers`` processes."""
+    if workers <= 1:
+        yield map
+        return
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        yield lambda func, items: pool.map(func, items, chunksize=8)
+
+
+def _build_row(record):
+    """Return ``(user, profile, password)`` or raise ValidationError."""
+    email = User.objects.normalize_email(str(record.get('email') or '').strip())
+    if not email:
+        raise ValidationError('email is required.')
+    validate_email(email)
+
+    user = User(email=email)
+    profile = ClientProfile(user=user, **{
+        name: str(record[name]).strip() for name in PROFILE_FIELDS if record.get(name)
+    })
+    profile.clean_fields(exclude=['user', 'consent_flags'])
+
+    password = record.get('password') or None
+    if password:
+        validate_password(password, user)
+    return user, profile, password
+
+
+def _error_message(exc):
+    if hasattr(exc, 'error_dict'):
+        return '; '.join(f'{name}: {" ".join(msgs)}' for name, msgs in exc.message_dict.items())
+    return ' '.join(exc.messages)
+
+
+def import_clients(records, chunk_size=500, workers=1, send_invites=False):
+    """
+    Import ``(line, record)`` pairs; return an ``ImportResult``.
+
+    ``records`` is consumed lazily, ``chunk_size`` rows at a time.
+    """
+    result = ImportResult()
+    role = catalogs.ROLES.get('CLIENT', 'code') or Role.objects.get(code='CLIENT')
+    seen = set()
+    records = iter(records)
+    with hashing_pool(workers) as pool_map:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            passwordless = _import_chunk(chunk, role, seen, pool_map, result)
+            if send_invites and passwordless:
+                _queue_invites(passwordless)
+                result.invited.extend(passwordless)
+    return result
+
+
+def _import_chunk(chunk, role, seen, pool_map, result):
+    """Import one chunk; return the ids of created users without a password."""
+    rows = []
+    for line, record in chunk:
+        email = (record or {}).get('email')
+        if record is None:
+            result.add_error(line, '', 'Invalid JSON object.')
+            continue
+        try:
+            user, profile, password = _build_row(record)
+        except ValidationError as exc:
+            result.add_error(line, email, _error_message(exc))
+            continue
+        if user.email in seen:
+            result.add_error(line, user.email, 'Duplicate email in import file.')
+            continue
+        seen.add(user.email)
+        rows.append((line, user, profile, password))
+
+    existing = set(User.objects.filter(email__in=[r[1].email for r in rows]).values_list('email', flat=True))
+    for line, user, _, _ in rows:
+        if user.email in existing:
+            result.add_error(line, user.email, 'A user with this email already exists.')
+    rows = [r for r in rows if r[1].email not in existing]
+    if not rows:
+        return []
+
+    for (_, user, _, _), hashed in zip(rows, pool_map(make_password, [r[3] for r in rows])):
+        user.password = hashed
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([r[1] for r in rows])
+            ClientProfile.objects.bulk_create([r[2] for r in rows])
+            UserRole.objects.bulk_create([UserRole(user=r[1], role=role) for r in rows])
+        created = rows
+    except IntegrityError:
+        # A concurrent signup took one of the emails: insert row by row.
+        created = []
+        for row in rows:
+            line, user, profile, _ = row
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                    profile.save(force_insert=True)
+                    UserRole.objects.create(user=user, role=role)
+                created.append(row)
+            except IntegrityError:
+                result.add_error(line, user.email, 'A user with this email already exists.')
+
+    result.created += len(created)
+    return [str(r[1].pk) for r in created if r[3] is None]
+
+
+def _queue_invites(user_ids):
+    from .tasks import send_set_password_emails
+
+    try:
+        send_set_password_emails.delay(user_ids)
+    except Exception:
+        logger.exception('Could not queue set-password emails for %d imported users', len(user_ids))
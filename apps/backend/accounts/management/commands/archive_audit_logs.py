@@ -0,0 +1,39 @@
+"""
+Move audit log months past the retention window into NDJSON archives.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Create upcoming audit log partitions and archive months older than '
+        'the retention window to compressed NDJSON files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-months', type=int, default=settings.AUDIT_RETENTION_MONTHS,
+                            help='Whole months kept in the hot table (default: AUDIT_RETENTION_MONTHS).')
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='Partitions to create ahead of the current month.')
+        parser.add_argument('--archive-dir', default=None,
+                            help='Directory for archive files (default: AUDIT_ARCHIVE_DIR).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the months that would be archived and exit.')
+
+    def handle(self, *args, **options):
+        months = partitions.archivable_months(options['retention_months'])
+        if options['dry_run']:
+            for month in months:
+                self.stdout.write(f'would archive {month:%Y-%m}')
+            return
+
+        for name in partitions.ensure_partitions(options['months_ahead']):
+            self.stdout.write(f'created partition {name}')
+
+        for month in months:
+            count = partitions.archive_month(month, archive_dir=options['archive_dir'])
+            path = partitions.archive_path(month, options['archive_dir'])
+            self.stdout.write(self.style.SUCCESS(f'archived {month:%Y-%m}: {count} entries -> {path}'))
@@ -0,0 +1,56 @@
+"""
+Encrypt plaintext client profile fields and fill the passport blind index.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.fields import blind_index
+from accounts.models import ClientProfile, JobCheckpoint
+
+ENCRYPTED_FIELDS = ['passport_no', 'phone', 'address']
+
+
+class Command(BaseCommand):
+    help = (
+        'Rewrite client profiles in primary-key order so passport_no, phone and '
+        'address are stored encrypted and passport_no_hash is populated. '
+        'Progress is checkpointed per chunk; re-running resumes where it stopped.'
+    )
+    checkpoint_name = 'encrypt_client_fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Rows rewritten per transaction.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore the saved checkpoint and start from the first row.')
+
+    def handle(self, *args, **options):
+        checkpoint, _ = JobCheckpoint.objects.get_or_create(name=self.checkpoint_name)
+        if options['restart']:
+            checkpoint.position = ''
+        if checkpoint.position:
+            self.stdout.write(f'resuming after {checkpoint.position}')
+
+        chunk_size = options['chunk_size']
+        total = 0
+        while True:
+            queryset = ClientProfile.objects.order_by('pk').only('pk', *ENCRYPTED_FIELDS)
+            if checkpoint.position:
+                queryset = queryset.filter(pk__gt=checkpoint.position)
+            profiles = list(queryset[:chunk_size])
+            if not profiles:
+                break
+
+            # Values load decrypted (or as legacy plaintext) and are written
+            # back encrypted under the newest key.
+            for profile in profiles:
+                profile.passport_no_hash = blind_index(profile.passport_no)
+            with transaction.atomic():
+                ClientProfile.objects.bulk_update(profiles, ENCRYPTED_FIELDS + ['passport_no_hash'])
+                checkpoint.position = str(profiles[-1].pk)
+                checkpoint.save(update_fields=['position', 'updated_at'])
+            total += len(profiles)
+            self.stdout.write(f'{total} profiles encrypted (last {checkpoint.position})')
+
+        checkpoint.delete()
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} profiles encrypted.'))
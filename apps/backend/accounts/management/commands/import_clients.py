@@ -0,0 +1,53 @@
+"""
+Bulk-create client accounts from a CSV or NDJSON file.
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Import clients (email, password, first_name, last_name, date_of_birth, '
+        'nationality, passport_no, phone, address) from a CSV file with a header '
+        'row or an NDJSON file. Invalid rows are written to an error file and do '
+        'not stop the import.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON (.ndjson/.jsonl) file.')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                            help='Input format (default: from the file extension).')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Rows validated and inserted per batch.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes hashing passwords.')
+        parser.add_argument('--errors', default=None,
+                            help='Error file path (default: <path>.errors.csv).')
+        parser.add_argument('--send-invites', action='store_true',
+                            help='Email set-password links to users imported without a password.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist.')
+        fmt = options['format'] or importer.format_for(path)
+
+        with open(path, encoding='utf-8-sig', newline='') as fh:
+            result = importer.import_clients(
+                importer.read_records(fh, fmt),
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                send_invites=options['send_invites'],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Created {result.created} clients.'))
+        if result.invited:
+            self.stdout.write(f'Queued set-password emails for {len(result.invited)} clients.')
+        if result.errors:
+            errors_path = options['errors'] or f'{path}.errors.csv'
+            with open(errors_path, 'w', encoding='utf-8', newline='') as fh:
+                importer.write_errors(result.errors, fh)
+            self.stdout.write(self.style.WARNING(f'{len(result.errors)} rows failed; see {errors_path}'))
@@ -0,0 +1,154 @@
+"""
+Re-encrypt encrypted model fields under the newest FIELD_ENCRYPTION_KEYS key.
+"""
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+
+from accounts.fields import BlindIndexField, EncryptedFieldMixin
+
+CHECKPOINT_PREFIX = 'rotate_field_keys'
+
+
+def encrypted_models():
+    """Return ``{label: [field names]}`` for models with encrypted fields."""
+    found = {}
+    for model in apps.get_models():
+        fields = model._meta.concrete_fields
+        encrypted = [f.name for f in fields if isinstance(f, EncryptedFieldMixin)]
+        if encrypted:
+            found[model._meta.label] = encrypted + [f.name for f in fields if isinstance(f, BlindIndexField)]
+    return found
+
+
+def pk_ranges(workers):
+    """Split the UUID space into ``workers`` contiguous ``[low, high)`` ranges."""
+    span = 2 ** 128
+    bounds = [uuid.UUID(int=i * span // workers) for i in range(workers)]
+    return [(bounds[i], bounds[i + 1] if i + 1 < workers else None) for i in range(workers)]
+
+
+def checkpoint_name(label, index, workers):
+    return f'{CHECKPOINT_PREFIX}:{label}:{index}/{workers}'
+
+
+def _init_worker():
+    if not apps.ready:
+        django.setup()
+    # Never share the parent's database connections with a forked worker.
+    for conn in connections.all():
+        conn.close()
+
+
+def rotate_range(label, fields, low, high, name, chunk_size):
+    """
+    Re-encrypt the rows of ``label`` with ``low <= pk < high``.
+
+    Rows are streamed with a server-side cursor and written back with one
+    ``bulk_update`` per chunk; the chunk and the checkpoint commit together.
+    Returns the number of rows rewritten.
+    """
+    from accounts.models import JobCheckpoint
+
+    model = apps.get_model(label)
+    checkpoint, _ = JobCheckpoint.objects.get_or_create(name=name)
+    queryset = model.objects.order_by('pk').only('pk', *fields).filter(pk__gte=low)
+    if high is not None:
+        queryset = queryset.filter(pk__lt=high)
+    if checkpoint.position:
+        queryset = queryset.filter(pk__gt=checkpoint.position)
+    blind_fields = [model._meta.get_field(f) for f in fields
+                    if isinstance(model._meta.get_field(f), BlindIndexField)]
+
+    rewritten = 0
+    chunk = []
+
+    def flush():
+        nonlocal rewritten
+        # Loaded values are plaintext; saving encrypts them with the newest key.
+        with transaction.atomic():
+            model.objects.bulk_update(chunk, fields)
+            checkpoint.position = str(chunk[-1].pk)
+            checkpoint.save(update_fields=['position', 'updated_at'])
+        rewritten += len(chunk)
+        chunk.clear()
+
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        for field in blind_fields:
+            field.pre_save(obj, False)
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return rewritten
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-encrypt every encrypted field with the first FIELD_ENCRYPTION_KEYS key '
+        '(older keys still decrypt) and recompute blind indexes. Work is split into '
+        'disjoint primary-key ranges processed in parallel and checkpointed per '
+        'range, so an interrupted run resumes when started with the same --workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Worker processes, each owning one primary-key range.')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows fetched and updated per batch.')
+        parser.add_argument('--model', action='append', dest='models',
+                            help='Limit to this model label (repeatable), e.g. accounts.ClientProfile.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Discard saved checkpoints and start from the beginning.')
+
+    def handle(self, *args, **options):
+        from accounts.models import JobCheckpoint
+
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1.')
+        targets = encrypted_models()
+        if options['models']:
+            unknown = set(options['models']) - set(targets)
+            if unknown:
+                raise CommandError(f'No encrypted fields on: {", ".join(sorted(unknown))}')
+            targets = {label: targets[label] for label in options['models']}
+
+        if options['restart']:
+            JobCheckpoint.objects.filter(name__startswith=f'{CHECKPOINT_PREFIX}:').delete()
+
+        jobs = []
+        for label, fields in targets.items():
+            if not isinstance(apps.get_model(label)._meta.pk, models.UUIDField):
+                raise CommandError(f'{label} does not have a UUID primary key.')
+            for index, (low, high) in enumerate(pk_ranges(workers)):
+                jobs.append((label, fields, low, high, checkpoint_name(label, index, workers),
+                             options['chunk_size']))
+
+        parallel = workers > 1
+        if parallel and connections['default'].vendor == 'sqlite':
+            self.stderr.write('SQLite allows a single writer; processing ranges sequentially.')
+            parallel = False
+
+        total = 0
+        if not parallel:
+            for job in jobs:
+                count = rotate_range(*job)
+                total += count
+                self.stdout.write(f'{job[4]}: {count} rows')
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = {pool.submit(rotate_range, *job): job[4] for job in jobs}
+                for future in as_completed(futures):
+                    count = future.result()
+                    total += count
+                    self.stdout.write(f'{futures[future]}: {count} rows')
+
+        JobCheckpoint.objects.filter(name__in=[job[4] for job in jobs]).delete()
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} rows re-encrypted.'))
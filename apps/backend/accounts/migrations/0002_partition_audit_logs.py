@@ -0,0 +1,140 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:18
+
+import datetime
+
+import django.utils.timezone
+from django.db import migrations, models
+
+TABLE = 'audit_logs'
+OLD_TABLE = 'audit_logs_unpartitioned'
+MONTHS_AHEAD = 3
+
+
+def _month_start(value):
+    value = value.astimezone(datetime.timezone.utc)
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def _add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _table_definition(cursor, table):
+    """Return (index DDL, foreign key DDL) of ``table``, excluding the primary key."""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN ("
+        "  SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+        [table, table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rename_table(cursor, quote, table, new_name):
+    """Rename a table together with its primary key constraint."""
+    cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(new_name)}')
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [new_name],
+    )
+    row = cursor.fetchone()
+    if row:
+        cursor.execute(
+            f'ALTER TABLE {quote(new_name)} RENAME CONSTRAINT {quote(row[0])} TO {quote(new_name + "_pkey")}'
+        )
+
+
+def partition_audit_logs(apps, schema_editor):
+    """
+    Convert audit_logs into a table range-partitioned by month (PostgreSQL).
+
+    Existing rows are copied into monthly partitions; indexes and foreign
+    keys are recreated on the partitioned parent under their original names.
+    Other backends keep the plain table.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = _table_definition(cursor, TABLE)
+        _rename_table(cursor, quote, TABLE, OLD_TABLE)
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} (LIKE {quote(OLD_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ("created_at")'
+        )
+        # Partition keys must be part of the primary key.
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY ("id", "created_at")')
+        cursor.execute(f'CREATE TABLE {quote(TABLE + "_default")} PARTITION OF {quote(TABLE)} DEFAULT')
+
+        cursor.execute(f'SELECT MIN("created_at") FROM {quote(OLD_TABLE)}')
+        oldest = cursor.fetchone()[0]
+        last = _add_months(_month_start(django.utils.timezone.now()), MONTHS_AHEAD)
+        month = _month_start(oldest) if oldest else _month_start(django.utils.timezone.now())
+        while month <= last:
+            end = _add_months(month, 1)
+            name = f'{TABLE}_p{month.year:04d}_{month.month:02d}'
+            cursor.execute(
+                f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = end
+
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(OLD_TABLE)}')
+        cursor.execute(f'DROP TABLE {quote(OLD_TABLE)}')
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+
+
+def unpartition_audit_logs(apps, schema_editor):
+    """Fold the monthly partitions back into a single plain table."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = _table_definition(cursor, TABLE)
+        _rename_table(cursor, quote, TABLE, OLD_TABLE)
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} (LIKE {quote(OLD_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(OLD_TABLE)}')
+        cursor.execute(f'DROP TABLE {quote(OLD_TABLE)} CASCADE')
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY ("id")')
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='entity_id',
+            field=models.UUIDField(),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='entity_type',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.RunPython(partition_audit_logs, unpartition_audit_logs),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:23
+
+import accounts.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_audit_log_timeline_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'job_checkpoints',
+            },
+        ),
+        migrations.AddField(
+            model_name='clientprofile',
+            name='passport_no_hash',
+            field=accounts.fields.BlindIndexField(blank=True, db_index=True, editable=False, max_length=64, source='passport_no'),
+        ),
+        migrations.AlterField(
+            model_name='clientprofile',
+            name='address',
+            field=accounts.fields.EncryptedTextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='clientprofile',
+            name='passport_no',
+            field=accounts.fields.EncryptedCharField(blank=True, help_text='Passport number', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='clientprofile',
+            name='phone',
+            field=accounts.fields.EncryptedCharField(blank=True, max_length=20),
+        ),
+    ]
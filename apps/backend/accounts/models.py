@@ -4,9 +4,8 @@ User authentication and profile models.
 import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-# Temporarily using regular fields instead of encrypted fields
-# from fernet_fields import EncryptedTextField, EncryptedCharField
 from django.utils import timezone
+from .fields import BlindIndexField, EncryptedCharField, EncryptedTextField
 
 
 class UserManager(BaseUserManager):
@@ -113,9 +112,11 @@ class ClientProfile(models.Model):
     last_name = models.CharField(max_length=100)
     date_of_birth = models.DateField(null=True, blank=True)
     nationality = models.CharField(max_length=100, blank=True)
-    passport_no = models.CharField(max_length=50, blank=True, help_text='Passport number')  # TODO: Add encryption
-    phone = models.CharField(max_length=20, blank=True)
-    address = models.TextField(blank=True)
+    passport_no = EncryptedCharField(max_length=50, blank=True, help_text='Passport number')
+    # Keyed HMAC of the normalised passport number, for exact-match lookups
+    passport_no_hash = BlindIndexField(source='passport_no')
+    phone = EncryptedCharField(max_length=20, blank=True)
+    address = EncryptedTextField(blank=True)
     
     # Consent and privacy
     consent_flags = models.JSONField(default=dict, help_text='GDPR/POPIA consent flags')
@@ -152,26 +153,52 @@ class StaffProfile(models.Model):
 
 
 class AuditLog(models.Model):
-    """Audit trail for user actions."""
+    """
+    Audit trail for user actions.
+
+    Append-only. On PostgreSQL the table is partitioned by month on
+    ``created_at`` (see ``accounts.partitions``), so the primary key is
+    ``(id, created_at)`` at the database level. Single-column indexes on
+    ``actor``/``entity_type``/``entity_id`` are covered by the composite
+    indexes below and are not created. The entity and actor indexes end in
+    ``created_at`` so timelines are read as index range scans. ``created_at``
+    keeps an index of its own for reads across all entries: the admin
+    changelist (newest first) and ``partitions.archivable_months()``.
+    """
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='audit_logs')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='audit_logs',
+                              db_index=False)
     action = models.CharField(max_length=50)
-    entity_type = models.CharField(max_length=50, db_index=True)
-    entity_id = models.UUIDField(db_index=True)
+    entity_type = models.CharField(max_length=50)
+    entity_id = models.UUIDField()
     meta = models.JSONField(default=dict)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'audit_logs'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['entity_type', 'entity_id']),
+            models.Index(fields=['entity_type', 'entity_id', 'created_at']),
+            models.Index(fields=['actor', 'created_at']),
             models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
         return f'{self.action} on {self.entity_type} by {self.actor} at {self.created_at}'
 
+
+class JobCheckpoint(models.Model):
+    """Progress marker for resumable batch jobs (last processed key)."""
+
+    name = models.CharField(max_length=100, unique=True)
+    position = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'job_checkpoints'
+
+    def __str__(self):
+        return f'{self.name} @ {self.position}'
@@ -0,0 +1,422 @@
+"""
+Time-partitioned storage for the audit log.
+
+On PostgreSQL ``audit_logs`` is range-partitioned by month on
+``created_at`` (see migration 0002): each month lives in its own
+``audit_logs_pYYYY_MM`` table with a ``DEFAULT`` partition catching
+anything outside the created ranges. Queries through ``AuditLog`` read the
+parent table and PostgreSQL prunes to the matching partitions.
+
+On SQLite the table stays unpartitioned and the same functions operate on
+month ranges of rows, so callers do not need to care about the backend.
+
+Months older than the retention window are exported to gzip-compressed
+NDJSON files in ``AUDIT_ARCHIVE_DIR`` (one ``audit_logs_YYYY_MM.ndjson.gz``
+per month, in ``(created_at, id)`` order, with an ``.index.json`` next to
+it) and removed from the hot table.
+"""
+import datetime
+import functools
+import gzip
+import heapq
+import json
+import os
+import re
+import uuid
+from collections import defaultdict
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+
+TABLE = AuditLog._meta.db_table
+PARTITION_RE = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+ARCHIVE_RE = re.compile(rf'^{TABLE}_(\d{{4}})_(\d{{2}})\.ndjson\.gz$')
+# Entries per gzip member of an archive file, and the UUID prefix length
+# used as index key (a collision only costs decompressing an extra chunk).
+ARCHIVE_CHUNK_ROWS = 1000
+INDEX_KEY_LENGTH = 8
+ARCHIVE_FIELDS = ('id', 'actor_id', 'action', 'entity_type', 'entity_id', 'meta',
+                  'ip_address', 'user_agent', 'created_at')
+
+
+def is_partitioned(using_connection=None):
+    """Return True when the backend stores the audit log in partitions."""
+    return (using_connection or connection).vendor == 'postgresql'
+
+
+def month_start(value):
+    """Return the first instant (UTC) of the month containing ``value``."""
+    value = value.astimezone(datetime.timezone.utc) if timezone.is_aware(value) else value
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(start, months):
+    """Return ``start`` moved by a whole number of months."""
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start):
+    return f'{TABLE}_p{start.year:04d}_{start.month:02d}'
+
+
+def archive_path(start, archive_dir=None):
+    directory = Path(archive_dir or settings.AUDIT_ARCHIVE_DIR)
+    return directory / f'{TABLE}_{start.year:04d}_{start.month:02d}.ndjson.gz'
+
+
+def create_partition_sql(start, schema_editor=None):
+    """Return the DDL creating the partition for the month starting at ``start``."""
+    quote = (schema_editor or connection.ops).quote_name
+    end = add_months(start, 1)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {quote(partition_name(start))} '
+        f'PARTITION OF {quote(TABLE)} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def list_partitions():
+    """Return the month starts of existing partitions (PostgreSQL only)."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            months.append(datetime.datetime(int(match[1]), int(match[2]), 1, tzinfo=datetime.timezone.utc))
+    return sorted(months)
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    """
+    Create partitions from the current month up to ``months_ahead`` ahead.
+
+    Creating partitions ahead of time keeps inserts out of the default
+    partition. Returns the names of partitions that were created.
+    """
+    if not is_partitioned():
+        return []
+    existing = set(list_partitions())
+    start = month_start(now or timezone.now())
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(start, offset)
+            if month not in existing:
+                cursor.execute(create_partition_sql(month))
+                created.append(partition_name(month))
+    return created
+
+
+def archivable_months(retention_months, now=None):
+    """Return month starts older than the retention window that hold data."""
+    cutoff = add_months(month_start(now or timezone.now()), -retention_months)
+    months = {m for m in list_partitions() if m < cutoff}
+    # Jump from one populated month to the next with index probes on created_at.
+    start = None
+    while True:
+        qs = AuditLog.objects.filter(created_at__lt=cutoff)
+        if start is not None:
+            qs = qs.filter(created_at__gte=add_months(start, 1))
+        oldest = qs.order_by('created_at').values_list('created_at', flat=True).first()
+        if oldest is None:
+            break
+        start = month_start(oldest)
+        months.add(start)
+    return sorted(months)
+
+
+def archive_month(start, archive_dir=None, chunk_size=5000):
+    """
+    Export one month of audit entries to NDJSON and remove it from the hot table.
+
+    The archive file (and its index) is written completely before anything
+    is deleted, and only rows that are in the archive are deleted: a row
+    backdated into the month while the export runs stays in the table for
+    the next run. On PostgreSQL the month's partition is then detached and
+    dropped if nothing is left in it. Returns the number of exported
+    entries.
+    """
+    end = add_months(start, 1)
+    path = archive_path(start, archive_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_index = index_path(path).with_suffix('.tmp')
+
+    rows = (
+        AuditLog.objects.filter(created_at__gte=start, created_at__lt=end)
+        .order_by('created_at', 'id').values(*ARCHIVE_FIELDS)
+    )
+    exported = 0
+
+    def export():
+        nonlocal exported
+        for row in rows.iterator(chunk_size=chunk_size):
+            exported += 1
+            yield json.dumps(row, cls=DjangoJSONEncoder)
+
+    lines = export()
+    if path.exists():
+        # Rows of this month arrived after an earlier archive run.
+        lines = _merge_lines(_sorted_lines(path), lines)
+    _write_archive(tmp_path, tmp_index, lines)
+    if exported == 0 and not path.exists():
+        tmp_path.unlink()
+        tmp_index.unlink()
+        return 0
+    # Readers check the index against the archive size, so they fall back
+    # to a full scan rather than use a stale index between the two renames.
+    os.replace(tmp_path, path)
+    os.replace(tmp_index, index_path(path))
+
+    with transaction.atomic():
+        month = AuditLog.objects.filter(created_at__gte=start, created_at__lt=end)
+        ids = (row['id'] for row in _read_lines(path))
+        while batch := list(islice(ids, chunk_size)):
+            month.filter(pk__in=batch).delete()
+        if is_partitioned() and start in list_partitions():
+            quote = connection.ops.quote_name
+            name = quote(partition_name(start))
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE')
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {name})')
+                if not cursor.fetchone()[0]:
+                    cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {name}')
+                    cursor.execute(f'DROP TABLE {name}')
+    return exported
+
+
+def index_path(archive):
+    """Return the path of the index written next to an archive file."""
+    return archive.with_name(archive.name.replace('.ndjson.gz', '.index.json'))
+
+
+def _index_key(value):
+    return _norm_uuid(str(value))[:INDEX_KEY_LENGTH]
+
+
+def _position(row):
+    return parse_datetime(row['created_at']), uuid.UUID(row['id'])
+
+
+def _write_archive(path, index, lines):
+    """
+    Write NDJSON ``lines``, sorted by ``(created_at, id)``, to ``path`` and ``index``.
+
+    The file is a series of gzip members of ``ARCHIVE_CHUNK_ROWS`` lines,
+    which still reads as one gzip stream. The index holds each member's
+    offset, size and first/last position, and the members holding each
+    entity and actor (keyed by a UUID prefix), so a reader decompresses
+    only the members it needs.
+    """
+    lines = iter(lines)
+    chunks, entities, actors = [], defaultdict(set), defaultdict(set)
+    with open(path, 'wb') as fh:
+        while batch := list(islice(lines, ARCHIVE_CHUNK_ROWS)):
+            rows = [json.loads(line) for line in batch]
+            member = gzip.compress(''.join(f'{line}\n' for line in batch).encode('utf-8'))
+            number = len(chunks)
+            chunks.append([fh.tell(), len(member), rows[0]['created_at'], rows[0]['id'],
+                           rows[-1]['created_at'], rows[-1]['id']])
+            fh.write(member)
+            for row in rows:
+                entities[_index_key(row['entity_id'])].add(number)
+                if row['actor_id']:
+                    actors[_index_key(row['actor_id'])].add(number)
+        size = fh.tell()
+    with open(index, 'w', encoding='utf-8') as fh:
+        json.dump({
+            'size': size,
+            'chunks': chunks,
+            'entities': {key: sorted(numbers) for key, numbers in entities.items()},
+            'actors': {key: sorted(numbers) for key, numbers in actors.items()},
+        }, fh, separators=(',', ':'))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_index(path, mtime_ns, size):
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _load_index(archive):
+    """Return the index of an archive file, or None if it is missing or stale."""
+    path = index_path(archive)
+    try:
+        stat = path.stat()
+        archive_size = archive.stat().st_size
+    except FileNotFoundError:
+        return None
+    index = _cached_index(str(path), stat.st_mtime_ns, stat.st_size)
+    return index if index.get('size') == archive_size else None
+
+
+def _read_lines(path):
+    """Yield the parsed entries of an archive file in file order."""
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        for line in fh:
+            yield json.loads(line)
+
+
+def _sorted_lines(path):
+    """Yield the lines of an existing archive file in ``(created_at, id)`` order."""
+    rows = _read_lines(path)
+    if _load_index(path) is None:
+        # Written before archives were indexed: not necessarily in order.
+        rows = sorted(rows, key=_position)
+    for row in rows:
+        yield json.dumps(row)
+
+
+def _merge_lines(existing, new):
+    """
+    Merge two sorted streams of NDJSON lines.
+
+    Entries present in both (a run interrupted between writing the archive
+    and deleting the rows) have the same position, so they meet and are
+    kept once.
+    """
+    previous = None
+    for line in heapq.merge(existing, new, key=lambda line: _position(json.loads(line))):
+        entry_id = json.loads(line)['id']
+        if entry_id != previous:
+            yield line
+        previous = entry_id
+
+
+def archived_months(archive_dir=None):
+    """Return the month starts that have archive files."""
+    directory = Path(archive_dir or settings.AUDIT_ARCHIVE_DIR)
+    if not directory.exists():
+        return []
+    months = []
+    for name in os.listdir(directory):
+        match = ARCHIVE_RE.match(name)
+        if match:
+            months.append(datetime.datetime(int(match[1]), int(match[2]), 1, tzinfo=datetime.timezone.utc))
+    return sorted(months)
+
+
+def iter_archived(entity_type=None, entity_id=None, actor_id=None, action=None,
+                  since=None, until=None, archive_dir=None, newest_first=True, after=None):
+    """
+    Yield archived entries (as dicts) matching the filters.
+
+    Only the archive files whose month overlaps ``since``/``until`` are
+    opened. Entries are yielded in ``(created_at, id)`` order, newest first
+    by default; ``after``, a ``(created_at, id)`` position, skips the
+    entries up to and including it, so a reader can resume where it
+    stopped. Indexed files are read one chunk at a time, skipping chunks
+    outside the position range or without the entity/actor, so a caller
+    that stops early decompresses only what it consumed.
+    """
+    months = archived_months(archive_dir)
+    if since is not None:
+        months = [m for m in months if add_months(m, 1) > since]
+    if until is not None:
+        months = [m for m in months if m <= until]
+    if after is not None:
+        after = (after[0], uuid.UUID(str(after[1])))
+        if newest_first:
+            months = [m for m in months if m <= after[0]]
+        else:
+            months = [m for m in months if add_months(m, 1) > after[0]]
+    if newest_first:
+        months.reverse()
+
+    entity_id = str(entity_id) if entity_id is not None else None
+    actor_id = str(actor_id) if actor_id is not None else None
+    for month in months:
+        path = archive_path(month, archive_dir)
+        index = _load_index(path)
+        if index is None:
+            rows = sorted(_read_lines(path), key=_position, reverse=newest_first)
+        else:
+            rows = _read_chunks(path, index, entity_id, actor_id, since, until, after, newest_first)
+        for row in rows:
+            if entity_type is not None and row['entity_type'] != entity_type:
+                continue
+            if entity_id is not None and _norm_uuid(row['entity_id']) != _norm_uuid(entity_id):
+                continue
+            if actor_id is not None and _norm_uuid(row['actor_id']) != _norm_uuid(actor_id):
+                continue
+            if action is not None and row['action'] != action:
+                continue
+            position = _position(row)
+            if since is not None and position[0] < since:
+                continue
+            if until is not None and position[0] >= until:
+                continue
+            if after is not None and (position >= after if newest_first else position <= after):
+                continue
+            row['created_at'] = position[0]
+            yield row
+
+
+def _read_chunks(path, index, entity_id, actor_id, since, until, after, newest_first):
+    """Yield the entries of the indexed chunks that may match, in order."""
+    numbers = set(range(len(index['chunks'])))
+    if entity_id is not None:
+        numbers &= set(index['entities'].get(_index_key(entity_id), ()))
+    if actor_id is not None:
+        numbers &= set(index['actors'].get(_index_key(actor_id), ()))
+    selected = []
+    for number in sorted(numbers, reverse=newest_first):
+        offset, length, first_at, first_id, last_at, last_id = index['chunks'][number]
+        first = (parse_datetime(first_at), uuid.UUID(first_id))
+        last = (parse_datetime(last_at), uuid.UUID(last_id))
+        if since is not None and last[0] < since:
+            continue
+        if until is not None and first[0] >= until:
+            continue
+        if after is not None and (first >= after if newest_first else last <= after):
+            continue
+        selected.append((offset, length))
+    if not selected:
+        return
+    with open(path, 'rb') as fh:
+        for offset, length in selected:
+            fh.seek(offset)
+            rows = [json.loads(line) for line in gzip.decompress(fh.read(length)).splitlines()]
+            if newest_first:
+                rows.reverse()
+            yield from rows
+
+
+def as_audit_logs(entries):
+    """
+    Return archived entries as unsaved ``AuditLog`` instances.
+
+    Their actors are loaded in one query, so serializers can read
+    ``actor.email`` as they do for rows of the hot table.
+    """
+    fields = {name: AuditLog._meta.get_field(name) for name in ARCHIVE_FIELDS}
+    logs = [AuditLog(**{name: fields[name].to_python(value) for name, value in entry.items()
+                        if name in fields})
+            for entry in entries]
+    actor_ids = {log.actor_id for log in logs if log.actor_id is not None}
+    actors = AuditLog.actor.field.related_model.objects.in_bulk(actor_ids) if actor_ids else {}
+    for log in logs:
+        AuditLog.actor.field.set_cached_value(log, actors.get(log.actor_id))
+    return logs
+
+
+def _norm_uuid(value):
+    return value.replace('-', '').lower() if value else value
@@ -0,0 +1,18 @@
+"""
+Permission classes shared by the API views.
+"""
+from rest_framework import permissions
+
+from .roles import STAFF_ROLES, is_staff_member
+
+
+class IsStaffMember(permissions.BasePermission):
+    """Allow authenticated users holding one of ``staff_roles`` (or is_staff)."""
+
+    staff_roles = STAFF_ROLES
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        return is_staff_member(user, getattr(view, 'staff_roles', self.staff_roles))
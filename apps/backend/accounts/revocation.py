@@ -0,0 +1,228 @@
+"""
+Revocation of refresh tokens.
+
+A revoked token's ``jti`` is stored in the cache until the token would have
+expired anyway, so the store never outgrows the set of live tokens and
+nothing touches the database.
+
+Each process also keeps a bloom filter of revoked ``jti`` values. A negative
+answer from the filter is definitive, so a live token is accepted after a
+single cache read (the revocation sequence); only filter hits are confirmed
+against the cache entry. The filter is kept in sync through a revocation
+log: every revocation is appended under an increasing sequence number and
+processes fold in the entries they have not seen yet.
+
+``purge()`` (run periodically by ``accounts.tasks.purge_revoked_tokens``)
+advances the log floor past expired entries. It rebuilds the filter from
+the remaining log itself and publishes it as a snapshot, so a process that
+sees the new floor loads the snapshot and reads only the entries logged
+after it instead of re-reading the whole log on the request path.
+
+The cache must not evict entries before their timeout (Redis
+``maxmemory-policy`` ``noeviction`` or ``volatile-ttl``); an evicted entry
+is a forgotten revocation.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.core.cache import cache
+
+SEQ_KEY = 'accounts:revocation:seq'
+FLOOR_KEY = 'accounts:revocation:floor'
+SNAPSHOT_KEY = 'accounts:revocation:snapshot'
+BLOOM_CAPACITY = 100_000
+BLOOM_ERROR_RATE = 0.01
+# purge() never moves the floor into the newest entries, whose log writes
+# may still be in flight.
+PURGE_MARGIN = 100
+
+
+def _jti_key(jti):
+    return f'accounts:revoked:{jti}'
+
+
+def _log_key(seq):
+    return f'accounts:revocation:log:{seq}'
+
+
+def _read_log(seqs, batch=1000):
+    """Return ``{seq: (jti, exp)}`` for the log entries still present."""
+    seqs = list(seqs)
+    entries = {}
+    for i in range(0, len(seqs), batch):
+        keys = {_log_key(n): n for n in seqs[i:i + batch]}
+        entries.update({keys[k]: v for k, v in cache.get_many(list(keys)).items()})
+    return entries
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class RevocationFilter:
+    """Process-local bloom filter following the shared revocation log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(floor=0)
+
+    def _reset(self, floor, capacity=BLOOM_CAPACITY):
+        self.bloom = BloomFilter(capacity)
+        self.floor = floor
+        self.seen = floor
+        # Sequence numbers taken by revoke() whose log entry was not written
+        # yet when we synced; retried until they appear or fall below the floor.
+        self.pending = set()
+
+    def snapshot(self):
+        """Return the filter's state as a picklable dict, as ``purge()`` publishes it."""
+        with self._lock:
+            return {
+                'floor': self.floor,
+                'seen': self.seen,
+                'pending': set(self.pending),
+                'capacity': self.bloom.capacity,
+                'count': self.bloom.count,
+                'bits': bytes(self.bloom.bits),
+            }
+
+    def _restore(self, snapshot):
+        self.bloom = BloomFilter(snapshot['capacity'])
+        self.bloom.bits = bytearray(snapshot['bits'])
+        self.bloom.count = snapshot['count']
+        self.floor = snapshot['floor']
+        self.seen = snapshot['seen']
+        self.pending = set(snapshot['pending'])
+
+    def sync(self):
+        """Fold in revocations logged since the last sync."""
+        state = cache.get_many([SEQ_KEY, FLOOR_KEY])
+        seq = state.get(SEQ_KEY, 0)
+        floor = state.get(FLOOR_KEY, 0)
+        with self._lock:
+            if floor != self.floor or seq < self.seen:
+                # Purged: start from purge()'s snapshot. Without a usable one
+                # (evicted, or the cache was reset) rebuild from the floor.
+                snapshot = cache.get(SNAPSHOT_KEY)
+                if snapshot and snapshot['floor'] == floor and snapshot['seen'] <= seq:
+                    self._restore(snapshot)
+                else:
+                    self._reset(floor)
+            self._fold(floor, seq)
+
+    def _fold(self, floor, seq):
+        # Called with the lock held.
+        if seq == self.seen and not self.pending:
+            return
+        wanted = self.pending | set(range(self.seen + 1, seq + 1))
+        if self.bloom.count + len(wanted) > self.bloom.capacity:
+            capacity = self.bloom.capacity
+            while self.bloom.count + len(wanted) > capacity:
+                capacity *= 2
+            self._reset(floor, capacity)
+            wanted = set(range(floor + 1, seq + 1))
+        entries = _read_log(sorted(wanted))
+        for jti, _ in entries.values():
+            self.bloom.add(jti)
+        self.pending = wanted - entries.keys()
+        self.seen = seq
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+
+_filter = RevocationFilter()
+
+
+def is_revoked(jti):
+    """Return True if the token ``jti`` has been revoked."""
+    if not _filter.might_contain(jti):
+        return False
+    return cache.get(_jti_key(jti)) is not None
+
+
+def revoke(jti, exp):
+    """
+    Revoke ``jti`` until ``exp`` (a UNIX timestamp).
+
+    Returns False if it was already revoked, which makes revoking on use an
+    atomic check against concurrent reuse of the same token.
+    """
+    ttl = int(exp - time.time()) + 1
+    if ttl <= 0:
+        return True
+    if not cache.add(_jti_key(jti), exp, ttl):
+        return False
+    cache.add(SEQ_KEY, 0, None)
+    try:
+        seq = cache.incr(SEQ_KEY)
+    except ValueError:
+        # The sequence was evicted between add() and incr().
+        cache.add(SEQ_KEY, 0, None)
+        seq = cache.incr(SEQ_KEY)
+    cache.set(_log_key(seq), (jti, exp), ttl)
+    return True
+
+
+def revoke_token(token):
+    """Revoke a simplejwt token; see ``revoke()``."""
+    from rest_framework_simplejwt.settings import api_settings
+
+    return revoke(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+def purge():
+    """
+    Advance the log floor past leading expired entries.
+
+    Returns the new floor. When the floor moves, the filter is rebuilt
+    here without the revocations of tokens that have expired since and
+    stored as the snapshot processes switch to.
+    """
+    state = cache.get_many([SEQ_KEY, FLOOR_KEY])
+    seq = state.get(SEQ_KEY, 0)
+    floor = state.get(FLOOR_KEY, 0)
+    limit = seq - PURGE_MARGIN
+    new_floor = floor
+    batch = 1000
+    while new_floor < limit:
+        seqs = range(new_floor + 1, min(limit, new_floor + batch) + 1)
+        alive = _read_log(seqs)
+        leading = next((n for n in seqs if n in alive), None)
+        if leading is not None:
+            new_floor = leading - 1
+            break
+        new_floor = seqs[-1]
+    if new_floor != floor:
+        rebuilt = RevocationFilter()
+        with rebuilt._lock:
+            rebuilt._reset(new_floor)
+            rebuilt._fold(new_floor, seq)
+        # The snapshot goes first: a process that sees the new floor finds it.
+        cache.set(SNAPSHOT_KEY, rebuilt.snapshot(), None)
+        cache.set(FLOOR_KEY, new_floor, None)
+    return new_floor
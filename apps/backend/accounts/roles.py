@@ -0,0 +1,80 @@
+"""
+Role resolution for permission checks.
+
+Role codes are loaded at most once per request (memoised on the user object)
+and shared between workers through the cache. Cache entries are keyed by a
+per-user permissions version that is bumped whenever the user's ``UserRole``
+rows or staff flag change, so stale entries are simply never read again.
+"""
+import time
+
+from django.core.cache import cache
+
+# Roles that grant access to back-office data.
+STAFF_ROLES = ('ADMIN', 'CONSULTANT', 'FINANCE', 'SUPPORT')
+
+ROLES_CACHE_TIMEOUT = 60 * 60 * 24
+_MEMO_ATTR = '_role_codes'
+
+
+def _version_key(user_id):
+    return f'accounts:perm-version:{user_id}'
+
+
+def _roles_key(user_id, version):
+    return f'accounts:roles:{user_id}:{version}'
+
+
+def get_permissions_version(user_id):
+    """Return the current permissions version for a user."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh value rather than 0, so that an evicted version can never
+        # collide with one that was handed out before the eviction.
+        version = time.time_ns()
+        if not cache.add(key, version, ROLES_CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_permissions_version(user_id):
+    """Invalidate cached roles for a user."""
+    cache.set(_version_key(user_id), time.time_ns(), ROLES_CACHE_TIMEOUT)
+
+
+def prime_role_codes(user, role_codes):
+    """Memoise already-known role codes on a user object for this request."""
+    # Written straight into __dict__ so lazy user wrappers are not evaluated.
+    user.__dict__[_MEMO_ATTR] = frozenset(role_codes)
+
+
+def get_role_codes(user):
+    """Return the set of role codes held by a user."""
+    memo = user.__dict__.get(_MEMO_ATTR)
+    if memo is not None:
+        return memo
+
+    version = get_permissions_version(user.pk)
+    key = _roles_key(user.pk, version)
+    codes = cache.get(key)
+    if codes is None:
+        from .models import UserRole
+
+        codes = frozenset(
+            UserRole.objects.filter(user_id=user.pk).values_list('role__code', flat=True)
+        )
+        cache.set(key, codes, ROLES_CACHE_TIMEOUT)
+
+    prime_role_codes(user, codes)
+    return user.__dict__[_MEMO_ATTR]
+
+
+def has_any_role(user, role_codes):
+    """Return True if the user holds at least one of the given roles."""
+    return not get_role_codes(user).isdisjoint(role_codes)
+
+
+def is_staff_member(user, role_codes=STAFF_ROLES):
+    """Return True for Django staff users or holders of a back-office role."""
+    return bool(user.is_staff) or has_any_role(user, role_codes)
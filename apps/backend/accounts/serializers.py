@@ -2,8 +2,20 @@
 Serializers for user authentication and profiles.
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.contrib.auth.password_validation import validate_password
-from .models import User, Role, UserRole, ClientProfile, StaffProfile
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
+from raylene import catalogs
+from . import revocation
+from .authentication import claims_are_current, stamp_claims
+from .models import User, Role, UserRole, ClientProfile, StaffProfile, AuditLog
+from .roles import get_role_codes
+from .touch import touch_last_login
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -18,7 +30,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_roles(self, obj):
         """Get user roles."""
-        return [ur.role.code for ur in obj.user_roles.select_related('role')]
+        return sorted(get_role_codes(obj))
 
 
 class ClientProfileSerializer(serializers.ModelSerializer):
@@ -86,7 +98,7 @@ class RegistrationSerializer(serializers.ModelSerializer):
         )
         
         # Assign CLIENT role
-        role = Role.objects.get(code='CLIENT')
+        role = catalogs.ROLES.get('CLIENT', 'code') or Role.objects.get(code='CLIENT')
         UserRole.objects.create(user=user, role=role)
         
         return user
@@ -121,6 +133,41 @@ class ChangePasswordSerializer(serializers.Serializer):
         return user
 
 
+class SetPasswordSerializer(serializers.Serializer):
+    """Serializer for setting a password from an emailed set-password link."""
+    uid = serializers.CharField()
+    token = serializers.CharField()
+    new_password = serializers.CharField()
+    new_password_confirm = serializers.CharField()
+
+    def validate(self, attrs):
+        """Validate the link and the new password."""
+        try:
+            user_id = force_str(urlsafe_base64_decode(attrs['uid']))
+            user = User.objects.get(pk=user_id, is_active=True)
+        except (TypeError, ValueError, OverflowError, DjangoValidationError, User.DoesNotExist):
+            user = None
+        if user is None or not default_token_generator.check_token(user, attrs['token']):
+            raise serializers.ValidationError({'token': 'This link is invalid or has expired.'})
+        if attrs['new_password'] != attrs['new_password_confirm']:
+            raise serializers.ValidationError({
+                'new_password': 'New passwords do not match.'
+            })
+        try:
+            validate_password(attrs['new_password'], user)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'new_password': exc.messages})
+        attrs['user'] = user
+        return attrs
+
+    def save(self):
+        """Update user password."""
+        user = self.validated_data['user']
+        user.set_password(self.validated_data['new_password'])
+        user.save(update_fields=['password'])
+        return user
+
+
 class TwoFASetupSerializer(serializers.Serializer):
     """Serializer for 2FA setup."""
     secret = serializers.CharField(read_only=True)
@@ -137,3 +184,74 @@ class TwoFAVerifySerializer(serializers.Serializer):
             raise serializers.ValidationError('Code must be 6 digits.')
         return value
 
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """Read-only serializer for audit trail entries."""
+    actor = serializers.UUIDField(source='actor_id', read_only=True)
+    actor_email = serializers.EmailField(source='actor.email', read_only=True, default=None)
+
+    class Meta:
+        model = AuditLog
+        fields = ['id', 'action', 'entity_type', 'entity_id', 'actor', 'actor_email',
+                  'meta', 'ip_address', 'user_agent', 'created_at']
+        read_only_fields = fields
+
+
+class ClientImportSerializer(serializers.Serializer):
+    """Upload for a bulk client import."""
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'ndjson'], required=False)
+    send_invites = serializers.BooleanField(default=False)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair serializer that embeds staff flag and roles as claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        return stamp_claims(super().get_token(user), user)
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # last_login is written behind instead of on the request path.
+        touch_last_login(self.user)
+        return data
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that re-stamps permission claims when outdated.
+
+    Rotated refresh tokens are revoked through ``accounts.revocation``
+    instead of the simplejwt blacklist app, so refreshing does not touch
+    the database.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION:
+            # Revoking is atomic and fails for a token that is already
+            # revoked, so it doubles as the check: a concurrent refresh with
+            # the same token loses.
+            if not revocation.revoke_token(refresh):
+                raise InvalidToken('Token has been revoked.')
+        elif revocation.is_revoked(refresh[jwt_settings.JTI_CLAIM]):
+            raise InvalidToken('Token has been revoked.')
+
+        if not claims_are_current(refresh):
+            user_id = refresh.get(jwt_settings.USER_ID_CLAIM)
+            user = User.objects.filter(pk=user_id, is_active=True).first()
+            if user is None:
+                raise InvalidToken('User not found or inactive.')
+            stamp_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
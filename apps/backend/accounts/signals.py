@@ -0,0 +1,38 @@
+"""
+Signal handlers for accounts app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from raylene import catalogs
+
+from .models import Role, User, UserRole
+from .roles import bump_permissions_version
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_user_roles(sender, instance, **kwargs):
+    """Drop cached role codes when a role assignment changes."""
+    bump_permissions_version(instance.user_id)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def refresh_role_catalog(sender, using, **kwargs):
+    """Reload every worker's role snapshot."""
+    catalogs.ROLES.bump(using)
+
+
+# Fields whose change must invalidate roles cached or embedded in tokens.
+PERMISSION_FIELDS = {'is_active', 'is_staff', 'is_superuser'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_permissions(sender, instance, created, update_fields=None, **kwargs):
+    """Drop cached permissions when a user's staff or active flags may have changed."""
+    if created:
+        return
+    if update_fields is not None and not PERMISSION_FIELDS.intersection(update_fields):
+        return
+    bump_permissions_version(instance.pk)
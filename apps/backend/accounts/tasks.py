@@ -0,0 +1,62 @@
+"""
+Celery tasks for accounts app.
+"""
+from celery import shared_task
+
+from .models import AuditLog
+
+
+@shared_task(ignore_result=True)
+def write_audit_logs(entries):
+    """Insert a committed batch of audit entries."""
+    from .audit import deserialize_entry
+
+    AuditLog.objects.bulk_create([deserialize_entry(data) for data in entries], ignore_conflicts=True)
+
+
+@shared_task(ignore_result=True)
+def maintain_audit_partitions():
+    """Create upcoming audit partitions and archive expired months."""
+    from django.conf import settings
+
+    from . import partitions
+
+    partitions.ensure_partitions()
+    for month in partitions.archivable_months(settings.AUDIT_RETENTION_MONTHS):
+        partitions.archive_month(month)
+
+
+@shared_task(ignore_result=True)
+def purge_revoked_tokens():
+    """Drop expired refresh-token revocations from the revocation filters."""
+    from . import revocation
+
+    revocation.purge()
+
+
+@shared_task(ignore_result=True)
+def send_set_password_emails(user_ids):
+    """Email set-password links to imported users over one SMTP connection."""
+    from django.conf import settings
+    from django.contrib.auth.tokens import default_token_generator
+    from django.core.mail import EmailMessage, get_connection
+    from django.utils.encoding import force_bytes
+    from django.utils.http import urlsafe_base64_encode
+
+    from .models import User
+
+    messages = []
+    for user in User.objects.filter(pk__in=user_ids, is_active=True):
+        if user.has_usable_password():
+            continue
+        url = settings.SET_PASSWORD_URL.format(
+            uid=urlsafe_base64_encode(force_bytes(user.pk)),
+            token=default_token_generator.make_token(user),
+        )
+        messages.append(EmailMessage(
+            subject='Set your Raylene Immigration password',
+            body=f'An account has been created for you. Choose a password here:\n\n{url}\n',
+            to=[user.email],
+        ))
+    if messages:
+        get_connection().send_messages(messages)
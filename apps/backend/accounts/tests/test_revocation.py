@@ -0,0 +1,78 @@
+"""
+Refresh-token revocation: the cache store, the bloom filter and the refresh endpoint.
+"""
+import time
+
+import pytest
+from django.core.cache import cache
+
+from accounts import revocation
+from accounts.serializers import ClaimsTokenObtainPairSerializer
+
+
+def test_revoke_is_a_one_time_check():
+    exp = time.time() + 60
+    assert not revocation.is_revoked('jti-1')
+    assert revocation.revoke('jti-1', exp) is True
+    assert revocation.revoke('jti-1', exp) is False
+    assert revocation.is_revoked('jti-1')
+    assert not revocation.is_revoked('jti-2')
+
+
+def test_another_process_filter_follows_the_log():
+    other = revocation.RevocationFilter()
+    assert not other.might_contain('jti-3')
+
+    revocation.revoke('jti-3', time.time() + 60)
+
+    assert other.might_contain('jti-3')
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = revocation.BloomFilter(capacity=500)
+    for n in range(500):
+        bloom.add(f'in-{n}')
+    assert all(f'in-{n}' in bloom for n in range(500))
+    false_positives = sum(f'out-{n}' in bloom for n in range(5000))
+    assert false_positives < 5000 * 0.05
+
+
+def test_purge_publishes_a_snapshot_without_expired_entries(monkeypatch):
+    for n in range(revocation.PURGE_MARGIN + 20):
+        revocation.revoke(f'live-{n}', time.time() + 600)
+    # Expire the first ten log entries.
+    for seq in range(1, 11):
+        cache.delete(revocation._log_key(seq))
+    process = revocation.RevocationFilter()
+    process.sync()
+
+    floor = revocation.purge()
+
+    assert floor == 10
+    snapshot = cache.get(revocation.SNAPSHOT_KEY)
+    assert snapshot['floor'] == floor and snapshot['seen'] == cache.get(revocation.SEQ_KEY)
+
+    read = []
+    real_read_log = revocation._read_log
+    monkeypatch.setattr(revocation, '_read_log', lambda seqs, batch=1000: read.append(list(seqs)) or real_read_log(seqs, batch))
+    revocation.revoke('after-purge', time.time() + 600)
+
+    assert process.might_contain('after-purge')
+    assert process.might_contain(f'live-{revocation.PURGE_MARGIN + 19}')
+    assert process.floor == floor
+    # Only the entry logged after the snapshot was read.
+    assert read == [[snapshot['seen'] + 1]]
+
+
+@pytest.mark.django_db
+def test_a_rotated_refresh_token_cannot_be_reused(api, client_user):
+    serializer = ClaimsTokenObtainPairSerializer(data={'email': client_user.email, 'password': 'client-password'})
+    serializer.is_valid(raise_exception=True)
+    refresh = serializer.validated_data['refresh']
+
+    first = api.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+    reused = api.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+
+    assert first.status_code == 200
+    assert reused.status_code == 401
+    assert api.post('/api/auth/refresh/', {'refresh': first.data['refresh']}, format='json').status_code == 200
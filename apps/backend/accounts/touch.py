@@ -0,0 +1,104 @@
+"""
+Write-behind buffer for hot-row timestamp updates.
+
+Timestamps such as ``User.last_login`` are recorded in process memory and
+written in the background with one ``bulk_update`` per model/field every
+``TOUCH_FLUSH_INTERVAL`` seconds, so request paths never write the row.
+Only the newest timestamp per row is kept. Pending values are flushed on
+interpreter exit; a crash loses at most one interval of touches.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class TouchBuffer:
+    """Coalesces timestamp updates and flushes them in batches."""
+
+    def __init__(self, interval=None, batch_size=500):
+        self._interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = defaultdict(dict)
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, 'TOUCH_FLUSH_INTERVAL', 30)
+
+    def touch(self, model, pk, field, value):
+        """Record that ``model(pk).field`` should become ``value``."""
+        if self.interval <= 0:
+            # Buffering disabled: write through.
+            model._default_manager.filter(pk=pk).update(**{field: value})
+            return
+
+        with self._lock:
+            rows = self._pending[(model, field)]
+            current = rows.get(pk)
+            if current is None or value > current:
+                rows[pk] = value
+        self._ensure_flusher()
+
+    def flush(self):
+        """Write all pending values. Returns the number of rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(dict)
+
+        written = 0
+        for (model, field), rows in pending.items():
+            objs = [model(pk=pk, **{field: value}) for pk, value in rows.items()]
+            try:
+                written += model._default_manager.bulk_update(objs, [field], batch_size=self.batch_size)
+            except Exception:
+                logger.exception('Failed to flush %d %s.%s touches', len(objs), model.__name__, field)
+        return written
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='touch-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                # Connections are per thread; don't keep one open between flushes.
+                connections.close_all()
+
+    def stop(self):
+        """Stop the background flusher and write what is left."""
+        self._stopped.set()
+        self.flush()
+
+
+buffer = TouchBuffer()
+atexit.register(buffer.stop)
+
+
+def touch(model, pk, field, value):
+    """Schedule a write-behind update of one timestamp column."""
+    buffer.touch(model, pk, field, value)
+
+
+def touch_last_login(user, when=None):
+    """Record a login without writing the users row on the request path."""
+    from django.utils import timezone
+
+    when = when or timezone.now()
+    user.last_login = when
+    touch(type(user), user.pk, 'last_login', when)
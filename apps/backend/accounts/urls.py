@@ -4,7 +4,7 @@ URLs for authentication and user management.
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
-    RegisterView, MeView, change_password, verify_2fa, setup_2fa,
+    RegisterView, MeView, change_password, set_password, verify_2fa, setup_2fa,
     CustomTokenObtainPairView
 )
 
@@ -19,6 +19,7 @@ urlpatterns = [
     # User profile
     path('', MeView.as_view(), name='me'),
     path('change-password/', change_password, name='change-password'),
+    path('set-password/', set_password, name='set-password'),
     
     # 2FA
     path('2fa/setup/', setup_2fa, name='2fa-setup'),
@@ -1,17 +1,32 @@
 """
 Views for authentication and user management.
 """
+import datetime
+import io
+import uuid
+from itertools import islice
+
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils import timezone
+from raylene.pagination import KeysetPagination
+from raylene.query_budget import QueryBudgetMixin
+from . import audit, importer
+from .partitions import as_audit_logs, iter_archived
+from .permissions import IsStaffMember
 from .serializers import (
     UserSerializer, RegistrationSerializer, ChangePasswordSerializer,
-    ClientProfileSerializer, StaffProfileSerializer, TwoFASetupSerializer, TwoFAVerifySerializer
+    ClientProfileSerializer, StaffProfileSerializer, TwoFASetupSerializer, TwoFAVerifySerializer,
+    AuditLogSerializer, SetPasswordSerializer, ClientImportSerializer
 )
-from .models import ClientProfile, StaffProfile
+from .models import ClientProfile, StaffProfile, AuditLog
 
 User = get_user_model()
 
@@ -66,6 +81,201 @@ class MeView(generics.RetrieveUpdateAPIView):
         return Response(serializer.data)
 
 
+def parse_audit_filters(params, require_subject=True):
+    """
+    Return the audit log filters in query ``params`` as ``iter_archived()`` arguments.
+
+    ``entity_type`` + ``entity_id`` or ``actor`` is required unless
+    ``require_subject`` is False. Raises ``ValidationError`` on bad input.
+    """
+    entity_type = params.get('entity_type') or None
+    entity_id = params.get('entity_id') or None
+    actor = params.get('actor') or None
+    if bool(entity_type) != bool(entity_id):
+        raise ValidationError({'entity_id': 'entity_type and entity_id must be given together.'})
+    if require_subject and not (entity_id or actor):
+        raise ValidationError({'detail': 'Provide entity_type and entity_id, or actor.'})
+    return {
+        'entity_type': entity_type,
+        'entity_id': uuid_param('entity_id', entity_id) if entity_id else None,
+        'actor_id': uuid_param('actor', actor) if actor else None,
+        'action': params.get('action') or None,
+        'since': datetime_param('since', params['since']) if params.get('since') else None,
+        'until': datetime_param('until', params['until']) if params.get('until') else None,
+    }
+
+
+def uuid_param(name, value):
+    """Parse query parameter ``name`` as a UUID."""
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be a valid UUID.'})
+
+
+def datetime_param(name, value):
+    """Parse query parameter ``name`` as an ISO date or datetime (made aware)."""
+    try:
+        parsed = parse_datetime(value)
+        day = parse_date(value) if parsed is None else None
+    except ValueError:
+        parsed = day = None
+    if parsed is None:
+        if day is None:
+            raise ValidationError({name: 'Must be an ISO date or datetime.'})
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class AuditLogPagination(KeysetPagination):
+    """
+    Keyset pagination that can continue into the archive files.
+
+    With ``?include_archive=true``, a page that runs out of hot rows is
+    filled from ``iter_archived()`` (newest first, same filters) and its
+    ``next`` cursor is marked as an archive cursor, so later pages read
+    only the archive. Archived entries load their actors in one query.
+    """
+    archive_query_param = 'include_archive'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.archived = 0
+        value = request.query_params.get(self.archive_query_param)
+        if value not in (None, '', 'true', 'false'):
+            raise ValidationError({self.archive_query_param: 'Use true or false.'})
+        if value != 'true':
+            return super().paginate_queryset(queryset, request, view)
+
+        cursor = self.decode_cursor(request)
+        after = self.archive_position(cursor) if cursor else None
+        if cursor and cursor.get('archive'):
+            self.request = request
+            self.page_size = self.get_page_size(request)
+            self.field, self.descending = 'created_at', True
+            self.count = self.count_exact = None
+            self.last_position = None
+            rows = []
+        else:
+            rows = super().paginate_queryset(queryset, request, view)
+            if self.has_next:
+                return rows
+            if rows:
+                after = self.archive_position(self.position_of(rows[-1]))
+
+        entries = list(islice(
+            iter_archived(**view.get_filters(), after=after), self.page_size - len(rows) + 1,
+        ))
+        self.has_next = len(entries) > self.page_size - len(rows)
+        archived = as_audit_logs(entries[:self.page_size - len(rows)])
+        self.archived = len(archived)
+        if archived:
+            self.last_position = {**self.position_of(archived[-1]), 'archive': True}
+        return rows + archived
+
+    def archive_position(self, cursor):
+        """Return a cursor's position as the ``(created_at, id)`` tuple ``iter_archived()`` takes."""
+        try:
+            created_at = parse_datetime(cursor['v'])
+            pk = uuid.UUID(str(cursor['id']))
+        except (TypeError, ValueError):
+            created_at = None
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {'name': self.archive_query_param, 'required': False, 'in': 'query',
+             'description': 'Continue into archived months once the hot rows run out.',
+             'schema': {'type': 'boolean'}},
+        ]
+
+
+class AuditLogListView(QueryBudgetMixin, generics.ListAPIView):
+    """
+    Audit trail for an entity or an actor, newest first.
+
+    Filter with ``entity_type`` + ``entity_id`` or ``actor``, plus optional
+    ``action``, ``since`` and ``until`` (ISO date or datetime; ``until`` is
+    exclusive). Pages are keyset-paginated on ``(created_at, id)``: follow the
+    ``next`` link; no total count is returned. Archived months are left out
+    unless ``include_archive=true`` (see ``AuditLogPagination``).
+    """
+    serializer_class = AuditLogSerializer
+    permission_classes = [IsStaffMember]
+    pagination_class = AuditLogPagination
+    staff_roles = ['ADMIN']
+    keyset_ordering = '-created_at'
+    query_budget = {'get': 1}
+
+    def get_filters(self):
+        if not hasattr(self, '_filters'):
+            self._filters = parse_audit_filters(self.request.query_params)
+        return self._filters
+
+    def get_queryset(self):
+        filters = self.get_filters()
+        queryset = AuditLog.objects.select_related('actor')
+        if filters['entity_id']:
+            queryset = queryset.filter(entity_type=filters['entity_type'], entity_id=filters['entity_id'])
+        if filters['actor_id']:
+            queryset = queryset.filter(actor_id=filters['actor_id'])
+        if filters['action']:
+            queryset = queryset.filter(action=filters['action'])
+        if filters['since']:
+            queryset = queryset.filter(created_at__gte=filters['since'])
+        if filters['until']:
+            queryset = queryset.filter(created_at__lt=filters['until'])
+        return queryset
+
+    def get_query_budget(self):
+        budget = super().get_query_budget()
+        # Archived entries load their actors in one more query.
+        if budget is not None and getattr(self.paginator, 'archived', 0):
+            budget += 1
+        return budget
+
+
+class ClientImportView(generics.GenericAPIView):
+    """
+    Bulk-create client accounts from an uploaded CSV or NDJSON file.
+
+    The file is streamed and imported in chunks (see ``accounts.importer``).
+    Rows that fail validation are listed in ``errors`` with their line
+    number; the remaining rows are still imported.
+    """
+    serializer_class = ClientImportSerializer
+    permission_classes = [IsStaffMember]
+    parser_classes = [MultiPartParser]
+    staff_roles = ['ADMIN']
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        fmt = serializer.validated_data.get('format') or importer.format_for(upload.name)
+
+        with io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='') as fh:
+            result = importer.import_clients(
+                importer.read_records(fh, fmt),
+                workers=settings.IMPORT_HASH_WORKERS,
+                send_invites=serializer.validated_data['send_invites'],
+            )
+        audit.record(
+            'IMPORT_CLIENTS', 'ClientImport', uuid.uuid4(),
+            meta={'file': upload.name, 'created': result.created, 'failed': len(result.errors)},
+            request=request,
+        )
+        return Response({
+            'created': result.created,
+            'failed': len(result.errors),
+            'invited': len(result.invited),
+            'errors': result.errors,
+        }, status=status.HTTP_201_CREATED if result.created else status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def change_password(request):
@@ -76,6 +286,16 @@ def change_password(request):
     return Response({'message': 'Password changed successfully.'})
 
 
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def set_password(request):
+    """Set a password from an emailed set-password link (uid + token)."""
+    serializer = SetPasswordSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response({'message': 'Password set successfully.'})
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def verify_2fa(request):
@@ -95,17 +315,12 @@ def setup_2fa(request):
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
-    """Custom JWT token obtain view with last_login update."""
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        if response.status_code == 200:
-            # Update last_login
-            from rest_framework_simplejwt.tokens import RefreshToken
-            refresh = RefreshToken(request.data.get('refresh'))
-            user = User.objects.get(id=refresh.payload['user_id'])
-            user.last_login = timezone.now()
-            user.save(update_fields=['last_login'])
-        return response
+    """
+    Custom JWT token obtain view.
+
+    The serializer authenticates the user once and records last_login through
+    the write-behind touch buffer, so login performs no writes.
+    """
 
 
 # Re-export JWT views with custom names
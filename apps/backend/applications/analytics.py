@@ -0,0 +1,187 @@
+"""
+Time-in-status analytics.
+
+``StatusHistory`` rows are transitions. An application is in a status from
+the transition into it until its next transition. ``intervals()`` derives
+these intervals with window functions (LAG over each application's
+history). ``rollup()`` folds them into ``StatusDurationRollup``, one row
+per local day, status and application type.
+
+``rollup()`` is incremental. The ``created_at`` of the newest transition
+it has processed is kept as a watermark in a ``JobCheckpoint``. Each run
+recomputes only the days from the watermark's day onwards, from the
+history of applications that moved since then. Transitions inserted with
+a ``created_at`` before the watermark (backfills) need a ``full`` run.
+
+Rollup rows carry exact daily percentiles and a log-scale histogram
+(buckets 5% wide). ``summarize()`` merges the histograms, so percentiles
+over any date range come from the rollup alone, within 5%.
+"""
+import datetime
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max, Window
+from django.db.models.functions import Lag
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import JobCheckpoint
+
+from .models import StatusDurationRollup, StatusHistory
+
+CHECKPOINT = 'applications.status_duration_rollup'
+BUCKET_GROWTH = 1.05
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_of(seconds):
+    """Histogram bucket of a duration; bucket ``n`` ends at ``BUCKET_GROWTH ** n``."""
+    if seconds < 1:
+        return 0
+    return math.ceil(math.log(seconds) / math.log(BUCKET_GROWTH))
+
+
+def bucket_value(index):
+    return 0.0 if index <= 0 else BUCKET_GROWTH ** index
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def histogram_percentile(histogram, pct):
+    """Nearest-rank percentile (bucket upper bound) of a ``{bucket: count}`` histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * total))
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return bucket_value(index)
+    return bucket_value(max(histogram))
+
+
+def intervals(since=None):
+    """
+    Yield ``(ended_at, status, application_type_id, seconds)`` for closed intervals.
+
+    With ``since``, only intervals ending at or after it are yielded, and
+    only applications with transitions since then are read.
+    """
+    history = StatusHistory.objects.order_by()
+    if since is not None:
+        history = history.filter(
+            application_id__in=StatusHistory.objects.filter(created_at__gte=since).values('application_id')
+        )
+    window = {
+        'partition_by': [F('application_id')],
+        'order_by': [F('created_at').asc(), F('id').asc()],
+    }
+    rows = history.annotate(
+        previous_status=Window(Lag('to_status'), **window),
+        started_at=Window(Lag('created_at'), **window),
+    ).values_list('created_at', 'previous_status', 'started_at', 'application__application_type_id')
+    for ended_at, status, started_at, type_id in rows.iterator(chunk_size=2000):
+        if started_at is None or (since is not None and ended_at < since):
+            continue
+        yield ended_at, status, type_id, (ended_at - started_at).total_seconds()
+
+
+def _rollup_row(day, status, type_id, durations):
+    durations.sort()
+    histogram = Counter(bucket_of(seconds) for seconds in durations)
+    return StatusDurationRollup(
+        day=day,
+        status=status,
+        application_type_id=type_id,
+        intervals=len(durations),
+        total_seconds=sum(durations),
+        p50_seconds=percentile(durations, 50),
+        p90_seconds=percentile(durations, 90),
+        p99_seconds=percentile(durations, 99),
+        histogram={str(index): count for index, count in sorted(histogram.items())},
+    )
+
+
+def rollup(full=False):
+    """
+    Bring ``StatusDurationRollup`` up to date; return the number of rows written.
+
+    ``full`` rebuilds every day from the whole history.
+    """
+    with transaction.atomic():
+        JobCheckpoint.objects.get_or_create(name=CHECKPOINT)
+        # Serializes concurrent runs.
+        checkpoint = JobCheckpoint.objects.select_for_update().get(name=CHECKPOINT)
+        watermark = None if full or not checkpoint.position else parse_datetime(checkpoint.position)
+        latest = StatusHistory.objects.aggregate(latest=Max('created_at'))['latest']
+        if latest is None or (watermark is not None and latest <= watermark):
+            return 0
+
+        since = None
+        if watermark is not None:
+            since = timezone.make_aware(
+                datetime.datetime.combine(timezone.localdate(watermark), datetime.time.min)
+            )
+        groups = defaultdict(list)
+        for ended_at, status, type_id, seconds in intervals(since):
+            # Transitions committed during this run are picked up by the next.
+            if ended_at <= latest:
+                groups[(timezone.localdate(ended_at), status, type_id)].append(seconds)
+
+        stale = StatusDurationRollup.objects.all()
+        if since is not None:
+            stale = stale.filter(day__gte=since.date())
+        stale.delete()
+        rows = StatusDurationRollup.objects.bulk_create(
+            _rollup_row(day, status, type_id, durations)
+            for (day, status, type_id), durations in groups.items()
+        )
+        checkpoint.position = latest.isoformat()
+        checkpoint.save(update_fields=['position', 'updated_at'])
+    return len(rows)
+
+
+def summarize(rollups):
+    """
+    Merge rollup rows per (status, application type).
+
+    Returns dicts with interval counts, mean and p50/p90/p99 seconds.
+    """
+    merged = {}
+    for row in rollups:
+        entry = merged.setdefault((row.status, row.application_type_id), {
+            'intervals': 0, 'total_seconds': 0.0, 'histogram': Counter(),
+        })
+        entry['intervals'] += row.intervals
+        entry['total_seconds'] += row.total_seconds
+        entry['histogram'].update({int(index): count for index, count in row.histogram.items()})
+
+    results = []
+    for (status, type_id), entry in sorted(merged.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        result = {
+            'status': status,
+            'application_type': type_id,
+            'intervals': entry['intervals'],
+            'mean_seconds': round(entry['total_seconds'] / entry['intervals'], 1) if entry['intervals'] else 0.0,
+        }
+        for pct in PERCENTILES:
+            result[f'p{pct}_seconds'] = round(histogram_percentile(entry['histogram'], pct), 1)
+        results.append(result)
+    return results
+
+
+def watermark():
+    """Return the newest transition folded into the rollup, or None."""
+    position = (
+        JobCheckpoint.objects.filter(name=CHECKPOINT).values_list('position', flat=True).first()
+    )
+    return parse_datetime(position) if position else None
@@ -1,7 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_triggers(sender, using, **kwargs):
+    from .search import ensure_sqlite_triggers
+
+    ensure_sqlite_triggers(using)
 
 
 class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
 
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(ensure_search_triggers, sender=self)
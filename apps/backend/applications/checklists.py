@@ -0,0 +1,163 @@
+"""
+Application document checklists.
+
+``ApplicationChecklist`` holds, per application, how many of the document
+types listed in its type's ``doc_requirements`` are approved, pending
+review or missing. Codes are compared case-insensitively with
+``DocumentType.code``.
+
+``refresh()`` recomputes the checklists of a set of applications from
+their documents in three queries however many are passed. The signal
+handlers call it in the writer's transaction when a document is created,
+reviewed, moved or deleted and when an application is created or changes
+type; a change to a type's ``doc_requirements`` refreshes that type's
+applications in the background (``refresh_type()``). ``rebuild()`` is the
+fix for any drift, e.g. after ``loaddata`` or raw SQL.
+"""
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from django.db import router, transaction
+from django.db.models import F
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from documents.models import Document
+
+from .models import Application, ApplicationChecklist
+
+logger = logging.getLogger(__name__)
+
+APPROVED_STATUSES = ('APPROVED',)
+PENDING_STATUSES = ('RECEIVED', 'REVIEWING')
+BATCH_SIZE = 500
+VALUE_FIELDS = ['required_count', 'approved_count', 'pending_count', 'missing_count',
+                'missing_codes', 'completeness']
+
+
+def normalize(codes):
+    """Return the distinct upper-cased codes of a ``doc_requirements`` list, in order."""
+    return list(dict.fromkeys(str(code).strip().upper() for code in codes or () if str(code).strip()))
+
+
+def evaluate(requirements, statuses):
+    """
+    Return checklist values for ``requirements`` given ``{code: {document statuses}}``.
+
+    A rejected or re-upload document leaves its type missing.
+    """
+    required = normalize(requirements)
+    approved = pending = 0
+    missing = []
+    for code in required:
+        found = statuses.get(code, ())
+        if any(status in APPROVED_STATUSES for status in found):
+            approved += 1
+        elif any(status in PENDING_STATUSES for status in found):
+            pending += 1
+        else:
+            missing.append(code)
+    return {
+        'required_count': len(required),
+        'approved_count': approved,
+        'pending_count': pending,
+        'missing_count': len(missing),
+        'missing_codes': missing,
+        'completeness': approved * 100 // len(required) if required else 100,
+    }
+
+
+def refresh(application_ids, using=None):
+    """Recompute and store the checklists of ``application_ids``; return how many."""
+    application_ids = {pk for pk in application_ids if pk is not None}
+    if not application_ids:
+        return 0
+    using = using or router.db_for_write(ApplicationChecklist)
+    requirements = dict(
+        Application.objects.using(using).filter(pk__in=application_ids)
+        .values_list('pk', 'application_type__doc_requirements')
+    )
+    statuses = defaultdict(lambda: defaultdict(set))
+    rows = (
+        Document.objects.using(using).filter(application_id__in=requirements)
+        .order_by().values_list('application_id', 'document_type__code', 'status').distinct()
+    )
+    for application_id, code, status in rows:
+        statuses[application_id][code.upper()].add(status)
+    ApplicationChecklist.objects.using(using).bulk_create(
+        [
+            ApplicationChecklist(application_id=pk, **evaluate(required, statuses[pk]))
+            for pk, required in requirements.items()
+        ],
+        update_conflicts=True, unique_fields=['application'],
+        update_fields=[*VALUE_FIELDS, 'updated_at'],
+    )
+    return len(requirements)
+
+
+def _refresh_in_batches(queryset, using):
+    ids = queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=BATCH_SIZE)
+    total = 0
+    while batch := list(islice(ids, BATCH_SIZE)):
+        with transaction.atomic(using=using):
+            total += refresh(batch, using)
+    return total
+
+
+def refresh_type(application_type_id, using=None):
+    """Recompute the checklists of every application of one type; return how many."""
+    using = using or router.db_for_write(ApplicationChecklist)
+    return _refresh_in_batches(
+        Application.objects.using(using).filter(application_type_id=application_type_id), using,
+    )
+
+
+def queue_type_refresh(application_type_id, using=None):
+    """Refresh a type's checklists in the background once the transaction commits."""
+    transaction.on_commit(lambda: _queue_type_refresh(application_type_id, using), using=using)
+
+
+def _queue_type_refresh(application_type_id, using):
+    from .tasks import refresh_type_checklists
+
+    try:
+        refresh_type_checklists.delay(str(application_type_id), using)
+    except Exception:
+        logger.exception('Could not queue the checklist refresh of type %s; running it now',
+                         application_type_id)
+        refresh_type(application_type_id, using)
+
+
+def rebuild(using=None):
+    """Recompute every checklist; return how many were written."""
+    using = using or router.db_for_write(ApplicationChecklist)
+    return _refresh_in_batches(Application.objects.using(using), using)
+
+
+class ChecklistFilter(filters.BaseFilterBackend):
+    """
+    Application list filters on the document checklist.
+
+    ``?complete=true`` keeps applications with every required document
+    approved, ``?complete=false`` the others, and ``?completeness_below=N``
+    those under N percent. Rows are annotated with ``completeness`` so that
+    ``?ordering=completeness`` sorts on the checklist index.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = queryset.annotate(completeness=F('checklist__completeness'))
+        complete = request.query_params.get('complete')
+        if complete:
+            if complete not in ('true', 'false'):
+                raise ValidationError({'complete': 'Use true or false.'})
+            lookup = 'checklist__completeness' if complete == 'true' else 'checklist__completeness__lt'
+            queryset = queryset.filter(**{lookup: 100})
+        below = request.query_params.get('completeness_below')
+        if below:
+            try:
+                below = int(below)
+            except ValueError:
+                raise ValidationError({'completeness_below': 'Must be a whole number.'})
+            queryset = queryset.filter(checklist__completeness__lt=below)
+        return queryset
@@ -0,0 +1,158 @@
+"""
+Application status counters.
+
+``ApplicationStatusCount`` holds the number of applications per
+``(status, application_type, assigned_to)``. Saves and deletes of
+``Application`` adjust it in the same transaction (see
+``applications.signals``); code writing applications in bulk with
+``QuerySet.update()`` passes its own deltas to ``apply()``.
+
+``reconcile()`` rebuilds the table from the applications table and is the
+fix for any drift, e.g. after raw SQL or ``loaddata``.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Application, ApplicationStatusCount
+
+KEY_FIELDS = ('status', 'application_type_id', 'assigned_to_id')
+DIMENSIONS = {
+    'status': 'status',
+    'application_type': 'application_type_id',
+    'assigned_to': 'assigned_to_id',
+}
+
+
+def key_of(instance):
+    return tuple(getattr(instance, name) for name in KEY_FIELDS)
+
+
+def remember(instance):
+    """Record the counter key an instance was loaded or saved with."""
+    instance._status_count_key = key_of(instance)
+
+
+def loaded_key(instance, using):
+    """Return the key the row was counted under before this save."""
+    if instance._state.adding:
+        return None
+    key = getattr(instance, '_status_count_key', None)
+    if key is None:
+        # Loaded with some key fields deferred.
+        row = (
+            Application.objects.using(using).filter(pk=instance.pk)
+            .values_list(*KEY_FIELDS).first()
+        )
+        key = tuple(row) if row else None
+    return key
+
+
+def _sort_key(key):
+    return tuple(str(part) for part in key)
+
+
+def apply(deltas, using=None):
+    """
+    Add ``{(status, application_type_id, assigned_to_id): delta}`` to the counters.
+
+    Keys are updated in a fixed order so concurrent transactions lock the
+    counter rows in the same order and cannot deadlock each other.
+    """
+    using = using or router.db_for_write(ApplicationStatusCount)
+    counts = ApplicationStatusCount.objects.using(using)
+    with transaction.atomic(using=using):
+        for key in sorted((k for k, d in deltas.items() if d), key=_sort_key):
+            delta = deltas[key]
+            lookup = dict(zip(KEY_FIELDS, key))
+            if counts.filter(**lookup).update(count=F('count') + delta):
+                continue
+            try:
+                with transaction.atomic(using=using):
+                    counts.create(count=delta, **lookup)
+            except IntegrityError:
+                # Another transaction inserted the row first.
+                counts.filter(**lookup).update(count=F('count') + delta)
+
+
+def track_save(old_key, instance, using):
+    new_key = key_of(instance)
+    if old_key != new_key:
+        deltas = Counter({new_key: 1})
+        if old_key is not None:
+            deltas[old_key] -= 1
+        apply(deltas, using)
+    remember(instance)
+
+
+def track_delete(instance, using):
+    apply({getattr(instance, '_status_count_key', None) or key_of(instance): -1}, using)
+
+
+def move_to_unassigned(user_id, using=None):
+    """Re-key a consultant's counts as unassigned (their FK is SET_NULL)."""
+    using = using or router.db_for_write(ApplicationStatusCount)
+    rows = ApplicationStatusCount.objects.using(using).filter(assigned_to_id=user_id, count__gt=0)
+    deltas = Counter()
+    for status, type_id, count in rows.values_list('status', 'application_type_id', 'count'):
+        deltas[(status, type_id, None)] += count
+    apply(deltas, using)
+
+
+def summarize(group_by=DIMENSIONS, using=None, **filters):
+    """
+    Return counts grouped by ``group_by`` (names from ``DIMENSIONS``).
+
+    ``filters`` narrow the counter rows, e.g. ``status='DOCS_PENDING'``.
+    """
+    columns = [DIMENSIONS[name] for name in group_by]
+    rows = (
+        ApplicationStatusCount.objects.using(using or 'default')
+        .filter(count__gt=0, **filters)
+        .values(*columns)
+        .annotate(total=Sum('count'))
+        .order_by(*columns)
+    )
+    return [
+        dict({name: row[DIMENSIONS[name]] for name in group_by}, count=row['total'])
+        for row in rows
+    ]
+
+
+def reconcile(using=None):
+    """
+    Rebuild the counters from the applications table.
+
+    Returns the number of keys whose count was wrong. On PostgreSQL the
+    counter table is locked first, so writers adjusting it wait and apply
+    their deltas to the rebuilt rows.
+    """
+    using = using or router.db_for_write(ApplicationStatusCount)
+    counts = ApplicationStatusCount.objects.using(using)
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {connection.ops.quote_name(ApplicationStatusCount._meta.db_table)} '
+                    'IN EXCLUSIVE MODE'
+                )
+        actual = {
+            tuple(row[name] for name in KEY_FIELDS): row['total']
+            for row in (
+                Application.objects.using(using).order_by()
+                .values(*KEY_FIELDS).annotate(total=Count('pk'))
+            )
+        }
+        stored = {
+            tuple(row[:3]): row[3]
+            for row in counts.filter(count__gt=0).values_list(*KEY_FIELDS, 'count')
+        }
+        drift = sum(1 for key in actual.keys() | stored.keys() if actual.get(key) != stored.get(key))
+        counts.all().delete()
+        counts.bulk_create(
+            ApplicationStatusCount(count=total, **dict(zip(KEY_FIELDS, key)))
+            for key, total in actual.items()
+        )
+    return drift
@@ -0,0 +1,103 @@
+"""
+Streaming application exports.
+
+``stream()`` turns a queryset into CSV or NDJSON lines. The header (CSV)
+is yielded before the query runs, so the first byte goes out at once; rows
+are read with a ``values_list()`` projection through ``.iterator()`` in
+chunks, so memory stays flat however many rows match.
+"""
+import csv
+import datetime
+import json
+import uuid
+
+from django.utils import timezone
+from rest_framework.negotiation import BaseContentNegotiation
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+# Column name -> queryset lookup.
+COLUMNS = {
+    'id': 'id',
+    'status': 'status',
+    'priority': 'priority',
+    'application_type': 'application_type__code',
+    'application_type_name': 'application_type__name',
+    'client_email': 'client__email',
+    'assigned_to_email': 'assigned_to__email',
+    'country': 'country',
+    'dha_ref': 'dha_ref',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'submitted_at': 'submitted_at',
+}
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Ignore ``Accept``: the export is not rendered by DRF, so ``text/csv``
+    must not be refused with 406. Errors use the first renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def _plain(value):
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield one tuple of ``COLUMNS`` values per application."""
+    projection = queryset.values_list(*COLUMNS.values())
+    for row in projection.iterator(chunk_size=chunk_size):
+        yield tuple(_plain(value) for value in row)
+
+
+def _lines(queryset, fmt, chunk_size):
+    names = list(COLUMNS)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        for row in rows(queryset, chunk_size):
+            yield writer.writerow(['' if value is None else value for value in row])
+    else:
+        for row in rows(queryset, chunk_size):
+            yield json.dumps(dict(zip(names, row))) + '\n'
+
+
+def stream(queryset, fmt, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export of ``queryset`` as ``fmt`` ('csv' or 'ndjson').
+
+    Lines are joined per ``chunk_size`` rows so the server writes a few
+    large blocks instead of one per row.
+    """
+    if fmt == 'csv':
+        yield csv.writer(_Echo()).writerow(list(COLUMNS))
+    batch = []
+    for line in _lines(queryset, fmt, chunk_size):
+        batch.append(line)
+        if len(batch) >= chunk_size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
@@ -0,0 +1,22 @@
+"""
+Recompute every application's document checklist.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from applications import checklists
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every application's documents to its type's requirements "
+        'and rewrite the document checklists, fixing any drift.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to rebuild.')
+
+    def handle(self, *args, **options):
+        total = checklists.rebuild(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} checklists.'))
@@ -0,0 +1,30 @@
+"""
+Re-index every application in the full-text search index.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from applications import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the application search index. Triggers keep it current on '
+        'every write; run this after restoring data or changing the indexed text.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to rebuild.')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Applications re-indexed per statement (PostgreSQL).')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_ranked(using):
+            self.stdout.write(self.style.WARNING(
+                'No search index on this database; searches use icontains.'
+            ))
+            return
+        total = search.rebuild(using=using, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} applications.'))
@@ -0,0 +1,25 @@
+"""
+Rebuild the application status counters from the applications table.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from applications import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount applications per (status, application type, assignee) and '
+        'replace the dashboard counters, fixing any drift.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to reconcile.')
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(using=options['database'])
+        if drift:
+            self.stdout.write(self.style.WARNING(f'Corrected {drift} counters.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Counters were accurate.'))
@@ -0,0 +1,23 @@
+"""
+Update the time-in-status rollup from status history.
+"""
+from django.core.management.base import BaseCommand
+
+from applications import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold status transitions recorded since the last run into the daily '
+        'time-in-status rollup. --full rebuilds it from the whole history.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rebuild every day, e.g. after backfilling history.')
+
+    def handle(self, *args, **options):
+        written = analytics.rollup(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} rollup rows; history processed up to {analytics.watermark()}.'
+        ))
@@ -0,0 +1,123 @@
+from django.db import migrations
+
+TABLE = 'application_search'
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'''
+    CREATE TABLE {TABLE} (
+        application_id uuid PRIMARY KEY REFERENCES applications (id) ON DELETE CASCADE,
+        document tsvector NOT NULL,
+        dha_ref varchar(100) NOT NULL DEFAULT ''
+    )
+    ''',
+    f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)',
+    f'CREATE INDEX {TABLE}_dha_ref_trgm_idx ON {TABLE} USING GIN (dha_ref gin_trgm_ops)',
+    f'''
+    CREATE FUNCTION {TABLE}_refresh() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO {TABLE} (application_id, document, dha_ref)
+        VALUES (
+            NEW.id,
+            setweight(to_tsvector('simple', coalesce(NEW.dha_ref, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(NEW.notes, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(NEW.internal_notes, '')), 'C'),
+            coalesce(NEW.dha_ref, '')
+        )
+        ON CONFLICT (application_id)
+        DO UPDATE SET document = EXCLUDED.document, dha_ref = EXCLUDED.dha_ref;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    f'''
+    CREATE TRIGGER {TABLE}_insert AFTER INSERT ON applications
+    FOR EACH ROW EXECUTE FUNCTION {TABLE}_refresh()
+    ''',
+    f'''
+    CREATE TRIGGER {TABLE}_update AFTER UPDATE OF dha_ref, notes, internal_notes ON applications
+    FOR EACH ROW WHEN (
+        OLD.dha_ref IS DISTINCT FROM NEW.dha_ref
+        OR OLD.notes IS DISTINCT FROM NEW.notes
+        OR OLD.internal_notes IS DISTINCT FROM NEW.internal_notes
+    )
+    EXECUTE FUNCTION {TABLE}_refresh()
+    ''',
+    # Index existing rows.
+    f'''
+    INSERT INTO {TABLE} (application_id, document, dha_ref)
+    SELECT id,
+           setweight(to_tsvector('simple', coalesce(dha_ref, '')), 'A')
+           || setweight(to_tsvector('english', coalesce(notes, '')), 'B')
+           || setweight(to_tsvector('english', coalesce(internal_notes, '')), 'C'),
+           coalesce(dha_ref, '')
+    FROM applications
+    ''',
+]
+
+POSTGRES_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {TABLE}_update ON applications',
+    f'DROP TRIGGER IF EXISTS {TABLE}_insert ON applications',
+    f'DROP FUNCTION IF EXISTS {TABLE}_refresh()',
+    f'DROP TABLE IF EXISTS {TABLE}',
+]
+
+# External-content FTS5 table over applications, keyed by its rowid. The
+# triggers keeping it in sync are (re)created after every migrate by
+# applications.search.ensure_sqlite_triggers(), since SQLite drops them
+# whenever a migration rebuilds the applications table.
+SQLITE_FORWARD = [
+    f'''
+    CREATE VIRTUAL TABLE {TABLE} USING fts5(
+        dha_ref, notes, internal_notes,
+        content='applications', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+]
+
+SQLITE_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {TABLE}_update',
+    f'DROP TRIGGER IF EXISTS {TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {TABLE}_insert',
+    f'DROP TABLE IF EXISTS {TABLE}',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the application search index and the triggers maintaining it.
+
+    PostgreSQL: a shadow table with a weighted tsvector (GIN) and a trigram
+    index on dha_ref. SQLite: an FTS5 table. Existing rows are indexed after
+    migrating; ``manage.py rebuild_search_index`` re-syncs the index later.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_application_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
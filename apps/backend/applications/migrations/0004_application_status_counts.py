@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_application_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('INTAKE', 'Intake'), ('IN_REVIEW', 'In Review'), ('DOCS_PENDING', 'Documents Pending'), ('READY_TO_SUBMIT', 'Ready to Submit'), ('SUBMITTED', 'Submitted'), ('DHA_PROCESSING', 'DHA Processing'), ('ADDITIONAL_INFO_REQUESTED', 'Additional Info Requested'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('CLOSED', 'Closed')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('application_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='applications.applicationtype')),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'application_status_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='applicationstatuscount',
+            constraint=models.UniqueConstraint(fields=('status', 'application_type', 'assigned_to'), name='application_status_count_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='applicationstatuscount',
+            constraint=models.UniqueConstraint(condition=models.Q(('assigned_to__isnull', True)), fields=('status', 'application_type'), name='application_status_count_unassigned_key'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_application_status_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusDurationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('INTAKE', 'Intake'), ('IN_REVIEW', 'In Review'), ('DOCS_PENDING', 'Documents Pending'), ('READY_TO_SUBMIT', 'Ready to Submit'), ('SUBMITTED', 'Submitted'), ('DHA_PROCESSING', 'DHA Processing'), ('ADDITIONAL_INFO_REQUESTED', 'Additional Info Requested'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('CLOSED', 'Closed')], max_length=50)),
+                ('intervals', models.PositiveIntegerField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('p50_seconds', models.FloatField(default=0)),
+                ('p90_seconds', models.FloatField(default=0)),
+                ('p99_seconds', models.FloatField(default=0)),
+                ('histogram', models.JSONField(default=dict)),
+            ],
+            options={
+                'db_table': 'status_duration_rollups',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='statushistory',
+            index=models.Index(fields=['application', 'created_at'], name='status_hist_applica_e5e689_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statushistory',
+            index=models.Index(fields=['created_at'], name='status_hist_created_f5bb05_idx'),
+        ),
+        migrations.AddField(
+            model_name='statusdurationrollup',
+            name='application_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='applications.applicationtype'),
+        ),
+        migrations.AddIndex(
+            model_name='statusdurationrollup',
+            index=models.Index(fields=['status', 'application_type', 'day'], name='status_dura_status_ed54f6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='statusdurationrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'status', 'application_type'), name='status_duration_rollup_key'),
+        ),
+    ]
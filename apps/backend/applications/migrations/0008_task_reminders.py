@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:56
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0007_task_queue_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskReminder',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('threshold', models.CharField(choices=[('DUE_IN_1_DAY', 'Due in 1 day'), ('DUE_IN_1_HOUR', 'Due in 1 hour'), ('OVERDUE', 'Overdue')], max_length=20)),
+                ('due_date', models.DateTimeField(help_text='Due date the reminder was computed from')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'task_reminders',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'IN_PROGRESS'])), fields=['due_date'], name='tasks_open_due_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='applications.task'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskreminder',
+            constraint=models.UniqueConstraint(fields=('task', 'threshold'), name='task_reminder_key'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:03
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def create_checklists(apps, schema_editor):
+    from applications.checklists import evaluate
+
+    Application = apps.get_model('applications', 'Application')
+    ApplicationChecklist = apps.get_model('applications', 'ApplicationChecklist')
+    Document = apps.get_model('documents', 'Document')
+    using = schema_editor.connection.alias
+    statuses = defaultdict(lambda: defaultdict(set))
+    rows = Document.objects.using(using).values_list('application_id', 'document_type__code', 'status').distinct()
+    for application_id, code, status in rows.iterator():
+        statuses[application_id][code.upper()].add(status)
+    requirements = Application.objects.using(using).values_list('pk', 'application_type__doc_requirements')
+    ApplicationChecklist.objects.using(using).bulk_create(
+        (ApplicationChecklist(application_id=pk, **evaluate(required, statuses[pk]))
+         for pk, required in requirements.iterator()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0008_task_reminders'),
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationChecklist',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='checklist', serialize=False, to='applications.application')),
+                ('required_count', models.PositiveSmallIntegerField(default=0)),
+                ('approved_count', models.PositiveSmallIntegerField(default=0)),
+                ('pending_count', models.PositiveSmallIntegerField(default=0)),
+                ('missing_count', models.PositiveSmallIntegerField(default=0)),
+                ('missing_codes', models.JSONField(default=list, help_text='Document type codes still missing')),
+                ('completeness', models.PositiveSmallIntegerField(default=100, help_text='Percentage of required documents approved')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'application_checklists',
+                'indexes': [models.Index(fields=['completeness', 'application'], name='application_complet_4a0bb0_idx')],
+            },
+        ),
+        migrations.RunPython(create_checklists, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0009_application_checklists'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='taskreminder',
+            name='task_reminder_key',
+        ),
+        migrations.AddConstraint(
+            model_name='taskreminder',
+            constraint=models.UniqueConstraint(fields=('task', 'threshold', 'due_date'), name='task_reminder_key'),
+        ),
+    ]
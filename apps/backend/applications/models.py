@@ -2,7 +2,7 @@
 Application management models.
 """
 import uuid
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -47,6 +47,21 @@ class Application(models.Model):
         ('REJECTED', 'Rejected'),
         ('CLOSED', 'Closed'),
     ]
+
+    # Allowed status changes: current status -> statuses it may move to.
+    STATUS_TRANSITIONS = {
+        'DRAFT': ['INTAKE', 'CLOSED'],
+        'INTAKE': ['IN_REVIEW', 'DOCS_PENDING', 'CLOSED'],
+        'IN_REVIEW': ['DOCS_PENDING', 'READY_TO_SUBMIT', 'REJECTED', 'CLOSED'],
+        'DOCS_PENDING': ['IN_REVIEW', 'READY_TO_SUBMIT', 'CLOSED'],
+        'READY_TO_SUBMIT': ['SUBMITTED', 'DOCS_PENDING', 'CLOSED'],
+        'SUBMITTED': ['DHA_PROCESSING', 'ADDITIONAL_INFO_REQUESTED', 'APPROVED', 'REJECTED'],
+        'DHA_PROCESSING': ['ADDITIONAL_INFO_REQUESTED', 'APPROVED', 'REJECTED'],
+        'ADDITIONAL_INFO_REQUESTED': ['DOCS_PENDING', 'SUBMITTED', 'DHA_PROCESSING', 'CLOSED'],
+        'APPROVED': ['CLOSED'],
+        'REJECTED': ['IN_REVIEW', 'CLOSED'],
+        'CLOSED': [],
+    }
     
     PRIORITY_CHOICES = [
         ('LOW', 'Low'),
@@ -79,12 +94,27 @@ class Application(models.Model):
         indexes = [
             models.Index(fields=['client', 'status']),
             models.Index(fields=['assigned_to', 'status']),
-            models.Index(fields=['created_at']),
+            # Keyset pagination orders by (field, id); see ApplicationViewSet.
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['submitted_at', 'id']),
         ]
 
     def __str__(self):
         return f'{self.application_type.name} - {self.client.email} ({self.status})'
 
+    @classmethod
+    def can_transition(cls, from_status, to_status):
+        """Return True if ``STATUS_TRANSITIONS`` allows ``from_status`` -> ``to_status``."""
+        return to_status in cls.STATUS_TRANSITIONS.get(from_status, ())
+
+    def save(self, *args, **kwargs):
+        # Status counters are adjusted by signal handlers (applications.counters);
+        # keep them in the same transaction as the row.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
 
 class StatusHistory(models.Model):
     """Track application status changes."""
@@ -101,6 +131,11 @@ class StatusHistory(models.Model):
         db_table = 'status_history'
         ordering = ['-created_at']
         verbose_name_plural = 'Status histories'
+        indexes = [
+            # Time-in-status rollups: per-application windows and the watermark scan.
+            models.Index(fields=['application', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f'{self.application} - {self.from_status} → {self.to_status}'
@@ -115,6 +150,7 @@ class Task(models.Model):
         ('DONE', 'Done'),
         ('CANCELLED', 'Cancelled'),
     ]
+    OPEN_STATUSES = ['PENDING', 'IN_PROGRESS']
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='tasks')
@@ -125,11 +161,148 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'tasks'
         ordering = ['due_date', 'created_at']
+        indexes = [
+            # Consultant work queue: open tasks due by a date (applications.queue).
+            models.Index(fields=['assigned_to', 'status', 'due_date']),
+            # Reminder scans: open tasks by due date (applications.reminders).
+            models.Index(fields=['due_date'], name='tasks_open_due_date_idx',
+                         condition=models.Q(status__in=['PENDING', 'IN_PROGRESS'])),
+        ]
 
     def __str__(self):
         return f'{self.title} - {self.application}'
 
+
+class TaskReminder(models.Model):
+    """
+    A due-date reminder sent for a task.
+
+    One row per (task, threshold, due date), so a reminder goes out at most
+    once per due date even when scheduler runs overlap, and again after the
+    task is rescheduled. Written by ``applications.reminders``.
+    """
+
+    THRESHOLD_CHOICES = [
+        ('DUE_IN_1_DAY', 'Due in 1 day'),
+        ('DUE_IN_1_HOUR', 'Due in 1 hour'),
+        ('OVERDUE', 'Overdue'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    threshold = models.CharField(max_length=20, choices=THRESHOLD_CHOICES)
+    due_date = models.DateTimeField(help_text='Due date the reminder was computed from')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'task_reminders'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'threshold', 'due_date'], name='task_reminder_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} {self.threshold}'
+
+
+class ApplicationChecklist(models.Model):
+    """
+    Document checklist of an application against its type's ``doc_requirements``.
+
+    Each required document type is approved (it has an approved document),
+    pending (a document awaits review) or missing. Maintained by
+    ``applications.checklists``; ``manage.py rebuild_checklists`` recomputes
+    every row.
+    """
+
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True,
+                                       related_name='checklist')
+    required_count = models.PositiveSmallIntegerField(default=0)
+    approved_count = models.PositiveSmallIntegerField(default=0)
+    pending_count = models.PositiveSmallIntegerField(default=0)
+    missing_count = models.PositiveSmallIntegerField(default=0)
+    missing_codes = models.JSONField(default=list, help_text='Document type codes still missing')
+    completeness = models.PositiveSmallIntegerField(default=100, help_text='Percentage of required documents approved')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'application_checklists'
+        indexes = [
+            # Filtering and keyset ordering of applications by completeness.
+            models.Index(fields=['completeness', 'application']),
+        ]
+
+    def __str__(self):
+        return f'{self.application_id}: {self.completeness}%'
+
+
+class ApplicationStatusCount(models.Model):
+    """
+    Number of applications per (status, application type, assignee).
+
+    Maintained incrementally by ``applications.counters`` so dashboards read
+    a handful of rows instead of grouping the applications table.
+    ``manage.py reconcile_status_counts`` rebuilds it from scratch.
+    """
+
+    status = models.CharField(max_length=50, choices=Application.STATUS_CHOICES)
+    application_type = models.ForeignKey(ApplicationType, on_delete=models.CASCADE, related_name='+')
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'application_status_counts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['status', 'application_type', 'assigned_to'],
+                name='application_status_count_key',
+            ),
+            # NULLs are distinct in unique constraints: one unassigned row per key.
+            models.UniqueConstraint(
+                fields=['status', 'application_type'],
+                condition=models.Q(assigned_to__isnull=True),
+                name='application_status_count_unassigned_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.status} / {self.application_type_id} / {self.assigned_to_id}: {self.count}'
+
+
+class StatusDurationRollup(models.Model):
+    """
+    Daily time-in-status statistics per (status, application type).
+
+    One row per day on which intervals in ``status`` ended (local time).
+    ``histogram`` maps log-scale bucket indexes to interval counts so that
+    percentiles over a date range can be merged without the raw history.
+    Maintained by ``applications.analytics.rollup()``.
+    """
+
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=Application.STATUS_CHOICES)
+    application_type = models.ForeignKey(ApplicationType, on_delete=models.CASCADE, related_name='+')
+    intervals = models.PositiveIntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+    p50_seconds = models.FloatField(default=0)
+    p90_seconds = models.FloatField(default=0)
+    p99_seconds = models.FloatField(default=0)
+    histogram = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = 'status_duration_rollups'
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'application_type'],
+                                    name='status_duration_rollup_key'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'application_type', 'day']),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.status} / {self.application_type_id}: {self.intervals}'
@@ -0,0 +1,119 @@
+"""
+Consultant work queue.
+
+``build()`` collects, in three queries, what waits on one consultant:
+open tasks assigned to them that are overdue or due soon, documents to
+review on their applications, and their applications in a status that
+needs staff action. Each list is sorted by application priority, then
+age, and capped at ``LIMIT``.
+
+``get_queue()`` caches the result per consultant, keyed by a per-consultant
+queue version (as ``accounts.roles`` does for roles). ``invalidate()`` bumps
+the version after the transaction commits; the signal handlers call it for
+saved or deleted tasks, documents and applications, and the status
+functions call it for their ``update()`` queries. Entries also expire after
+``QUEUE_CACHE_TIMEOUT`` so tasks become overdue on time.
+"""
+import datetime
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from documents.models import Document
+from documents.serializers import DocumentSerializer
+
+from .models import Application, Task
+from .serializers import ApplicationSerializer, QueueTaskSerializer
+
+DUE_SOON = datetime.timedelta(days=2)
+REVIEW_STATUSES = ('RECEIVED', 'REVIEWING')
+# Application statuses in which the assigned consultant has the next step.
+ACTION_STATUSES = ('INTAKE', 'IN_REVIEW', 'READY_TO_SUBMIT', 'ADDITIONAL_INFO_REQUESTED')
+LIMIT = 50
+
+QUEUE_CACHE_TIMEOUT = 120
+VERSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(user_id):
+    return f'applications:queue-version:{user_id}'
+
+
+def _queue_key(user_id, version):
+    return f'applications:queue:{user_id}:{version}'
+
+
+def get_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Never reuse a version handed out before an eviction.
+        version = time.time_ns()
+        if not cache.add(key, version, VERSION_CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(user_ids, using=None):
+    """Drop the cached queues of ``user_ids`` once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        {_version_key(user_id): time.time_ns() for user_id in user_ids}, VERSION_CACHE_TIMEOUT,
+    ), using=using)
+
+
+def priority_rank(field='priority'):
+    """Expression ranking ``field`` URGENT = 0 ... LOW = 3."""
+    codes = [code for code, _ in reversed(Application.PRIORITY_CHOICES)]
+    return Case(
+        *[When(**{field: code}, then=Value(rank)) for rank, code in enumerate(codes)],
+        default=Value(len(codes)), output_field=IntegerField(),
+    )
+
+
+def build(user_id, now=None):
+    """Return the work queue of ``user_id`` as plain data."""
+    now = now or timezone.now()
+    tasks = (
+        Task.objects.filter(assigned_to_id=user_id, status__in=Task.OPEN_STATUSES,
+                            due_date__lte=now + DUE_SOON)
+        .select_related('assigned_to', 'application')
+        .annotate(rank=priority_rank('application__priority'))
+        .order_by('rank', 'due_date')[:LIMIT]
+    )
+    documents = (
+        Document.objects.filter(application__assigned_to_id=user_id, status__in=REVIEW_STATUSES)
+        .select_related('document_type', 'uploaded_by')
+        .annotate(rank=priority_rank('application__priority'))
+        .order_by('rank', 'created_at')[:LIMIT]
+    )
+    applications = (
+        Application.objects.filter(assigned_to_id=user_id, status__in=ACTION_STATUSES)
+        .select_related('client', 'application_type', 'assigned_to')
+        .annotate(rank=priority_rank())
+        .order_by('rank', 'created_at')[:LIMIT]
+    )
+    task_data = QueueTaskSerializer(tasks, many=True).data
+    for task, row in zip(tasks, task_data):
+        row['overdue'] = task.due_date < now
+    return {
+        'generated_at': now.isoformat(),
+        'tasks': task_data,
+        'documents': DocumentSerializer(documents, many=True).data,
+        'applications': ApplicationSerializer(applications, many=True).data,
+    }
+
+
+def get_queue(user_id):
+    """Return the cached work queue of ``user_id``, building it on a miss."""
+    key = _queue_key(user_id, get_version(user_id))
+    queue = cache.get(key)
+    if queue is None:
+        queue = build(user_id)
+        cache.set(key, queue, QUEUE_CACHE_TIMEOUT)
+    return queue
@@ -0,0 +1,194 @@
+"""
+Task due-date reminders.
+
+A task crosses a threshold when ``due_date - THRESHOLDS[name]`` passes.
+``run()`` keeps the end of the last scanned window in a ``JobCheckpoint``
+and only scans the new window ``(watermark, now]``: one range query per
+threshold on the partial index over open tasks' ``due_date``, read in
+chunks. Crossings are recorded as ``TaskReminder`` rows, grouped into one
+``Notification`` per assignee and handed to ``deliver_task_reminders`` in
+batches once the transaction commits.
+
+Delivery failures leave the notifications ``PENDING``; the delivery task
+retries with backoff and only its last attempt marks them ``FAILED``.
+Each run also re-queues reminder notifications still ``PENDING`` after
+``STALE_AFTER`` (e.g. the broker was down when they were queued), as long
+as they are younger than ``MAX_REQUEUE_AGE``.
+
+Runs are serialized by locking the checkpoint row and a (task, threshold,
+due date) already recorded is skipped, so overlapping or repeated runs send
+nothing twice while a rescheduled task is reminded again for its new due
+date. A task whose due date is set inside an already scanned window is
+reminded at its next threshold only.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import JobCheckpoint
+from communications.models import Notification
+
+from .models import Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = 'applications.task_reminders'
+THRESHOLDS = {
+    'DUE_IN_1_DAY': datetime.timedelta(days=1),
+    'DUE_IN_1_HOUR': datetime.timedelta(hours=1),
+    'OVERDUE': datetime.timedelta(0),
+}
+TEMPLATE_CODE = 'TASK_REMINDER'
+# How far back the very first run looks.
+FIRST_WINDOW = datetime.timedelta(hours=1)
+CHUNK_SIZE = 2000
+# Notifications per delivery task.
+BATCH_SIZE = 100
+# Longer than the delivery task's retries take, so nothing in flight is re-queued.
+STALE_AFTER = datetime.timedelta(minutes=30)
+MAX_REQUEUE_AGE = datetime.timedelta(days=1)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def crossings(since, until, chunk_size=CHUNK_SIZE):
+    """
+    Yield ``(threshold, rows)`` for assigned open tasks crossing ``threshold`` in ``(since, until]``.
+
+    Rows come in chunks of ``chunk_size`` and are ``(task_id, assigned_to_id, application_id, title, due_date)``.
+    """
+    for threshold, offset in THRESHOLDS.items():
+        rows = (
+            Task.objects.filter(
+                status__in=Task.OPEN_STATUSES,
+                due_date__gt=since + offset,
+                due_date__lte=until + offset,
+                assigned_to__isnull=False,
+            )
+            .order_by()
+            .values_list('id', 'assigned_to_id', 'application_id', 'title', 'due_date')
+        )
+        for chunk in _chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+            yield threshold, chunk
+
+
+def run(now=None, chunk_size=CHUNK_SIZE):
+    """Record and queue the reminders due since the last run; return how many."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        JobCheckpoint.objects.get_or_create(name=CHECKPOINT)
+        # Serializes concurrent runs.
+        checkpoint = JobCheckpoint.objects.select_for_update().get(name=CHECKPOINT)
+        since = parse_datetime(checkpoint.position) if checkpoint.position else now - FIRST_WINDOW
+        if since >= now:
+            return 0
+
+        # assignee -> task -> reminder; THRESHOLDS is ordered by urgency, so a
+        # task crossing several thresholds in one window is reminded of the last.
+        per_assignee = defaultdict(dict)
+        recorded = 0
+        for threshold, rows in crossings(since, now, chunk_size):
+            sent = set(
+                TaskReminder.objects.filter(task_id__in=[row[0] for row in rows], threshold=threshold)
+                .values_list('task_id', 'due_date')
+            )
+            rows = [row for row in rows if (row[0], row[4]) not in sent]
+            TaskReminder.objects.bulk_create([
+                TaskReminder(task_id=task_id, threshold=threshold, due_date=due_date, created_at=now)
+                for task_id, _, _, _, due_date in rows
+            ], ignore_conflicts=True)
+            for task_id, assignee_id, application_id, title, due_date in rows:
+                per_assignee[assignee_id][task_id] = {
+                    'task': str(task_id),
+                    'application': str(application_id),
+                    'title': title,
+                    'due_date': due_date.isoformat(),
+                    'threshold': threshold,
+                }
+            recorded += len(rows)
+
+        notifications = Notification.objects.bulk_create(
+            Notification(user_id=assignee_id, channel='EMAIL', template_code=TEMPLATE_CODE,
+                         payload={'reminders': list(reminders.values())}, created_at=now)
+            for assignee_id, reminders in per_assignee.items()
+        )
+        ids = [str(notification.pk) for notification in notifications]
+        transaction.on_commit(lambda: _queue_delivery(ids))
+
+        checkpoint.position = now.isoformat()
+        checkpoint.save(update_fields=['position', 'updated_at'])
+    requeue_stale(now)
+    return recorded
+
+
+def requeue_stale(now=None):
+    """Queue delivery of reminder notifications left ``PENDING``; return how many."""
+    now = now or timezone.now()
+    ids = [
+        str(pk) for pk in Notification.objects.filter(
+            template_code=TEMPLATE_CODE, status='PENDING',
+            created_at__gt=now - MAX_REQUEUE_AGE, created_at__lte=now - STALE_AFTER,
+        ).values_list('pk', flat=True)
+    ]
+    if ids:
+        logger.warning('Re-queueing %d pending task reminder notifications', len(ids))
+        _queue_delivery(ids)
+    return len(ids)
+
+
+def _queue_delivery(notification_ids):
+    from .tasks import deliver_task_reminders
+
+    for batch in _chunks(notification_ids, BATCH_SIZE):
+        try:
+            deliver_task_reminders.delay(batch)
+        except Exception:
+            logger.exception('Could not queue %d task reminder notifications', len(batch))
+
+
+def _message(notification):
+    labels = dict(TaskReminder.THRESHOLD_CHOICES)
+    lines = [
+        f'- {item["title"]}: {labels.get(item["threshold"], item["threshold"])} '
+        f'(due {timezone.localtime(parse_datetime(item["due_date"])):%Y-%m-%d %H:%M})'
+        for item in notification.payload.get('reminders', [])
+    ]
+    return EmailMessage(
+        subject=f'{len(lines)} task reminder{"s" if len(lines) != 1 else ""}',
+        body='These tasks need your attention:\n\n' + '\n'.join(lines) + '\n',
+        to=[notification.user.email],
+    )
+
+
+def deliver(notification_ids, final=True):
+    """
+    Email pending reminder notifications over one SMTP connection.
+
+    On an error the notifications stay ``PENDING`` for a retry, unless this
+    is the ``final`` attempt, and the error is re-raised.
+    """
+    notifications = list(
+        Notification.objects.filter(pk__in=notification_ids, template_code=TEMPLATE_CODE, status='PENDING')
+        .select_related('user')
+    )
+    if not notifications:
+        return 0
+    ids = [notification.pk for notification in notifications]
+    try:
+        get_connection().send_messages([_message(notification) for notification in notifications])
+    except Exception:
+        if final:
+            Notification.objects.filter(pk__in=ids).update(status='FAILED')
+        raise
+    Notification.objects.filter(pk__in=ids).update(status='SENT', sent_at=timezone.now())
+    return len(ids)
@@ -0,0 +1,201 @@
+"""
+Full-text search over applications.
+
+``dha_ref``, ``notes`` and ``internal_notes`` are indexed in a shadow table
+(``application_search``) maintained by database triggers, so every write
+path, including ``QuerySet.update()``, keeps it current:
+
+* PostgreSQL: a weighted ``tsvector`` (dha_ref > notes > internal_notes)
+  with a GIN index, plus a trigram GIN index on ``dha_ref`` for prefix and
+  fuzzy reference matches. See migration 0003.
+* SQLite: an external-content FTS5 table keyed by the applications rowid.
+
+``search()`` filters a queryset to matching applications and annotates
+``search_rank`` (higher is better). Other backends fall back to DRF's
+``icontains`` search.
+"""
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Application
+
+TABLE = 'application_search'
+TS_CONFIG = 'english'
+RANK_FIELD = 'search_rank'
+
+SQLITE_TRIGGERS = {
+    f'{TABLE}_insert': f'''
+        CREATE TRIGGER IF NOT EXISTS {TABLE}_insert AFTER INSERT ON applications BEGIN
+            INSERT INTO {TABLE} (rowid, dha_ref, notes, internal_notes)
+            VALUES (new.rowid, new.dha_ref, new.notes, new.internal_notes);
+        END
+    ''',
+    f'{TABLE}_delete': f'''
+        CREATE TRIGGER IF NOT EXISTS {TABLE}_delete AFTER DELETE ON applications BEGIN
+            INSERT INTO {TABLE} ({TABLE}, rowid, dha_ref, notes, internal_notes)
+            VALUES ('delete', old.rowid, old.dha_ref, old.notes, old.internal_notes);
+        END
+    ''',
+    f'{TABLE}_update': f'''
+        CREATE TRIGGER IF NOT EXISTS {TABLE}_update AFTER UPDATE OF dha_ref, notes, internal_notes
+        ON applications BEGIN
+            INSERT INTO {TABLE} ({TABLE}, rowid, dha_ref, notes, internal_notes)
+            VALUES ('delete', old.rowid, old.dha_ref, old.notes, old.internal_notes);
+            INSERT INTO {TABLE} (rowid, dha_ref, notes, internal_notes)
+            VALUES (new.rowid, new.dha_ref, new.notes, new.internal_notes);
+        END
+    ''',
+}
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(a.dha_ref, '')), 'A')"
+    f" || setweight(to_tsvector('{TS_CONFIG}', coalesce(a.notes, '')), 'B')"
+    f" || setweight(to_tsvector('{TS_CONFIG}', coalesce(a.internal_notes, '')), 'C')"
+)
+
+
+def is_supported(connection):
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def _table_exists(connection):
+    return TABLE in connection.introspection.table_names()
+
+
+# Aliases known to have the index, so requests skip the introspection query.
+_indexed = set()
+
+
+def is_ranked(using='default'):
+    """Return True if searches on ``using`` go through the index."""
+    if using in _indexed:
+        return True
+    connection = connections[using]
+    if is_supported(connection) and _table_exists(connection):
+        _indexed.add(using)
+        return True
+    return False
+
+
+def ensure_sqlite_triggers(using='default'):
+    """
+    Recreate missing SQLite triggers and rebuild the FTS index.
+
+    Migrations that rebuild the applications table on SQLite drop its
+    triggers (and may renumber rowids), so this runs after every migrate.
+    Returns True if the index had to be repaired.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not _table_exists(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'applications'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if set(SQLITE_TRIGGERS) <= existing:
+            return False
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def rebuild(using='default', chunk_size=1000):
+    """
+    Re-index every application; return the number of rows indexed.
+
+    PostgreSQL upserts in primary-key chunks so the table is never locked
+    for long; SQLite rebuilds the FTS index in one statement.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        ensure_sqlite_triggers(using)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('rebuild')")
+        return Application.objects.using(using).count()
+    if connection.vendor != 'postgresql':
+        return 0
+
+    total = 0
+    last = None
+    ids = Application.objects.using(using).order_by('pk').values_list('pk', flat=True)
+    while True:
+        chunk = list((ids.filter(pk__gt=last) if last else ids)[:chunk_size])
+        if not chunk:
+            break
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TABLE} (application_id, document, dha_ref) '
+                f"SELECT a.id, {POSTGRES_DOCUMENT}, coalesce(a.dha_ref, '') "
+                f'FROM applications a WHERE a.id = ANY(%s) '
+                f'ON CONFLICT (application_id) DO UPDATE '
+                f'SET document = EXCLUDED.document, dha_ref = EXCLUDED.dha_ref',
+                [chunk],
+            )
+        total += len(chunk)
+        last = chunk[-1]
+    return total
+
+
+def _fts5_query(terms):
+    """Quote each term as an FTS5 prefix query; terms are ANDed."""
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def _like_prefix(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def search(queryset, terms):
+    """Filter ``queryset`` to applications matching ``terms``, ranked."""
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(Application._meta.db_table)
+    if connection.vendor == 'postgresql':
+        text = ' '.join(terms)
+        query = f"websearch_to_tsquery('{TS_CONFIG}', %s)"
+        matches = RawSQL(
+            f'SELECT application_id FROM {TABLE} '
+            f'WHERE document @@ {query} OR dha_ref ILIKE %s OR dha_ref %% %s',
+            [text, _like_prefix(text), text],
+        )
+        rank = RawSQL(
+            f'SELECT ts_rank_cd(document, {query}) + similarity(dha_ref, %s) '
+            f'FROM {TABLE} WHERE application_id = {table}.id',
+            [text, text],
+            output_field=FloatField(),
+        )
+    else:
+        match = _fts5_query(terms)
+        matches = RawSQL(
+            f'SELECT id FROM {table} WHERE rowid IN '
+            f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)',
+            [match],
+        )
+        # bm25() is lower-is-better; column weights follow dha_ref > notes > internal_notes.
+        rank = RawSQL(
+            f'SELECT -bm25({TABLE}, 10.0, 4.0, 1.0) FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s AND rowid = {table}.rowid',
+            [match],
+            output_field=FloatField(),
+        )
+    return queryset.filter(pk__in=matches).annotate(**{RANK_FIELD: rank})
+
+
+class ApplicationSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the application search index.
+
+    Matching rows are annotated with ``search_rank``; the query parameter and
+    response shape are unchanged from ``SearchFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if not is_ranked(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        return search(queryset, terms)
@@ -1,8 +1,11 @@
 """
 Serializers for applications.
 """
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Application, ApplicationType, StatusHistory, Task
+from raylene import catalogs
+from raylene.catalogs import CatalogPrimaryKeyField
+from .models import Application, ApplicationChecklist, ApplicationType, StatusHistory, Task
 
 
 class ApplicationTypeSerializer(serializers.ModelSerializer):
@@ -32,8 +35,16 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'assigned_to_email', 
-                  'due_date', 'completed_at', 'created_at']
-        read_only_fields = ['id', 'completed_at', 'created_at']
+                  'due_date', 'completed_at', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'completed_at', 'created_at', 'updated_at']
+
+
+class QueueTaskSerializer(TaskSerializer):
+    """Task in a consultant's work queue."""
+    application_priority = serializers.CharField(source='application.priority', read_only=True)
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ['application', 'application_priority']
 
 
 class TaskCreateSerializer(serializers.ModelSerializer):
@@ -44,6 +55,16 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         fields = ['title', 'description', 'due_date', 'assigned_to']
 
 
+class ApplicationChecklistSerializer(serializers.ModelSerializer):
+    """Serializer for an application's document checklist."""
+    
+    class Meta:
+        model = ApplicationChecklist
+        fields = ['required_count', 'approved_count', 'pending_count', 'missing_count',
+                  'missing_codes', 'completeness', 'updated_at']
+        read_only_fields = fields
+
+
 class ApplicationSerializer(serializers.ModelSerializer):
     """Serializer for application."""
     client_email = serializers.EmailField(source='client.email', read_only=True)
@@ -58,18 +79,36 @@ class ApplicationSerializer(serializers.ModelSerializer):
                   'submitted_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'submitted_at']
 
+    def update(self, instance, validated_data):
+        # Write only the submitted columns so a concurrent change to other
+        # fields (such as a status transition) is not overwritten.
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
 class ApplicationDetailSerializer(ApplicationSerializer):
     """Detailed application serializer with related data."""
     status_history = StatusHistorySerializer(many=True, read_only=True)
     tasks = TaskSerializer(many=True, read_only=True)
+    checklist = ApplicationChecklistSerializer(read_only=True, allow_null=True)
     
     class Meta(ApplicationSerializer.Meta):
-        fields = ApplicationSerializer.Meta.fields + ['status_history', 'tasks']
+        fields = ApplicationSerializer.Meta.fields + ['status_history', 'tasks', 'checklist']
+
+    @staticmethod
+    def prefetches():
+        """Prefetches loading the nested history and tasks in one query each."""
+        return [
+            Prefetch('status_history', queryset=StatusHistory.objects.select_related('changed_by')),
+            Prefetch('tasks', queryset=Task.objects.select_related('assigned_to')),
+        ]
 
 
 class ApplicationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating applications."""
+    application_type = CatalogPrimaryKeyField(catalogs.APPLICATION_TYPES)
     
     class Meta:
         model = Application
@@ -80,4 +119,29 @@ class ApplicationStatusUpdateSerializer(serializers.Serializer):
     """Serializer for updating application status."""
     status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
     note = serializers.CharField(required=False, allow_blank=True)
+    # The status the client last saw; defaults to the status when the request is read.
+    expected_status = serializers.ChoiceField(choices=Application.STATUS_CHOICES, required=False)
 
+
+class ApplicationBulkStatusSerializer(serializers.Serializer):
+    """Serializer for moving many applications to one status."""
+    MAX_APPLICATIONS = 1000
+    FILTER_FIELDS = ['status', 'priority', 'application_type', 'assigned_to']
+
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False,
+                                allow_empty=False, max_length=MAX_APPLICATIONS)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_filter(self, value):
+        unknown = sorted(set(value) - set(self.FILTER_FIELDS))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown fields: {", ".join(unknown)}. '
+                                              f'Use: {", ".join(self.FILTER_FIELDS)}.')
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError({'ids': 'Provide either ids or filter.'})
+        return attrs
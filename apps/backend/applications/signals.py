@@ -0,0 +1,155 @@
+"""
+Signal handlers for applications app.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from raylene import catalogs
+
+from . import checklists, counters, queue
+from .models import Application, ApplicationType, Task
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=Application)
+def remember_status_count_key(sender, instance, **kwargs):
+    """Remember the counter key of loaded rows, unless a key field was deferred."""
+    if all(name in instance.__dict__ for name in counters.KEY_FIELDS):
+        counters.remember(instance)
+
+
+@receiver(pre_save, sender=Application)
+def load_status_count_key(sender, instance, raw, using, **kwargs):
+    if not raw:
+        instance._status_count_previous = counters.loaded_key(instance, using)
+
+
+@receiver(post_save, sender=Application)
+def count_saved_application(sender, instance, raw, using, **kwargs):
+    """Move the application between status counters when its key changes."""
+    if raw:
+        return
+    previous = instance.__dict__.pop('_status_count_previous', None)
+    counters.track_save(previous, instance, using)
+    # The counter key also names the previous assignee and type.
+    previous = dict(zip(counters.KEY_FIELDS, previous or ()))
+    queue.invalidate({instance.assigned_to_id, previous.get('assigned_to_id')}, using)
+    if previous.get('application_type_id') != instance.application_type_id:
+        checklists.refresh([instance.pk], using)
+
+
+@receiver(post_delete, sender=Application)
+def count_deleted_application(sender, instance, using, **kwargs):
+    counters.track_delete(instance, using)
+    queue.invalidate({instance.assigned_to_id}, using)
+
+
+@receiver(post_save, sender=ApplicationType)
+@receiver(post_delete, sender=ApplicationType)
+def refresh_application_type_catalog(sender, using, **kwargs):
+    """Reload every worker's application type snapshot (fixtures included)."""
+    catalogs.APPLICATION_TYPES.bump(using)
+
+
+@receiver(post_init, sender=ApplicationType)
+def remember_doc_requirements(sender, instance, **kwargs):
+    instance._doc_requirements = checklists.normalize(instance.__dict__.get('doc_requirements'))
+
+
+@receiver(post_save, sender=ApplicationType)
+def refresh_type_checklists(sender, instance, created, raw, using, **kwargs):
+    """Re-evaluate the type's applications when its required documents change."""
+    requirements = checklists.normalize(instance.doc_requirements)
+    if not (created or raw) and requirements != instance._doc_requirements:
+        checklists.queue_type_refresh(instance.pk, using)
+    instance._doc_requirements = requirements
+
+
+@receiver(post_init, sender=Task)
+def remember_task_assignee(sender, instance, **kwargs):
+    instance._queue_assignee = instance.__dict__.get('assigned_to_id')
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_queues(sender, instance, using, raw=False, **kwargs):
+    """Refresh the work queues of the task's current and previous assignee."""
+    if raw:
+        return
+    queue.invalidate({instance.assigned_to_id, instance._queue_assignee}, using)
+    instance._queue_assignee = instance.assigned_to_id
+
+
+@receiver(post_init, sender='documents.Document')
+def remember_checklist_key(sender, instance, **kwargs):
+    instance._checklist_key = tuple(
+        instance.__dict__.get(name) for name in ('application_id', 'document_type_id', 'status')
+    )
+
+
+@receiver(post_save, sender='documents.Document')
+def refresh_saved_document_checklist(sender, instance, created, raw, using, **kwargs):
+    """Re-evaluate the checklists a document was and is counted in."""
+    if raw:
+        return
+    key = (instance.application_id, instance.document_type_id, instance.status)
+    if created or key != instance._checklist_key:
+        checklists.refresh({instance.application_id, instance._checklist_key[0]}, using)
+    instance._checklist_key = key
+
+
+@receiver(post_delete, sender='documents.Document')
+def refresh_deleted_document_checklist(sender, instance, using, origin=None, **kwargs):
+    # Not when the application itself is being deleted: the checklist goes with it.
+    if origin is None or getattr(origin, 'model', type(origin)) is sender:
+        checklists.refresh([instance.application_id], using)
+
+
+@receiver(post_init, sender='documents.Document')
+def remember_document_queue_key(sender, instance, **kwargs):
+    instance._queue_key = (instance.__dict__.get('application_id'), instance.__dict__.get('status'))
+
+
+@receiver(post_save, sender='documents.Document')
+def invalidate_saved_document_queue(sender, instance, created, raw, using, **kwargs):
+    """
+    Refresh the assignee's work queue when the document enters, leaves or
+    moves while in review. Other edits show up when the cached queue expires.
+    """
+    if raw:
+        return
+    key = (instance.application_id, instance.status)
+    previous = None if created else instance._queue_key
+    instance._queue_key = key
+    if key == previous or not (key[1] in queue.REVIEW_STATUSES or previous and previous[1] in queue.REVIEW_STATUSES):
+        return
+    _invalidate_document_queues(sender, instance, {key[0], previous and previous[0]}, using)
+
+
+@receiver(post_delete, sender='documents.Document')
+def invalidate_deleted_document_queue(sender, instance, using, origin=None, **kwargs):
+    # Deleting the application invalidates the queue itself.
+    if origin is not None and getattr(origin, 'model', type(origin)) is not sender:
+        return
+    if instance.status in queue.REVIEW_STATUSES:
+        _invalidate_document_queues(sender, instance, {instance.application_id}, using)
+
+
+def _invalidate_document_queues(sender, instance, application_ids, using):
+    application_ids.discard(None)
+    if application_ids == {instance.application_id} and sender.application.is_cached(instance):
+        assignees = {instance.application.assigned_to_id}
+    else:
+        assignees = set(
+            Application.objects.using(using).filter(pk__in=application_ids)
+            .values_list('assigned_to_id', flat=True)
+        )
+    queue.invalidate(assignees, using)
+
+
+@receiver(pre_delete, sender=User)
+def unassign_status_counts(sender, instance, using, **kwargs):
+    """Deleting a consultant unassigns their applications; follow in the counters."""
+    counters.move_to_unassigned(instance.pk, using)
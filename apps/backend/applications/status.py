@@ -0,0 +1,181 @@
+"""
+Application status changes.
+
+Status changes follow ``Application.STATUS_TRANSITIONS``.
+
+``transition()`` moves one application with a compare-and-set UPDATE
+(``WHERE id = ... AND status = <expected>``) that writes only the status
+columns, so two staff members changing the same application cannot
+silently overwrite each other: the second gets a ``ConflictError`` (409).
+
+``bulk_update_status()`` moves many applications to one status in a single
+transaction: one locking SELECT, one UPDATE, one ``bulk_create`` of status
+history, batched audit entries and one adjustment of the status counters.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts import audit
+from raylene.exceptions import ConflictError
+
+from . import counters, queue
+from .models import Application, StatusHistory
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+NOT_ALLOWED = 'not_allowed'
+
+
+class TooManyApplications(ValueError):
+    """The selection exceeds the caller's limit; nothing was changed."""
+
+
+class TransitionNotAllowed(ValueError):
+    """``STATUS_TRANSITIONS`` does not allow the requested status change."""
+
+    def __init__(self, from_status, to_status):
+        self.from_status = from_status
+        self.to_status = to_status
+        allowed = Application.STATUS_TRANSITIONS.get(from_status, [])
+        super().__init__(
+            f'Cannot move from {from_status} to {to_status}. '
+            f'Allowed: {", ".join(allowed) or "none"}.'
+        )
+
+
+def _status_values(new_status, now):
+    values = {'status': new_status, 'updated_at': now}
+    if new_status == 'SUBMITTED':
+        values['submitted_at'] = Coalesce(F('submitted_at'), Value(now))
+    return values
+
+
+def transition(application, new_status, note='', user=None, request=None, expected_status=None):
+    """
+    Move ``application`` from ``expected_status`` to ``new_status``.
+
+    ``expected_status`` defaults to the status ``application`` was loaded
+    with. Raises ``TransitionNotAllowed`` if the state machine forbids the
+    change and ``ConflictError`` if the stored status is no longer
+    ``expected_status``. On success ``application`` reflects the new status.
+    """
+    expected_status = expected_status or application.status
+    if not Application.can_transition(expected_status, new_status):
+        raise TransitionNotAllowed(expected_status, new_status)
+
+    using = router.db_for_write(Application)
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        updated = Application.objects.using(using).filter(
+            pk=application.pk, status=expected_status,
+        ).update(**_status_values(new_status, now))
+        if not updated:
+            current = Application.objects.using(using).filter(pk=application.pk).values_list('status', flat=True).first()
+            raise ConflictError(
+                f'Application status is {current}, not {expected_status}; reload and try again.'
+            )
+
+        StatusHistory.objects.using(using).create(
+            application_id=application.pk, from_status=expected_status, to_status=new_status,
+            note=note, changed_by_id=getattr(user, 'pk', user), created_at=now,
+        )
+        audit.record(
+            'UPDATE_STATUS', 'Application', application.pk,
+            meta={'from': expected_status, 'to': new_status, 'note': note},
+            request=request,
+        )
+        # update() bypasses the save signals that maintain the counters.
+        type_id, assignee_id = application.application_type_id, application.assigned_to_id
+        counters.apply({
+            (expected_status, type_id, assignee_id): -1,
+            (new_status, type_id, assignee_id): 1,
+        }, using)
+        queue.invalidate({assignee_id}, using)
+
+    application.status = new_status
+    application.updated_at = now
+    if new_status == 'SUBMITTED' and not application.submitted_at:
+        application.submitted_at = now
+    counters.remember(application)
+    return application
+
+
+@dataclass
+class BulkStatusResult:
+    """Per-application outcome of a bulk status change."""
+    updated: int = 0
+    results: list = field(default_factory=list)
+
+    def add(self, application_id, result, from_status=None):
+        self.results.append({'id': str(application_id), 'result': result, 'from_status': from_status})
+
+
+def bulk_update_status(queryset, new_status, note='', user=None, request=None, ids=None, limit=None):
+    """
+    Move the applications in ``queryset`` to ``new_status``.
+
+    ``ids``, when given, restricts the change to those applications and
+    reports the ones ``queryset`` does not contain as ``not_found``.
+    Applications already in ``new_status`` are left alone, and those
+    ``STATUS_TRANSITIONS`` does not allow to move are ``not_allowed``. Raises
+    ``TooManyApplications`` if more than ``limit`` applications match.
+    """
+    using = router.db_for_write(Application)
+    now = timezone.now()
+    actor_id = getattr(user, 'pk', user)
+    if ids is not None:
+        ids = list(dict.fromkeys(ids))
+        queryset = queryset.filter(pk__in=ids)
+
+    result = BulkStatusResult()
+    with transaction.atomic(using=using):
+        rows = queryset.using(using).select_for_update(of=('self',)).order_by('pk')
+        rows = list((rows[:limit + 1] if limit else rows).values_list('pk', *counters.KEY_FIELDS))
+        if limit and len(rows) > limit:
+            raise TooManyApplications(f'More than {limit} applications match.')
+        changed = [row for row in rows if Application.can_transition(row[1], new_status)]
+
+        if changed:
+            Application.objects.using(using).filter(
+                pk__in=[row[0] for row in changed],
+            ).update(**_status_values(new_status, now))
+
+            StatusHistory.objects.using(using).bulk_create([
+                StatusHistory(application_id=pk, from_status=old, to_status=new_status,
+                              note=note, changed_by_id=actor_id, created_at=now)
+                for pk, old, _, _ in changed
+            ])
+            audit.record_many([
+                audit.build_entry('UPDATE_STATUS', 'Application', pk, actor=actor_id,
+                                  meta={'from': old, 'to': new_status, 'note': note, 'bulk': True},
+                                  request=request)
+                for pk, old, _, _ in changed
+            ], using=using)
+
+            deltas = Counter()
+            for _, old, type_id, assignee_id in changed:
+                deltas[(old, type_id, assignee_id)] -= 1
+                deltas[(new_status, type_id, assignee_id)] += 1
+            counters.apply(deltas, using)
+            queue.invalidate({assignee_id for _, _, _, assignee_id in changed}, using)
+
+    result.updated = len(changed)
+    previous = {row[0]: row[1] for row in rows}
+    for pk in ids if ids is not None else previous:
+        if pk not in previous:
+            result.add(pk, NOT_FOUND)
+        else:
+            if previous[pk] == new_status:
+                outcome = UNCHANGED
+            elif Application.can_transition(previous[pk], new_status):
+                outcome = UPDATED
+            else:
+                outcome = NOT_ALLOWED
+            result.add(pk, outcome, previous[pk])
+    return result
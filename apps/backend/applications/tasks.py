@@ -0,0 +1,37 @@
+"""
+Celery tasks for applications app.
+"""
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def rollup_status_durations():
+    """Fold new status transitions into the time-in-status rollup."""
+    from . import analytics
+
+    analytics.rollup()
+
+
+@shared_task(ignore_result=True)
+def schedule_task_reminders():
+    """Record and queue due-date reminders for tasks crossing a threshold."""
+    from . import reminders
+
+    reminders.run()
+
+
+@shared_task(bind=True, ignore_result=True, autoretry_for=(Exception,), retry_backoff=True,
+             max_retries=5)
+def deliver_task_reminders(self, notification_ids):
+    """Email a batch of task reminder notifications, retrying transient failures."""
+    from . import reminders
+
+    reminders.deliver(notification_ids, final=self.request.retries >= self.max_retries)
+
+
+@shared_task(ignore_result=True)
+def refresh_type_checklists(application_type_id, using=None):
+    """Recompute document checklists after a type's requirements changed."""
+    from . import checklists
+
+    checklists.refresh_type(application_type_id, using)
@@ -0,0 +1,61 @@
+"""
+Application status counters follow saves, deletes and status changes.
+"""
+import pytest
+
+from applications import counters, status
+from applications.models import Application, ApplicationStatusCount
+
+
+def counts():
+    return {
+        (row['status'], row['application_type']): row['count']
+        for row in counters.summarize(group_by=['status', 'application_type'])
+    }
+
+
+@pytest.mark.django_db
+def test_counters_follow_create_save_and_delete(client_user, application_type):
+    application = Application.objects.create(client=client_user, application_type=application_type, status='DRAFT')
+    assert counts() == {('DRAFT', application_type.pk): 1}
+
+    application.status = 'INTAKE'
+    application.save()
+    assert counts() == {('INTAKE', application_type.pk): 1}
+
+    application.delete()
+    assert counts() == {}
+
+
+@pytest.mark.django_db
+def test_counters_follow_transitions_and_bulk_updates(client_user, application_type):
+    first = Application.objects.create(client=client_user, application_type=application_type, status='INTAKE')
+    Application.objects.create(client=client_user, application_type=application_type, status='INTAKE')
+
+    status.transition(first, 'IN_REVIEW')
+    assert counts() == {('INTAKE', application_type.pk): 1, ('IN_REVIEW', application_type.pk): 1}
+
+    status.bulk_update_status(Application.objects.all(), 'DOCS_PENDING')
+    assert counts() == {('DOCS_PENDING', application_type.pk): 2}
+
+
+@pytest.mark.django_db
+def test_deleting_a_consultant_moves_their_counts_to_unassigned(client_user, application_type, staff):
+    Application.objects.create(client=client_user, application_type=application_type, assigned_to=staff)
+
+    staff.delete()
+
+    rows = counters.summarize(group_by=['assigned_to'])
+    assert rows == [{'assigned_to': None, 'count': 1}]
+
+
+@pytest.mark.django_db
+def test_reconcile_repairs_drift(client_user, application_type):
+    Application.objects.create(client=client_user, application_type=application_type, status='INTAKE')
+    # update() bypasses the signal handlers.
+    Application.objects.update(status='CLOSED')
+    ApplicationStatusCount.objects.create(status='APPROVED', application_type=application_type, count=7)
+
+    assert counters.reconcile() > 0
+    assert counts() == {('CLOSED', application_type.pk): 1}
+    assert counters.reconcile() == 0
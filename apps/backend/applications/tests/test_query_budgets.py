@@ -0,0 +1,29 @@
+"""
+Query budgets: every endpoint that declares one stays within it on seeded data.
+"""
+import logging
+
+import pytest
+
+from applications.views import ApplicationViewSet
+from benchmarks.harness import format_table
+from benchmarks.management.commands.check_query_budgets import Command
+
+
+@pytest.mark.django_db
+def test_endpoints_stay_within_their_query_budgets():
+    rows = Command().run(scale=1, history=12, tasks=6)
+    failing = [row for row in rows if row['result'] != 'ok']
+    assert not failing, '\n' + format_table(failing, ['endpoint', 'user', 'status', 'queries', 'budget', 'result'])
+
+
+@pytest.mark.django_db
+def test_going_over_budget_is_reported(api, staff, monkeypatch, caplog):
+    monkeypatch.setattr(ApplicationViewSet, 'query_budget', {'list': 0})
+    api.force_authenticate(staff)
+    with caplog.at_level(logging.WARNING, logger='raylene.query_budget'):
+        response = api.get('/api/applications/')
+    assert response.status_code == 200
+    assert response.query_budget == 0
+    assert response.query_count > 0
+    assert 'Query budget exceeded' in caplog.text
@@ -0,0 +1,100 @@
+"""
+Application status changes through the state machine.
+"""
+import pytest
+
+from applications import status
+from applications.models import Application, StatusHistory
+from raylene.exceptions import ConflictError
+
+
+@pytest.fixture
+def application(client_user, application_type):
+    return Application.objects.create(client=client_user, application_type=application_type, status='INTAKE')
+
+
+@pytest.mark.django_db
+def test_transition_updates_status_and_history(application, staff):
+    status.transition(application, 'IN_REVIEW', note='Checked', user=staff)
+
+    application.refresh_from_db()
+    assert application.status == 'IN_REVIEW'
+    history = StatusHistory.objects.get(application=application)
+    assert (history.from_status, history.to_status, history.changed_by) == ('INTAKE', 'IN_REVIEW', staff)
+
+
+@pytest.mark.django_db
+def test_transition_sets_submitted_at_once(application):
+    Application.objects.filter(pk=application.pk).update(status='READY_TO_SUBMIT')
+    application.refresh_from_db()
+
+    status.transition(application, 'SUBMITTED')
+    submitted_at = Application.objects.get(pk=application.pk).submitted_at
+    assert submitted_at is not None
+
+    status.transition(application, 'ADDITIONAL_INFO_REQUESTED')
+    status.transition(application, 'SUBMITTED')
+    assert Application.objects.get(pk=application.pk).submitted_at == submitted_at
+
+
+@pytest.mark.django_db
+def test_transition_not_in_state_machine_is_refused(application):
+    with pytest.raises(status.TransitionNotAllowed):
+        status.transition(application, 'APPROVED')
+    assert Application.objects.get(pk=application.pk).status == 'INTAKE'
+    assert not StatusHistory.objects.exists()
+
+
+@pytest.mark.django_db
+def test_transition_from_a_stale_status_conflicts(application):
+    stale = Application.objects.get(pk=application.pk)
+    status.transition(application, 'IN_REVIEW')
+
+    with pytest.raises(ConflictError):
+        status.transition(stale, 'DOCS_PENDING')
+    assert Application.objects.get(pk=application.pk).status == 'IN_REVIEW'
+
+
+@pytest.mark.django_db
+def test_bulk_update_reports_each_application(client_user, application_type):
+    def create(value):
+        return Application.objects.create(client=client_user, application_type=application_type, status=value)
+
+    movable, done, closed = create('INTAKE'), create('IN_REVIEW'), create('CLOSED')
+    missing = '00000000-0000-0000-0000-000000000000'
+
+    result = status.bulk_update_status(
+        Application.objects.all(), 'IN_REVIEW', ids=[movable.pk, done.pk, closed.pk, missing],
+    )
+
+    assert result.updated == 1
+    outcomes = {row['id']: row['result'] for row in result.results}
+    assert outcomes == {
+        str(movable.pk): status.UPDATED,
+        str(done.pk): status.UNCHANGED,
+        str(closed.pk): status.NOT_ALLOWED,
+        missing: status.NOT_FOUND,
+    }
+    assert Application.objects.get(pk=movable.pk).status == 'IN_REVIEW'
+    assert StatusHistory.objects.filter(application=movable).count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_update_over_the_limit_changes_nothing(client_user, application_type):
+    for _ in range(3):
+        Application.objects.create(client=client_user, application_type=application_type, status='INTAKE')
+
+    with pytest.raises(status.TooManyApplications):
+        status.bulk_update_status(Application.objects.all(), 'IN_REVIEW', limit=2)
+    assert not Application.objects.filter(status='IN_REVIEW').exists()
+
+
+@pytest.mark.django_db
+def test_update_status_endpoint_rejects_disallowed_changes(api, staff, application):
+    api.force_authenticate(staff)
+    response = api.patch(f'/api/applications/{application.pk}/update_status/', {'status': 'APPROVED'}, format='json')
+    assert response.status_code == 400
+    assert 'status' in response.data['error']['errors']
+    response = api.patch(f'/api/applications/{application.pk}/update_status/', {'status': 'IN_REVIEW'}, format='json')
+    assert response.status_code == 200
+    assert response.data['status'] == 'IN_REVIEW'
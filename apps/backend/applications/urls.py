@@ -9,8 +9,9 @@ app_name = 'applications'
 
 router = DefaultRouter()
 router.register(r'types', ApplicationTypeViewSet, basename='application-type')
-router.register(r'', ApplicationViewSet, basename='application')
 router.register(r'tasks', TaskViewSet, basename='task')
+# Registered last: its detail route would otherwise capture 'types/' and 'tasks/'.
+router.register(r'', ApplicationViewSet, basename='application')
 
 urlpatterns = [
     path('', include(router.urls)),
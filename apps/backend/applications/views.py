@@ -1,55 +1,114 @@
 """
 Views for application management.
 """
+import datetime
+import uuid
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Count, F, Max, OuterRef, Subquery, prefetch_related_objects
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from .models import Application, ApplicationType, StatusHistory, Task
+from .models import Application, StatusDurationRollup, StatusHistory, Task
 from .serializers import (
     ApplicationSerializer, ApplicationDetailSerializer, ApplicationCreateSerializer,
-    ApplicationTypeSerializer, ApplicationStatusUpdateSerializer,
-    TaskSerializer, TaskCreateSerializer
+    ApplicationTypeSerializer, ApplicationStatusUpdateSerializer, ApplicationBulkStatusSerializer,
+    StatusHistorySerializer, TaskSerializer, TaskCreateSerializer
 )
-from accounts.models import AuditLog
+from rest_framework.exceptions import ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from accounts import audit
+from accounts.permissions import IsStaffMember
+from accounts.roles import STAFF_ROLES, is_staff_member
+from raylene import catalogs
+from raylene.catalogs import CatalogViewSet
+from raylene.conditional import ConditionalGetMixin
+from raylene.pagination import CountedKeysetPagination
+from raylene.query_budget import QueryBudgetMixin
+from .search import ApplicationSearchFilter, RANK_FIELD, is_ranked
+from . import analytics, counters, export, queue
+from .checklists import ChecklistFilter
+from .status import TooManyApplications, TransitionNotAllowed, bulk_update_status, transition
 
 
-class ApplicationTypeViewSet(viewsets.ReadOnlyModelViewSet):
-    """View set for application types."""
-    queryset = ApplicationType.objects.filter(is_active=True)
+class ApplicationTypeViewSet(QueryBudgetMixin, CatalogViewSet):
+    """View set for application types, served from the catalog snapshot."""
+    catalog = catalogs.APPLICATION_TYPES
     serializer_class = ApplicationTypeSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'slug'
+    # One query when the snapshot is reloaded, none otherwise.
+    query_budget = {'list': 1, 'retrieve': 1}
+
 
+class ApplicationViewSet(QueryBudgetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    """
+    View set for applications.
 
-class ApplicationViewSet(viewsets.ModelViewSet):
-    """View set for applications."""
+    Lists are cursor-paginated on the chosen ordering field and ``id``; pass
+    ``count=estimate`` or ``count=exact`` to include a total. ``search`` uses
+    the full-text index and, without an explicit ``ordering``, returns the
+    best matches first. GETs honour ``If-None-Match`` / ``If-Modified-Since``.
+    """
     queryset = Application.objects.all()  # Required for router basename
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CountedKeysetPagination
+    filter_backends = [DjangoFilterBackend, ApplicationSearchFilter, ChecklistFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'priority', 'application_type', 'assigned_to']
     search_fields = ['notes', 'internal_notes', 'dha_ref']
-    ordering_fields = ['created_at', 'updated_at', 'submitted_at']
+    ordering_fields = ['created_at', 'updated_at', 'submitted_at', 'completeness']
     ordering = ['-created_at']
+    query_budget = {
+        'list': 2,
+        'retrieve': 4,
+        'update_status': 12,
+        'status_history': 2,
+        'dashboard': 1,
+        'time_in_status': 2,
+        'my_queue': 3,
+    }
+
+    @property
+    def keyset_ordering(self):
+        """Order ranked search results by relevance unless ``ordering`` is given."""
+        params = self.request.query_params
+        if params.get('search') and not params.get('ordering') and is_ranked(self.queryset.db):
+            return f'-{RANK_FIELD}'
+        return None
+    
+    def get_version_annotations(self):
+        """Cover the nested status history, tasks and checklist of the detail view."""
+        history = StatusHistory.objects.filter(application=OuterRef('pk')).order_by().values('application')
+        tasks = Task.objects.filter(application=OuterRef('pk')).order_by().values('application')
+        return {
+            'history_changed': Subquery(history.annotate(changed=Max('created_at')).values('changed')),
+            'tasks_changed': Subquery(tasks.annotate(changed=Max('updated_at')).values('changed')),
+            'task_count': Subquery(tasks.annotate(count=Count('pk')).values('count')),
+            'checklist_changed': F('checklist__updated_at'),
+        }
     
     def get_queryset(self):
         """Filter applications based on user role."""
         user = self.request.user
         queryset = Application.objects.select_related('client', 'application_type', 'assigned_to')
+        if self.action in ('retrieve', 'update_status'):
+            queryset = queryset.select_related('checklist')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(*ApplicationDetailSerializer.prefetches())
         
-        # Check if user is staff/admin
-        is_staff = user.is_staff or user.user_roles.filter(role__code__in=['ADMIN', 'CONSULTANT', 'FINANCE', 'SUPPORT']).exists()
-        
-        if is_staff:
+        if is_staff_member(user, STAFF_ROLES):
             # Staff can see all applications or filtered
             return queryset
         else:
             # Clients only see their own applications
-            return queryset.filter(client=user)
+            return queryset.filter(client_id=user.pk)
     
     def get_serializer_class(self):
         """Return appropriate serializer."""
@@ -59,56 +118,204 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             return ApplicationDetailSerializer
         elif self.action == 'update_status':
             return ApplicationStatusUpdateSerializer
+        elif self.action == 'bulk_status':
+            return ApplicationBulkStatusSerializer
         return ApplicationSerializer
     
     def perform_create(self, serializer):
         """Create application with client set to current user."""
-        serializer.save(client=self.request.user)
+        serializer.save(client_id=self.request.user.pk)
+
+    def perform_update(self, serializer):
+        """Save the update; a status change goes through the state machine."""
+        application = serializer.instance
+        new_status = serializer.validated_data.pop('status', application.status)
+        with transaction.atomic():
+            if new_status != application.status:
+                self._transition(application, new_status)
+            serializer.save()
+
+    def _transition(self, application, new_status, note='', expected_status=None):
+        try:
+            return transition(application, new_status, note, user=self.request.user,
+                              request=self.request, expected_status=expected_status)
+        except TransitionNotAllowed as exc:
+            raise ValidationError({'status': str(exc)})
     
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
-        """Update application status and create history entry."""
+        """
+        Move the application to another status and record the change.
+
+        The change must be allowed by ``Application.STATUS_TRANSITIONS`` (400
+        otherwise). It only applies if the status is still ``expected_status``
+        (default: the status when the request was read); otherwise 409.
+        """
         application = self.get_object()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        old_status = application.status
-        new_status = serializer.validated_data['status']
-        note = serializer.validated_data.get('note', '')
-        
-        # Update application
-        application.status = new_status
-        if new_status == 'SUBMITTED' and not application.submitted_at:
-            application.submitted_at = timezone.now()
-        application.save()
-        
-        # Create status history
-        StatusHistory.objects.create(
-            application=application,
-            from_status=old_status,
-            to_status=new_status,
-            note=note,
-            changed_by=request.user
-        )
-        
-        # Create audit log
-        AuditLog.objects.create(
-            actor=request.user,
-            action='UPDATE_STATUS',
-            entity_type='Application',
-            entity_id=application.id,
-            meta={'from': old_status, 'to': new_status, 'note': note},
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')
-        )
+        self._transition(application, data['status'], data.get('note', ''), data.get('expected_status'))
         
+        prefetch_related_objects([application], *ApplicationDetailSerializer.prefetches())
         return Response(ApplicationDetailSerializer(application).data)
     
+    @action(detail=False, methods=['post'], permission_classes=[IsStaffMember])
+    def bulk_status(self, request):
+        """
+        Move many applications to one status in a single transaction.
+
+        Select them by ``ids`` or by a ``filter`` on status, priority,
+        application_type and assigned_to. Returns one result per application:
+        ``updated``, ``unchanged``, ``not_allowed`` (by the state machine) or
+        (for unknown ids) ``not_found``.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Application.objects.all()
+        try:
+            if 'filter' in data:
+                queryset = queryset.filter(**{
+                    name if name in ('status', 'priority') else f'{name}_id': value
+                    for name, value in data['filter'].items()
+                })
+            result = bulk_update_status(
+                queryset, data['status'], data['note'], user=request.user, request=request,
+                ids=data.get('ids'), limit=serializer.MAX_APPLICATIONS,
+            )
+        except TooManyApplications as exc:
+            raise ValidationError({'filter': str(exc)})
+        except DjangoValidationError as exc:
+            raise ValidationError({'filter': exc.messages})
+        return Response({'updated': result.updated, 'results': result.results})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffMember])
+    def dashboard(self, request):
+        """
+        Application counts from the status counters.
+
+        ``group_by`` is a comma-separated subset of status, application_type
+        and assigned_to (default: status). ``status``, ``application_type``
+        and ``assigned_to`` (a user id or ``none``) narrow the counts.
+        """
+        params = request.query_params
+        group_by = [name for name in params.get('group_by', 'status').split(',') if name]
+        unknown = [name for name in group_by if name not in counters.DIMENSIONS]
+        if unknown or not group_by:
+            raise ValidationError({'group_by': f'Choose from: {", ".join(counters.DIMENSIONS)}.'})
+
+        filters = {}
+        if params.get('status'):
+            filters['status'] = params['status']
+        for name in ('application_type', 'assigned_to'):
+            value = params.get(name)
+            if not value:
+                continue
+            if name == 'assigned_to' and value == 'none':
+                filters['assigned_to__isnull'] = True
+                continue
+            try:
+                filters[f'{name}_id'] = uuid.UUID(value)
+            except ValueError:
+                raise ValidationError({name: 'Must be a valid UUID.'})
+
+        rows = counters.summarize(group_by, **filters)
+        return Response({'total': sum(row['count'] for row in rows), 'results': rows})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffMember])
+    def time_in_status(self, request):
+        """
+        How long applications stay in each status, from the daily rollup.
+
+        Filter by ``status`` and ``application_type``; ``since`` and ``until``
+        (ISO dates, inclusive) default to the last 90 days. Percentiles over
+        several days are merged from per-day histograms (within 5%). Pass
+        ``daily=true`` for the per-day rows as well.
+        """
+        params = request.query_params
+        until = self._date_param('until') or timezone.localdate()
+        since = self._date_param('since') or until - datetime.timedelta(days=89)
+        rollups = StatusDurationRollup.objects.filter(day__gte=since, day__lte=until)
+        if params.get('status'):
+            rollups = rollups.filter(status=params['status'])
+        if params.get('application_type'):
+            try:
+                rollups = rollups.filter(application_type_id=uuid.UUID(params['application_type']))
+            except ValueError:
+                raise ValidationError({'application_type': 'Must be a valid UUID.'})
+        rollups = list(rollups.order_by('day', 'status'))
+
+        data = {
+            'since': since,
+            'until': until,
+            'as_of': analytics.watermark(),
+            'results': analytics.summarize(rollups),
+        }
+        if params.get('daily') in ('1', 'true'):
+            data['daily'] = [
+                {'day': row.day, 'status': row.status, 'application_type': row.application_type_id,
+                 'intervals': row.intervals, 'p50_seconds': row.p50_seconds,
+                 'p90_seconds': row.p90_seconds, 'p99_seconds': row.p99_seconds}
+                for row in rollups
+            ]
+        return Response(data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffMember])
+    def my_queue(self, request):
+        """
+        The requesting consultant's work queue.
+
+        Open tasks assigned to them that are overdue or due within two days,
+        documents awaiting review on their applications and their
+        applications waiting on staff, by priority then age. Cached per
+        consultant and refreshed when those rows change.
+        """
+        return Response(queue.get_queue(request.user.pk))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffMember],
+            content_negotiation_class=export.ExportContentNegotiation)
+    def export(self, request):
+        """
+        Stream the matching applications as CSV or NDJSON.
+
+        Takes the list filters, ``search`` and ``ordering``; ``output`` is
+        ``csv`` (default) or ``ndjson``. All matching rows are returned, unpaginated.
+        """
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in export.FORMATS:
+            raise ValidationError({'output': f'Use one of: {", ".join(export.FORMATS)}.'})
+        queryset = self.filter_queryset(self.get_queryset())
+        audit.record(
+            'EXPORT_APPLICATIONS', 'ApplicationExport', uuid.uuid4(),
+            meta={'output': fmt, 'query': request.query_params.dict()},
+            request=request,
+        )
+        response = StreamingHttpResponse(export.stream(queryset, fmt), content_type=export.FORMATS[fmt])
+        response['Content-Disposition'] = (
+            f'attachment; filename="applications-{timezone.localdate():%Y%m%d}.{fmt}"'
+        )
+        return response
+
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({name: 'Must be an ISO date.'})
+        return day
+
     @action(detail=True, methods=['get'])
     def status_history(self, request, pk=None):
         """Get status history for application."""
         application = self.get_object()
-        history = application.status_history.all()
+        history = application.status_history.select_related('changed_by')
         serializer = StatusHistorySerializer(history, many=True)
         return Response(serializer.data)
     
@@ -122,7 +329,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(QueryBudgetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set for tasks."""
     queryset = Task.objects.all()  # Required for router basename
     serializer_class = TaskSerializer
@@ -131,17 +338,17 @@ class TaskViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'assigned_to', 'application']
     ordering_fields = ['due_date', 'created_at']
     ordering = ['due_date', 'created_at']
+    query_budget = {'list': 2, 'retrieve': 2, 'complete': 2}
     
     def get_queryset(self):
         """Filter tasks based on user."""
         user = self.request.user
-        is_staff = user.is_staff or user.user_roles.filter(role__code__in=['ADMIN', 'CONSULTANT']).exists()
-        
-        if is_staff:
-            return Task.objects.all()
+        queryset = Task.objects.select_related('assigned_to')
+        if is_staff_member(user, ['ADMIN', 'CONSULTANT']):
+            return queryset
         else:
             # Clients only see tasks for their applications
-            return Task.objects.filter(application__client=user)
+            return queryset.filter(application__client_id=user.pk)
     
     def perform_create(self, serializer):
         """Create task with application."""
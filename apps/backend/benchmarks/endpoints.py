@@ -0,0 +1,99 @@
+"""
+Discovery and measurement of router endpoints for ``benchmark_api``.
+"""
+import re
+import time
+from dataclasses import dataclass
+
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.viewsets import ViewSetMixin
+
+from raylene.query_budget import QueryCounter
+
+from .harness import gc_paused, percentile
+
+GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+PLACEHOLDER = re.compile(r'\{\w+\}')
+
+
+@dataclass
+class Endpoint:
+    """A GET route registered on a DRF router."""
+    route: str
+    viewset: type
+    detail: bool
+
+    def url(self, lookup=None):
+        """Return the path, with the lookup placeholder filled in on detail routes."""
+        return '/' + PLACEHOLDER.sub(str(lookup), self.route)
+
+
+def _route(prefix, regex):
+    route = GROUP.sub(r'{\1}', prefix + regex.replace('^', '').replace('$', ''))
+    return route.replace('\\', '')
+
+
+def router_endpoints(resolver=None, prefix=''):
+    """Yield an ``Endpoint`` for every router GET route, in URLconf order."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        text = str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from router_endpoints(pattern, prefix + text.lstrip('^').rstrip('$'))
+            continue
+        if not isinstance(pattern, URLPattern):
+            continue
+        viewset = getattr(pattern.callback, 'cls', None)
+        actions = getattr(pattern.callback, 'actions', None) or {}
+        if viewset is None or not issubclass(viewset, ViewSetMixin) or 'get' not in actions:
+            continue
+        if '<format>' in text:
+            continue
+        route = _route(prefix, text)
+        yield Endpoint(route=route, viewset=viewset, detail=bool(GROUP.search(text)))
+
+
+def results_of(response):
+    """Return the result list of a list response, paginated or not."""
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict):
+        data = data.get('results')
+    return data if isinstance(data, list) else []
+
+
+def _body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def measure(api, url, repeat):
+    """
+    Call ``url`` once to warm caches, then ``repeat`` times.
+
+    Returns the last response and a metrics dict (status, queries of one
+    call, p50/p95 latency in ms and response size in bytes). Streaming
+    bodies are read in full inside the timed call. The garbage collector
+    is paused while timing (see ``gc_paused``).
+    """
+    response = api.get(url)
+    body = _body(response)
+    samples = []
+    counter = QueryCounter()
+    with gc_paused():
+        for _ in range(repeat):
+            counter.count = 0
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = api.get(url)
+                # Streaming responses run their queries while being read.
+                body = _body(response)
+                samples.append((time.perf_counter() - start) * 1000)
+    return response, {
+        'status': response.status_code,
+        'queries': counter.count,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'bytes': len(body),
+    }
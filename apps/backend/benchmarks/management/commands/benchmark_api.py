@@ -0,0 +1,167 @@
+"""
+Query-count, latency and payload-size regression check for every router endpoint.
+"""
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.endpoints import measure, results_of, router_endpoints
+from benchmarks.harness import benchmark_database, format_table
+from benchmarks.seed import seed
+
+BASELINE_DIR = Path(__file__).resolve().parents[2] / 'baselines'
+DEFAULT_THRESHOLDS = {
+    # Extra queries allowed per call.
+    'queries': 0,
+    # p95 may grow to ratio * baseline + slack; timings vary between machines.
+    'p95_ratio': 2.0,
+    'p95_slack_ms': 10.0,
+    'bytes_ratio': 1.1,
+}
+DEFAULT_REPEAT = 50
+COLUMNS = ['endpoint', 'status', 'queries', 'p50_ms', 'p95_ms', 'bytes', 'result']
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database, GET every router endpoint as a client and as '
+        'staff, and compare query counts, p50/p95 latency and response sizes with '
+        'the checked-in baseline (benchmarks/baselines/api-<vendor>.json). Status, '
+        'query counts and sizes fail the check; p95 latency only warns unless '
+        '--strict-latency is given. Uses the configured database: SQLite with '
+        'USE_SQLITE=True or DEBUG, otherwise the PostgreSQL server from DB_HOST/DB_NAME.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1,
+                            help='Data volume multiplier (see benchmarks.seed).')
+        parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                            help='Timed calls per endpoint and user.')
+        parser.add_argument('--baseline', default=None,
+                            help='Baseline file (default: baselines/api-<vendor>.json).')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Write the results as the new baseline instead of comparing.')
+        parser.add_argument('--only', default=None,
+                            help='Only endpoints whose route contains this text.')
+        parser.add_argument('--strict-latency', action='store_true',
+                            help='Fail, rather than warn, when p95 latency is over its threshold.')
+        for name, default in DEFAULT_THRESHOLDS.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=type(default), default=None,
+                                help=f'Override the baseline threshold (default {default}).')
+
+    def handle(self, *args, **options):
+        with benchmark_database() as db:
+            vendor = db.vendor
+            results = self.run(options['scale'], options['repeat'], options['only'])
+
+        path = Path(options['baseline'] or BASELINE_DIR / f'api-{vendor}.json')
+        if options['update_baseline']:
+            self.write_baseline(path, vendor, options['scale'], results)
+            return
+
+        if not path.exists():
+            raise CommandError(f'No baseline at {path}; run with --update-baseline first.')
+        baseline = json.loads(path.read_text())
+        thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}))
+        thresholds.update({k: options[k] for k in DEFAULT_THRESHOLDS if options[k] is not None})
+        if baseline.get('scale') != options['scale']:
+            self.stdout.write(self.style.WARNING(
+                f'Baseline was recorded at scale {baseline.get("scale")}, not {options["scale"]}.'
+            ))
+
+        rows, failures, warnings = self.compare(
+            results, baseline.get('endpoints', {}), thresholds, options['only'],
+        )
+        self.stdout.write(format_table(rows, COLUMNS))
+        if options['strict_latency']:
+            failures += warnings
+        else:
+            for warning in warnings:
+                self.stdout.write(self.style.WARNING(warning))
+        if failures:
+            for failure in failures:
+                self.stderr.write(failure)
+            raise CommandError(f'{len(failures)} regression(s) against {path}.')
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} endpoint checks within thresholds.'))
+
+    def run(self, scale, repeat, only):
+        from rest_framework.test import APIClient
+
+        data = seed(scale=scale)
+        users = {'client': data.client, 'staff': data.admin}
+        # List routes first: detail routes reuse an object from the list.
+        endpoints = sorted(router_endpoints(), key=lambda e: e.detail)
+
+        results = {}
+        for role, user in users.items():
+            api = APIClient()
+            api.force_authenticate(user)
+            lookups = {}
+            for endpoint in endpoints:
+                if only and only not in endpoint.route:
+                    continue
+                key = f'{role} GET /{endpoint.route}'
+                if endpoint.detail:
+                    lookup = lookups.get(endpoint.viewset)
+                    if lookup is None:
+                        results[key] = {'status': None, 'skipped': 'no object visible in the list'}
+                        continue
+                    url = endpoint.url(lookup)
+                else:
+                    url = endpoint.url()
+                response, metrics = measure(api, url, repeat)
+                results[key] = metrics
+                if not endpoint.detail and endpoint.viewset not in lookups:
+                    field = endpoint.viewset.lookup_field
+                    items = results_of(response)
+                    if items:
+                        lookups[endpoint.viewset] = items[0].get('id' if field == 'pk' else field)
+        return results
+
+    def write_baseline(self, path, vendor, scale, results):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'vendor': vendor,
+            'scale': scale,
+            'thresholds': DEFAULT_THRESHOLDS,
+            'endpoints': results,
+        }
+        path.write_text(json.dumps(payload, indent=2, sort_keys=True) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} endpoint results to {path}.'))
+
+    def compare(self, results, baseline, thresholds, only=None):
+        """
+        Return table rows, failures and latency warnings.
+
+        Latency varies with the machine and its load, so it is reported
+        separately from the deterministic status, query and size checks.
+        """
+        rows, failures, warnings = [], [], []
+        for key, metrics in results.items():
+            base = baseline.get(key)
+            problems, slow = [], []
+            if 'skipped' in metrics:
+                result = 'skipped'
+            elif base is None:
+                result = 'new'
+            else:
+                if metrics['status'] != base.get('status'):
+                    problems.append(f'status {base.get("status")} -> {metrics["status"]}')
+                if metrics['queries'] > base['queries'] + thresholds['queries']:
+                    problems.append(f'queries {base["queries"]} -> {metrics["queries"]}')
+                limit = base['p95_ms'] * thresholds['p95_ratio'] + thresholds['p95_slack_ms']
+                if metrics['p95_ms'] > limit:
+                    slow.append(f'p95 {base["p95_ms"]}ms -> {metrics["p95_ms"]}ms (limit {limit:.1f}ms)')
+                if metrics['bytes'] > base['bytes'] * thresholds['bytes_ratio']:
+                    problems.append(f'bytes {base["bytes"]} -> {metrics["bytes"]}')
+                result = 'FAIL' if problems else 'slow' if slow else 'ok'
+            failures.extend(f'{key}: {problem}' for problem in problems)
+            warnings.extend(f'{key}: {problem}' for problem in slow)
+            rows.append({'endpoint': key, **{c: metrics.get(c, '') for c in COLUMNS[1:-1]}, 'result': result})
+        for key in sorted(baseline.keys() - results.keys()):
+            # Keys are '<role> GET /<route>'; --only filters on the route.
+            if only and only not in key.partition(' /')[2]:
+                continue
+            rows.append({'endpoint': key, 'result': 'missing'})
+        return rows, failures, warnings
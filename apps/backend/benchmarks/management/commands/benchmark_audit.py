@@ -0,0 +1,66 @@
+"""
+Compare per-request latency of inline AuditLog inserts with the batched sink.
+"""
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from benchmarks.harness import benchmark_database, format_table, summarize, time_calls
+
+
+class Command(BaseCommand):
+    help = 'Benchmark inline AuditLog writes against accounts.audit batching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Simulated requests per mode.')
+        parser.add_argument('--entries', type=int, default=3,
+                            help='Audit entries recorded per request.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            rows = self.run(options['requests'], options['entries'])
+        self.stdout.write(format_table(rows, ['mode', 'n', 'p50_ms', 'p95_ms', 'mean_ms', 'total_ms']))
+
+    def run(self, requests, entries):
+        from accounts import audit
+        from accounts.models import AuditLog, User
+
+        actor = User.objects.create_user('bench-audit@example.com', 'x')
+        entity_ids = [uuid.uuid4() for _ in range(requests)]
+
+        def business_write():
+            # Stand-in for the mutation the audit entry describes.
+            User.objects.filter(pk=actor.pk).update(two_factor_enabled=False)
+
+        def inline(i):
+            with transaction.atomic():
+                business_write()
+                for n in range(entries):
+                    AuditLog.objects.create(
+                        actor=actor, action='BENCH', entity_type='Bench',
+                        entity_id=entity_ids[i], meta={'n': n},
+                    )
+
+        def batched(i):
+            with transaction.atomic():
+                business_write()
+                for n in range(entries):
+                    audit.record('BENCH', 'Bench', entity_ids[i], actor=actor, meta={'n': n})
+
+        def strict(i):
+            with transaction.atomic():
+                business_write()
+                for n in range(entries):
+                    audit.record('BENCH', 'Bench', entity_ids[i], actor=actor, meta={'n': n}, strict=True)
+
+        rows = []
+        for name, func in [('inline', inline), ('batched', batched), ('strict', strict)]:
+            AuditLog.objects.all().delete()
+            samples = time_calls(func, requests)
+            written = AuditLog.objects.count()
+            if written != requests * entries:
+                raise AssertionError(f'{name}: wrote {written} entries, expected {requests * entries}')
+            rows.append({'mode': name, **summarize(samples)})
+        return rows
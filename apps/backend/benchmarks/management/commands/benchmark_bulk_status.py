@@ -0,0 +1,82 @@
+"""
+Compare one bulk status change with the same change made one call at a time.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks.harness import benchmark_database, format_table, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark POST /api/applications/bulk_status/ against N calls to '
+        'PATCH /api/applications/<id>/update_status/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applications', type=int, default=200,
+                            help='Applications moved per batch.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Batches per mode.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            rows = self.run(options['applications'], options['repeat'])
+        self.stdout.write(format_table(
+            rows, ['mode', 'n', 'queries', 'p50_ms', 'p95_ms', 'mean_ms', 'total_ms'],
+        ))
+
+    def run(self, count, repeat):
+        from rest_framework.test import APIClient
+
+        from accounts.models import User
+        from applications.models import Application, ApplicationType, StatusHistory
+
+        staff = User.objects.create_user('bench-status@example.com', 'x', is_staff=True)
+        client = User.objects.create_user('bench-client@example.com', 'x')
+        application_type = ApplicationType.objects.create(code='BENCH', name='Bench', slug='bench')
+        Application.objects.bulk_create(
+            Application(client=client, application_type=application_type, country='ZA',
+                        status='READY_TO_SUBMIT')
+            for _ in range(count)
+        )
+        ids = [str(pk) for pk in Application.objects.values_list('pk', flat=True)]
+        api = APIClient()
+        api.force_authenticate(staff)
+
+        def single():
+            for pk in ids:
+                response = api.patch(f'/api/applications/{pk}/update_status/',
+                                     {'status': 'SUBMITTED', 'note': 'DHA batch'}, format='json')
+                assert response.status_code == 200, response.data
+
+        def bulk():
+            response = api.post('/api/applications/bulk_status/',
+                                {'ids': ids, 'status': 'SUBMITTED', 'note': 'DHA batch'}, format='json')
+            assert response.status_code == 200 and response.data['updated'] == count, response.data
+
+        executed = []
+
+        def count_queries(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        rows = []
+        for name, func in [('single', single), ('bulk', bulk)]:
+            samples = []
+            for _ in range(repeat):
+                Application.objects.update(status='READY_TO_SUBMIT', submitted_at=None)
+                StatusHistory.objects.all().delete()
+                executed.clear()
+                with connection.execute_wrapper(count_queries):
+                    start = time.perf_counter()
+                    func()
+                    samples.append((time.perf_counter() - start) * 1000)
+                queries = len(executed)
+                moved = StatusHistory.objects.filter(to_status='SUBMITTED').count()
+                if moved != count:
+                    raise AssertionError(f'{name}: wrote {moved} history rows, expected {count}')
+            rows.append({'mode': name, 'queries': queries, **summarize(samples)})
+        return rows
@@ -0,0 +1,110 @@
+"""
+Measure presigned upload URLs per second: a client built per request
+against the shared client, and N single presign calls against one batch.
+"""
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from benchmarks.harness import benchmark_database, format_table, summarize, time_calls
+
+S3_SETTINGS = {
+    'AWS_ACCESS_KEY_ID': 'AKIABENCHMARK000000',
+    'AWS_SECRET_ACCESS_KEY': 'bench-secret',
+    'AWS_STORAGE_BUCKET_NAME': 'bench-uploads',
+    'AWS_S3_ENDPOINT_URL': 'https://s3.bench.invalid',
+    'AWS_S3_REGION_NAME': 'af-south-1',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark presigning uploads with a new S3 client per request, the '
+        'shared client, POST /api/documents/uploads/presign/ per file and '
+        'POST /api/documents/uploads/presign/batch/. S3 is stubbed with '
+        'botocore.stub.Stubber, so nothing leaves the machine.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=5,
+                            help='Uploads presigned per request.')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Requests per mode.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(), override_settings(**S3_SETTINGS):
+            rows = self.run(options['files'], options['repeat'])
+        self.stdout.write(format_table(
+            rows, ['mode', 'n', 'p50_ms', 'p95_ms', 'mean_ms', 'signatures_per_s'],
+        ))
+
+    def run(self, files, repeat):
+        from botocore.stub import Stubber
+        from rest_framework.test import APIClient
+
+        from accounts.models import User
+        from documents import storage
+        from documents.models import DocumentType
+
+        build_client = storage._build_client
+        stubbers = []
+
+        def stubbed_client():
+            # Any S3 API call would raise instead of reaching the network.
+            client = build_client()
+            stubber = Stubber(client)
+            stubber.activate()
+            stubbers.append(stubber)
+            return client
+
+        user = User.objects.create_user('bench-presign@example.com', 'x')
+        document_type = DocumentType.objects.create(
+            code='BENCH_UPLOAD', name='Bench upload', mime_types=['application/pdf'], max_size_mb=5,
+        )
+        uploads = [
+            {'document_type': str(document_type.pk), 'filename': f'statement-{n}.pdf',
+             'content_type': 'application/pdf', 'size': 250_000}
+            for n in range(files)
+        ]
+        api = APIClient()
+        api.force_authenticate(user)
+
+        def client_per_request(i):
+            storage.reset_client()
+            for upload in uploads:
+                storage.presign_upload(storage.upload_key(user, upload['filename']), upload['content_type'])
+
+        def shared_client(i):
+            for upload in uploads:
+                storage.presign_upload(storage.upload_key(user, upload['filename']), upload['content_type'])
+
+        def single_endpoint(i):
+            for upload in uploads:
+                response = api.post('/api/documents/uploads/presign/', upload, format='json')
+                assert response.status_code == 200, response.data
+
+        def batch_endpoint(i):
+            response = api.post('/api/documents/uploads/presign/batch/', {'files': uploads}, format='json')
+            assert response.status_code == 200 and len(response.data['uploads']) == files, response.data
+
+        rows = []
+        modes = [
+            ('client per request', client_per_request),
+            ('shared client', shared_client),
+            ('single endpoint x files', single_endpoint),
+            ('batch endpoint', batch_endpoint),
+        ]
+        with mock.patch.object(storage, '_build_client', stubbed_client):
+            for name, func in modes:
+                storage.reset_client()
+                func(-1)  # Warm up: imports, URL resolution, the shared client.
+                samples = time_calls(func, repeat)
+                summary = summarize(samples)
+                summary['signatures_per_s'] = round(files * repeat / (summary['total_ms'] / 1000))
+                rows.append({'mode': name, **summary})
+            storage.reset_client()
+        for stubber in stubbers:
+            stubber.assert_no_pending_responses()
+            stubber.deactivate()
+        return rows
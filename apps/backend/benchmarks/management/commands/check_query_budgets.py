@@ -0,0 +1,93 @@
+"""
+Fail when an API endpoint runs more queries than its declared budget.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.harness import benchmark_database, format_table
+from benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database, call the API endpoints that declare a '
+        'query_budget and exit non-zero if any of them goes over it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1,
+                            help='Data volume multiplier (see benchmarks.seed).')
+        parser.add_argument('--history', type=int, default=12,
+                            help='Status history entries per application.')
+        parser.add_argument('--tasks', type=int, default=6,
+                            help='Tasks per application.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            rows = self.run(options['scale'], options['history'], options['tasks'])
+        self.stdout.write(format_table(rows, ['endpoint', 'user', 'status', 'queries', 'budget', 'result']))
+        over = [row for row in rows if row['result'] != 'ok']
+        if over:
+            raise CommandError(f'{len(over)} endpoint(s) over their query budget or failing.')
+        self.stdout.write(self.style.SUCCESS('All endpoints within their query budgets.'))
+
+    def run(self, scale, history, tasks):
+        from rest_framework.test import APIClient
+
+        from applications.models import Application, Task
+
+        data = seed(scale=scale, history=history, tasks=tasks)
+        admin, client, types = data.admin, data.client, data.application_types
+        own = Application.objects.filter(client=client).first()
+        task = Task.objects.filter(application=own).first()
+        app = data.applications[0]
+        # Status changes must follow the state machine: warm up with
+        # DRAFT -> INTAKE and measure INTAKE -> IN_REVIEW.
+        Application.objects.filter(pk=app.pk).update(status='DRAFT')
+        warmups = {f'/api/applications/{app.pk}/update_status/': {'status': 'INTAKE'}}
+
+        calls = [
+            (admin, 'get', '/api/applications/', None),
+            (admin, 'get', '/api/applications/', {'search': 'passport'}),
+            (admin, 'get', '/api/applications/', {'count': 'exact', 'status': 'DRAFT'}),
+            (admin, 'get', '/api/applications/', {'complete': 'false', 'ordering': 'completeness'}),
+            (admin, 'get', f'/api/applications/{app.pk}/', None),
+            (admin, 'patch', f'/api/applications/{app.pk}/update_status/', {'status': 'IN_REVIEW'}),
+            (admin, 'get', f'/api/applications/{app.pk}/status_history/', None),
+            (admin, 'get', '/api/applications/dashboard/', {'group_by': 'status,assigned_to'}),
+            (admin, 'get', '/api/applications/types/', None),
+            (admin, 'get', f'/api/applications/types/{types[0].slug}/', None),
+            (admin, 'get', '/api/applications/tasks/', None),
+            (admin, 'get', f'/api/applications/tasks/{task.pk}/', None),
+            (admin, 'patch', f'/api/applications/tasks/{task.pk}/complete/', None),
+            (admin, 'get', '/api/admin/audit-logs/', {'entity_type': 'Application', 'entity_id': str(app.pk)}),
+            (client, 'get', '/api/applications/', None),
+            (client, 'get', f'/api/applications/{own.pk}/', None),
+            (client, 'get', '/api/applications/tasks/', None),
+        ]
+
+        rows = []
+        for user, method, path, params in calls:
+            api = APIClient()
+            api.force_authenticate(user)
+            send = getattr(api, method)
+            kwargs = {'format': 'json'} if method != 'get' else {}
+            # The first call warms per-user caches (roles); measure the second.
+            send(path, warmups.get(path, params), **kwargs)
+            response = send(path, params, **kwargs)
+            queries = getattr(response, 'query_count', None)
+            budget = getattr(response, 'query_budget', None)
+            if response.status_code >= 400:
+                result = f'HTTP {response.status_code}'
+            elif budget is None:
+                result = 'no budget'
+            else:
+                result = 'ok' if queries <= budget else 'OVER'
+            rows.append({
+                'endpoint': f'{method.upper()} {path}' + (f' {params}' if params and method == 'get' else ''),
+                'user': 'staff' if user.is_staff else 'client',
+                'status': response.status_code,
+                'queries': queries,
+                'budget': budget,
+                'result': result,
+            })
+        return rows
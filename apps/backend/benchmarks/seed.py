@@ -0,0 +1,150 @@
+"""
+Seed data for benchmarks and query-budget checks.
+
+``seed()`` fills an empty (benchmark) database with a deterministic,
+proportionate data set for every app: ``scale=1`` is a small agency
+(20 clients, 60 applications with history, tasks, documents, messages,
+bookings and invoices); volumes grow linearly with ``scale``.
+"""
+import datetime
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.utils import timezone
+
+PASSWORD = 'bench-password'
+
+
+def _role(code):
+    from accounts.models import Role
+
+    return Role.objects.get_or_create(code=code, defaults={'name': code.title()})[0]
+
+
+def seed(scale=1, history=10, tasks=4, documents=3, messages=5, seed_value=16):
+    """
+    Create users and data across all apps; return a namespace of handles.
+
+    ``admin`` holds the ADMIN role, ``consultants`` the CONSULTANT role and
+    ``client`` is a client owning applications, documents, bookings,
+    invoices, messages and notifications.
+    """
+    from accounts import audit
+    from accounts.models import User, UserRole
+    from applications import checklists, counters
+    from applications.models import Application, ApplicationType, StatusHistory, Task
+    from billing.models import Invoice, Payment
+    from bookings.models import AvailabilitySlot, Booking
+    from communications.models import Message, Notification, Template
+    from content.models import BlogPost, Page, PageContent
+    from documents.models import Document, DocumentType
+
+    rng = random.Random(seed_value)
+    now = timezone.now()
+    statuses = [code for code, _ in Application.STATUS_CHOICES]
+
+    admin = User.objects.create_user('bench-admin@example.com', PASSWORD, is_staff=True)
+    UserRole.objects.create(user=admin, role=_role('ADMIN'))
+    consultants = []
+    for i in range(max(2, 2 * scale)):
+        consultant = User.objects.create_user(f'bench-consultant{i}@example.com', PASSWORD, is_staff=True)
+        UserRole.objects.create(user=consultant, role=_role('CONSULTANT'))
+        consultants.append(consultant)
+    clients = [User.objects.create_user(f'bench-client{i}@example.com', PASSWORD) for i in range(20 * scale)]
+    UserRole.objects.bulk_create(UserRole(user=client, role=_role('CLIENT')) for client in clients)
+
+    types = [
+        ApplicationType.objects.create(code=f'BENCH_{i}', name=f'Bench visa {i}', slug=f'bench-visa-{i}',
+                                       base_price=Decimal('1500.00'),
+                                       doc_requirements=[f'bench_doc_{n}' for n in range(i + 1)])
+        for i in range(4)
+    ]
+    Application.objects.bulk_create(
+        Application(
+            client=clients[i % len(clients)], application_type=rng.choice(types), country='South Africa',
+            assigned_to=rng.choice(consultants + [None]), status=rng.choice(statuses),
+            notes=f'Passport renewal and biometrics appointment {i}', dha_ref=f'DHA-{i:06d}',
+            created_at=now - datetime.timedelta(hours=i),
+        )
+        for i in range(60 * scale)
+    )
+    counters.reconcile()
+    apps = list(Application.objects.order_by('created_at'))
+
+    StatusHistory.objects.bulk_create(
+        StatusHistory(application=app, from_status=rng.choice(statuses), to_status=rng.choice(statuses),
+                      changed_by=rng.choice(consultants), note='Progressed')
+        for app in apps for _ in range(history)
+    )
+    Task.objects.bulk_create(
+        Task(application=app, title=f'Follow up {n}', assigned_to=rng.choice(consultants + [None]),
+             due_date=now + datetime.timedelta(days=n))
+        for app in apps for n in range(tasks)
+    )
+    doc_types = [
+        DocumentType.objects.create(code=f'BENCH_DOC_{i}', name=f'Bench document {i}',
+                                    mime_types=['application/pdf'])
+        for i in range(5)
+    ]
+    Document.objects.bulk_create(
+        Document(application=app, document_type=rng.choice(doc_types), url=f'https://files.example.com/{app.pk}/{n}.pdf',
+                 filename=f'{n}.pdf', size=120_000, mime_type='application/pdf', uploaded_by=app.client)
+        for app in apps for n in range(documents)
+    )
+    checklists.rebuild()
+    Message.objects.bulk_create(
+        Message(application=app, from_user=app.client if n % 2 else rng.choice(consultants),
+                to_user=rng.choice(consultants) if n % 2 else app.client, body=f'Message {n} about the application')
+        for app in apps for n in range(messages)
+    )
+    Notification.objects.bulk_create(
+        Notification(user=client, channel='EMAIL', template_code='STATUS_UPDATE', payload={'n': n}, status='SENT')
+        for client in clients for n in range(10)
+    )
+    Template.objects.bulk_create(
+        Template(code=f'BENCH_TEMPLATE_{i}', name=f'Template {i}', kind='EMAIL', subject='Subject',
+                 body_text='Body ' * 20)
+        for i in range(10)
+    )
+
+    slots = AvailabilitySlot.objects.bulk_create(
+        AvailabilitySlot(staff=consultants[i % len(consultants)], location='ONLINE',
+                         start=now + datetime.timedelta(hours=i), end=now + datetime.timedelta(hours=i, minutes=30))
+        for i in range(40 * scale)
+    )
+    Booking.objects.bulk_create(
+        Booking(client=client, staff=slot.staff, slot=slot, status='CONFIRMED')
+        for client, slot in zip(clients * 2, slots)
+    )
+    invoices = Invoice.objects.bulk_create(
+        Invoice(client=app.client, application=app, number=f'INV-{i:06d}',
+                items=[{'description': 'Service fee', 'amount': 1500}],
+                subtotal=Decimal('1500.00'), tax=Decimal('225.00'), total=Decimal('1725.00'),
+                status='PAID')
+        for i, app in enumerate(apps)
+    )
+    Payment.objects.bulk_create(
+        Payment(invoice=invoice, provider='STRIPE', amount=invoice.total, external_id=f'pf-{i}',
+                status='COMPLETE', paid_at=now)
+        for i, invoice in enumerate(invoices)
+    )
+
+    pages = Page.objects.bulk_create(Page(slug=f'bench-page-{i}', title=f'Page {i}') for i in range(10))
+    PageContent.objects.bulk_create(
+        PageContent(page=page, locale=locale, title=f'{page.title} ({locale})', body='<p>Body</p>' * 20)
+        for page in pages for locale in ('en', 'pt', 'fr')
+    )
+    BlogPost.objects.bulk_create(
+        BlogPost(slug=f'bench-post-{i}', title=f'Post {i}', body_html='<p>Post</p>' * 30, tags=['visa'],
+                 published_at=now - datetime.timedelta(days=i), author=admin)
+        for i in range(30)
+    )
+    audit.record_many([
+        audit.build_entry('UPDATE', 'Application', app.pk, actor=rng.choice(consultants)) for app in apps
+    ], strict=True)
+
+    return SimpleNamespace(
+        admin=admin, consultants=consultants, clients=clients, client=clients[0],
+        applications=apps, application_types=types,
+    )
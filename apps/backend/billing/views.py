@@ -14,7 +14,7 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
         is_staff = user.is_staff
         if is_staff:
             return Invoice.objects.all()
-        return Invoice.objects.filter(client=user)
+        return Invoice.objects.filter(client_id=user.pk)
     
     serializer_class = InvoiceSerializer
 
@@ -30,7 +30,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         is_staff = user.is_staff
         if is_staff:
             return Booking.objects.all()
-        return Booking.objects.filter(client=user)
+        return Booking.objects.filter(client_id=user.pk)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -38,5 +38,5 @@ class BookingViewSet(viewsets.ModelViewSet):
         return BookingSerializer
     
     def perform_create(self, serializer):
-        serializer.save(client=self.request.user)
+        serializer.save(client_id=self.request.user.pk)
 
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['template_code', 'status', 'created_at'], name='notificatio_templat_f2eb71_idx'),
+        ),
+    ]
@@ -49,6 +49,10 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Re-queueing undelivered notifications (applications.reminders).
+            models.Index(fields=['template_code', 'status', 'created_at']),
+        ]
 
     def __str__(self):
         return f'{self.user.email} - {self.template_code}'
@@ -11,7 +11,7 @@ class MessageViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        return Message.objects.filter(from_user=user) | Message.objects.filter(to_user=user)
+        return Message.objects.filter(from_user_id=user.pk) | Message.objects.filter(to_user_id=user.pk)
     
     serializer_class = MessageSerializer
 
@@ -22,7 +22,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        return Notification.objects.filter(user_id=self.request.user.pk)
     
     serializer_class = NotificationSerializer
 
@@ -0,0 +1,50 @@
+"""
+Shared pytest fixtures.
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Catalog versions, role caches and queue versions are only bumped on
+    # commit, which never happens inside a test transaction.
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def write_through_touches(settings):
+    # No background flusher outliving the test database.
+    settings.TOUCH_FLUSH_INTERVAL = 0
+
+
+@pytest.fixture
+def api():
+    return APIClient()
+
+
+@pytest.fixture
+def staff(db):
+    from accounts.models import Role, User, UserRole
+
+    user = User.objects.create_user('staff@example.com', 'staff-password', is_staff=True)
+    role, _ = Role.objects.get_or_create(code='ADMIN', defaults={'name': 'Admin'})
+    UserRole.objects.create(user=user, role=role)
+    return user
+
+
+@pytest.fixture
+def client_user(db):
+    from accounts.models import User
+
+    return User.objects.create_user('client@example.com', 'client-password')
+
+
+@pytest.fixture
+def application_type(db):
+    from applications.models import ApplicationType
+
+    return ApplicationType.objects.create(code='WORK', name='Work visa', slug='work-visa')
@@ -2,6 +2,8 @@
 Serializers for documents.
 """
 from rest_framework import serializers
+from raylene import catalogs
+from raylene.catalogs import CatalogPrimaryKeyField
 from .models import Document, DocumentType
 
 
@@ -30,6 +32,7 @@ class DocumentSerializer(serializers.ModelSerializer):
 
 class DocumentCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating documents."""
+    document_type = CatalogPrimaryKeyField(catalogs.DOCUMENT_TYPES)
     
     class Meta:
         model = Document
@@ -41,3 +44,39 @@ class DocumentReviewSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Document.STATUS_CHOICES)
     remarks = serializers.CharField(required=False, allow_blank=True)
 
+
+class PresignFileSerializer(serializers.Serializer):
+    """One upload to presign, checked against its document type's rules."""
+    document_type = CatalogPrimaryKeyField(catalogs.DOCUMENT_TYPES)
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        document_type = attrs['document_type']
+        if document_type.mime_types and attrs['content_type'] not in document_type.mime_types:
+            raise serializers.ValidationError(
+                {'content_type': f'{document_type.name} must be one of: {", ".join(document_type.mime_types)}.'}
+            )
+        if attrs['size'] > document_type.max_size_mb * 1024 * 1024:
+            raise serializers.ValidationError(
+                {'size': f'{document_type.name} may be at most {document_type.max_size_mb} MB.'}
+            )
+        return attrs
+
+
+class PresignBatchSerializer(serializers.Serializer):
+    """Serializer for presigning several uploads in one request."""
+    MAX_FILES = 20
+
+    files = PresignFileSerializer(many=True, allow_empty=False, max_length=MAX_FILES)
+
+    def validate_files(self, files):
+        # Uploads are stored under their filename, so a repeated name would
+        # overwrite the earlier file.
+        seen = set()
+        for upload in files:
+            if upload['filename'] in seen:
+                raise serializers.ValidationError(f'Duplicate filename: {upload["filename"]}.')
+            seen.add(upload['filename'])
+        return files
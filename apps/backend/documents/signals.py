@@ -0,0 +1,16 @@
+"""
+Signal handlers for documents app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from raylene import catalogs
+
+from .models import DocumentType
+
+
+@receiver(post_save, sender=DocumentType)
+@receiver(post_delete, sender=DocumentType)
+def refresh_document_type_catalog(sender, using, **kwargs):
+    """Reload every worker's document type snapshot (fixtures included)."""
+    catalogs.DOCUMENT_TYPES.bump(using)
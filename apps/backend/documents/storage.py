@@ -0,0 +1,91 @@
+"""
+S3 access for direct document uploads.
+
+Building a boto3 client (session, credential and endpoint resolution,
+service model loading) costs far more than signing a URL, and clients are
+thread-safe once built. ``get_client()`` therefore builds one client per
+worker process on first use and shares it between requests and threads.
+A process forked after the client was built (e.g. a preloaded web server
+or a prefork Celery worker) builds its own instead of sharing the parent's
+connection pool. ``reset_client()`` drops it; changing an ``AWS_`` setting
+(``override_settings``) does so too.
+
+Presigning is local computation: no request reaches S3 until the client
+uploads.
+"""
+import os
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+PRESIGN_EXPIRES_IN = 3600  # 1 hour
+# Connections kept open by the shared client (boto3's default is 10).
+MAX_POOL_CONNECTIONS = 20
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def _build_client():
+    import boto3
+    from botocore.config import Config
+
+    # A session of its own: boto3's default session is not thread-safe.
+    session = boto3.session.Session()
+    return session.client(
+        's3',
+        endpoint_url=getattr(settings, 'AWS_S3_ENDPOINT_URL', None) or None,
+        region_name=getattr(settings, 'AWS_S3_REGION_NAME', None) or None,
+        aws_access_key_id=getattr(settings, 'AWS_ACCESS_KEY_ID', ''),
+        aws_secret_access_key=getattr(settings, 'AWS_SECRET_ACCESS_KEY', ''),
+        config=Config(signature_version='s3v4', max_pool_connections=MAX_POOL_CONNECTIONS),
+    )
+
+
+def get_client():
+    """Return this process's shared S3 client, building it on first use."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client, _client_pid = _build_client(), pid
+    return _client
+
+
+def reset_client():
+    """Drop the shared client; the next ``get_client()`` builds a new one."""
+    global _client, _client_pid
+    with _lock:
+        _client = _client_pid = None
+
+
+@receiver(setting_changed)
+def reset_client_on_setting_change(setting, **kwargs):
+    if setting.startswith('AWS_'):
+        reset_client()
+
+
+def upload_key(user, filename):
+    """Return the object key a user's upload of ``filename`` is stored under."""
+    return f'documents/{user.id}/{filename}'
+
+
+def presign_upload(key, content_type, size=None, expires_in=PRESIGN_EXPIRES_IN):
+    """
+    Return a presigned PUT URL for ``key``.
+
+    The content type, and the size when given, are part of the signature,
+    so the upload must send exactly those headers.
+    """
+    params = {
+        'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+        'Key': key,
+        'ContentType': content_type,
+    }
+    if size is not None:
+        params['ContentLength'] = size
+    return get_client().generate_presigned_url('put_object', Params=params, ExpiresIn=expires_in)
@@ -3,7 +3,7 @@ URLs for document management.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DocumentViewSet, DocumentTypeViewSet, PresignView
+from .views import DocumentViewSet, DocumentTypeViewSet, PresignBatchView, PresignView
 
 app_name = 'documents'
 
@@ -13,6 +13,7 @@ router.register(r'', DocumentViewSet, basename='document')
 
 urlpatterns = [
     path('uploads/presign/', PresignView.as_view(), name='presign'),
+    path('uploads/presign/batch/', PresignBatchView.as_view(), name='presign-batch'),
     path('', include(router.urls)),
 ]
 
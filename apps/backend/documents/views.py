@@ -7,25 +7,32 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.db import transaction
 from django.utils import timezone
 from rest_framework.views import APIView
-import boto3
-from django.conf import settings
 
-from .models import Document, DocumentType
-from .serializers import DocumentSerializer, DocumentCreateSerializer, DocumentReviewSerializer, DocumentTypeSerializer
-from accounts.models import AuditLog
+from .models import Document
+from . import storage
+from .serializers import (
+    DocumentSerializer, DocumentCreateSerializer, DocumentReviewSerializer, DocumentTypeSerializer,
+    PresignBatchSerializer,
+)
+from accounts import audit
+from accounts.roles import is_staff_member
+from raylene import catalogs
+from raylene.catalogs import CatalogViewSet
+from raylene.conditional import ConditionalGetMixin
 
 
-class DocumentTypeViewSet(viewsets.ReadOnlyModelViewSet):
-    """View set for document types."""
-    queryset = DocumentType.objects.filter(is_active=True)
+class DocumentTypeViewSet(CatalogViewSet):
+    """View set for document types, served from the catalog snapshot."""
+    catalog = catalogs.DOCUMENT_TYPES
     serializer_class = DocumentTypeSerializer
     permission_classes = [IsAuthenticated]
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
-    """View set for documents."""
+class DocumentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    """View set for documents. GETs honour ``If-None-Match`` / ``If-Modified-Since``."""
     queryset = Document.objects.all()  # Required for router basename
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -36,12 +43,10 @@ class DocumentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter documents based on user."""
         user = self.request.user
-        is_staff = user.is_staff or user.user_roles.filter(role__code__in=['ADMIN', 'CONSULTANT', 'FINANCE']).exists()
-        
-        if is_staff:
+        if is_staff_member(user, ['ADMIN', 'CONSULTANT', 'FINANCE']):
             return Document.objects.select_related('application', 'document_type', 'uploaded_by')
         else:
-            return Document.objects.filter(application__client=user).select_related('application', 'document_type')
+            return Document.objects.filter(application__client_id=user.pk).select_related('application', 'document_type')
     
     def get_serializer_class(self):
         """Return appropriate serializer."""
@@ -53,7 +58,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create document with uploaded_by set to current user."""
-        serializer.save(uploaded_by=self.request.user)
+        serializer.save(uploaded_by_id=self.request.user.pk)
     
     @action(detail=True, methods=['patch'])
     def review(self, request, pk=None):
@@ -66,22 +71,19 @@ class DocumentViewSet(viewsets.ModelViewSet):
         new_status = serializer.validated_data['status']
         remarks = serializer.validated_data.get('remarks', '')
         
-        # Update document
-        document.status = new_status
-        document.remarks = remarks
-        document.reviewed_at = timezone.now()
-        document.save()
-        
-        # Create audit log
-        AuditLog.objects.create(
-            actor=request.user,
-            action='REVIEW_DOCUMENT',
-            entity_type='Document',
-            entity_id=document.id,
-            meta={'status': new_status, 'remarks': remarks},
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')
-        )
+        with transaction.atomic():
+            # Update document
+            document.status = new_status
+            document.remarks = remarks
+            document.reviewed_at = timezone.now()
+            document.save()
+            
+            # Audit entry is written in the commit batch
+            audit.record(
+                'REVIEW_DOCUMENT', 'Document', document.id,
+                meta={'status': new_status, 'remarks': remarks},
+                request=request,
+            )
         
         return Response(DocumentSerializer(document).data)
 
@@ -101,31 +103,15 @@ class PresignView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Generate pre-signed URL
-        s3_client = boto3.client(
-            's3',
-            endpoint_url=getattr(settings, 'AWS_S3_ENDPOINT_URL', None),
-            aws_access_key_id=getattr(settings, 'AWS_ACCESS_KEY_ID', ''),
-            aws_secret_access_key=getattr(settings, 'AWS_SECRET_ACCESS_KEY', '')
-        )
-        
-        key = f'documents/{request.user.id}/{filename}'
+        key = storage.upload_key(request.user, filename)
         
         try:
-            url = s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                    'Key': key,
-                    'ContentType': content_type,
-                },
-                ExpiresIn=3600  # 1 hour
-            )
+            url = storage.presign_upload(key, content_type)
             
             return Response({
                 'url': url,
                 'key': key,
-                'expires_in': 3600
+                'expires_in': storage.PRESIGN_EXPIRES_IN
             })
         except Exception as e:
             return Response(
@@ -133,3 +119,37 @@ class PresignView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+class PresignBatchView(APIView):
+    """
+    Generate pre-signed S3 URLs for several uploads in one request.
+
+    Each file names its ``document_type`` and must satisfy that type's MIME
+    types and maximum size; the content type and size are signed, so the
+    upload must match them. Any invalid file fails the whole request (400)
+    with errors by position. All URLs come from the worker's shared client.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = PresignBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            uploads = []
+            for item in serializer.validated_data['files']:
+                key = storage.upload_key(request.user, item['filename'])
+                uploads.append({
+                    'document_type': str(item['document_type'].pk),
+                    'filename': item['filename'],
+                    'content_type': item['content_type'],
+                    'size': item['size'],
+                    'key': key,
+                    'url': storage.presign_upload(key, item['content_type'], item['size']),
+                })
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to generate presigned URLs: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response({'uploads': uploads, 'expires_in': storage.PRESIGN_EXPIRES_IN})
@@ -0,0 +1,186 @@
+"""
+Process-local snapshots of reference catalogs.
+
+Application types, document types and roles change a few times a year but
+are read on almost every request. Each ``Catalog`` keeps an immutable
+``Snapshot`` of its rows (and their serialized form) in worker memory. A
+version stamp in the shared cache is bumped, after commit, whenever a row
+is saved or deleted (see the apps' signal handlers); a worker notices the
+new version on its next read and reloads the snapshot once. Reads cost one
+cache lookup and no query.
+
+Snapshot objects are shared between requests and threads: never modify
+them.
+"""
+import datetime
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+from django.utils.module_loading import import_string
+from rest_framework import serializers, viewsets
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One version of a catalog: model instances, serialized rows and lookup indexes."""
+    version: int
+    objects: tuple
+    data: tuple
+    index: MappingProxyType
+
+    @property
+    def changed_at(self):
+        return datetime.datetime.fromtimestamp(self.version / 1e9, tz=datetime.timezone.utc)
+
+    def get(self, value, field='pk'):
+        return self.index[field].get(str(value))
+
+
+class Catalog:
+    """A reference table served from a process-local snapshot."""
+
+    def __init__(self, name, model, serializer=None, filters=None, lookups=('pk',)):
+        self.name = name
+        self.model_label = model
+        self.serializer_path = serializer
+        self.filters = filters or {}
+        self.lookups = lookups
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per instance; catalogs are shared.
+        return self
+
+    @property
+    def _version_key(self):
+        return f'catalogs:version:{self.name}'
+
+    def queryset(self):
+        return apps.get_model(self.model_label).objects.filter(**self.filters)
+
+    def version(self):
+        version = cache.get(self._version_key)
+        if version is None:
+            # A fresh stamp, so an evicted version is never mistaken for a current one.
+            version = time.time_ns()
+            if not cache.add(self._version_key, version, None):
+                version = cache.get(self._version_key, version)
+        return version
+
+    def bump(self, using=None):
+        """Invalidate every worker's snapshot once the current transaction commits."""
+        transaction.on_commit(lambda: cache.set(self._version_key, time.time_ns(), None), using=using)
+
+    def _load(self, version):
+        objects = tuple(self.queryset())
+        data = ()
+        if self.serializer_path:
+            serializer_class = import_string(self.serializer_path)
+            data = tuple(serializer_class(objects, many=True).data)
+        index = {
+            field: MappingProxyType({str(getattr(obj, field)): obj for obj in objects})
+            for field in self.lookups
+        }
+        return Snapshot(version=version, objects=objects, data=data, index=MappingProxyType(index))
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if the version moved on."""
+        # The version is read before the rows, so a change committed while
+        # loading leaves the snapshot stale for one read at most.
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._snapshot = self._load(version)
+        return snapshot
+
+    def get(self, value, field='pk'):
+        """Return the catalog entry whose ``field`` is ``value``, or None."""
+        return self.snapshot().get(value, field)
+
+
+APPLICATION_TYPES = Catalog(
+    'application-types', 'applications.ApplicationType',
+    serializer='applications.serializers.ApplicationTypeSerializer',
+    filters={'is_active': True}, lookups=('pk', 'slug', 'code'),
+)
+DOCUMENT_TYPES = Catalog(
+    'document-types', 'documents.DocumentType',
+    serializer='documents.serializers.DocumentTypeSerializer',
+    filters={'is_active': True}, lookups=('pk', 'code'),
+)
+ROLES = Catalog('roles', 'accounts.Role', lookups=('pk', 'code'))
+
+
+class CatalogPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """``PrimaryKeyRelatedField`` resolved from a catalog snapshot instead of a query."""
+
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        # Only used for the browsable API's choices; validation uses the snapshot.
+        kwargs.setdefault('queryset', catalog.queryset())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = self.catalog.get(data)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class CatalogViewSet(ConditionalGetMixin, viewsets.GenericViewSet):
+    """
+    Read-only list/retrieve of a catalog's serialized snapshot.
+
+    ETags and Last-Modified come from the catalog version, so neither a
+    fresh response nor a 304 touches the database.
+    """
+    catalog = None
+
+    def get_snapshot(self):
+        # One snapshot per request, so the validators and the body agree.
+        if not hasattr(self, '_snapshot'):
+            self._snapshot = self.catalog.snapshot()
+        return self._snapshot
+
+    def get_version(self):
+        snapshot = self.get_snapshot()
+        return snapshot.version, snapshot.changed_at
+
+    def get_queryset(self):
+        return self.catalog.queryset()
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self._list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(self._retrieve, request, *args, **kwargs)
+
+    def _list(self, request, *args, **kwargs):
+        rows = list(self.get_snapshot().data)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(rows)
+
+    def _retrieve(self, request, *args, **kwargs):
+        snapshot = self.get_snapshot()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = snapshot.get(self.kwargs[lookup_url_kwarg], self.lookup_field)
+        if obj is None:
+            raise Http404
+        return Response(snapshot.data[snapshot.objects.index(obj)])
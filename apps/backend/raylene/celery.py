@@ -3,6 +3,7 @@ Celery configuration for Raylene Immigration Solutions.
 """
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'raylene.settings')
@@ -16,6 +17,26 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Periodic tasks (run with `celery -A raylene beat`).
+app.conf.beat_schedule = {
+    'maintain-audit-partitions': {
+        'task': 'accounts.tasks.maintain_audit_partitions',
+        'schedule': crontab(hour=2, minute=15),
+    },
+    'purge-revoked-tokens': {
+        'task': 'accounts.tasks.purge_revoked_tokens',
+        'schedule': crontab(minute=40),
+    },
+    'rollup-status-durations': {
+        'task': 'applications.tasks.rollup_status_durations',
+        'schedule': crontab(minute='*/15'),
+    },
+    'schedule-task-reminders': {
+        'task': 'applications.tasks.schedule_task_reminders',
+        'schedule': crontab(minute='*/5'),
+    },
+}
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
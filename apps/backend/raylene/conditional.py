@@ -0,0 +1,128 @@
+"""
+Conditional GET (ETag / Last-Modified) for viewsets.
+
+``ConditionalGetMixin`` answers ``retrieve`` and ``list`` with
+``304 Not Modified`` when the client's copy is current.
+
+For ``retrieve`` the validator comes from one narrow query on
+``last_modified_field`` (plus ``get_version_annotations()`` for nested
+data), before the object is loaded or serialized::
+
+    class DocumentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+        last_modified_field = 'updated_at'
+
+For a keyset-paginated ``list`` the ETag comes from the keys of the page
+just fetched (``get_page_version()``: each row's id and
+``last_modified_field``) plus whether a next page exists and any requested
+count, so a 304 is returned before the page is serialized and no COUNT/MAX
+over the whole filtered queryset is run. Other lists fall back to a hash of
+the serialized body, which saves only the transfer.
+
+Access rules must live in ``get_queryset()``: the validator query does not
+run object permission checks. Changes to related rows that are not part of
+the version (for example a user's email shown in a detail body) do not
+change the ``retrieve`` or keyset ``list`` ETag.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .pagination import KeysetPagination
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified validators and 304 responses for list and retrieve."""
+
+    # Model field updated on every change of the row.
+    last_modified_field = 'updated_at'
+
+    def get_version_annotations(self):
+        """
+        Extra ``{name: expression}`` folded into the validator of ``retrieve``.
+
+        Override to cover nested data, e.g. subqueries for the latest
+        timestamp and the number of related rows.
+        """
+        return {}
+
+    def get_version(self):
+        """
+        Return the validator values of the current ``retrieve``, or None.
+
+        None (no such object) falls through to the normal 404 handling.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        annotations = self.get_version_annotations()
+        return (
+            self.filter_queryset(self.get_queryset()).order_by().prefetch_related(None)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .annotate(**annotations)
+            .values_list(self.last_modified_field, *annotations)
+            .first()
+        )
+
+    def _etag(self, request, version):
+        digest = hashlib.md5(repr((
+            version, request.get_full_path(), request.accepted_renderer.format,
+        )).encode(), usedforsecurity=False).hexdigest()
+        return 'W/' + quote_etag(digest)
+
+    def _validated(self, response, etag, last_modified=None):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Revalidate every time instead of heuristic caching on Last-Modified.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        version = self.get_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+
+        timestamps = [value for value in version if hasattr(value, 'timestamp')]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        etag = self._etag(request, version)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self._validated(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def get_page_version(self, page):
+        """
+        Return the validator values of a keyset ``page`` of rows.
+
+        Override to add the timestamps of nested data the list serializer
+        includes.
+        """
+        return [(obj.pk, getattr(obj, self.last_modified_field)) for obj in page]
+
+    def list(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().list(request, *args, **kwargs)
+        if not isinstance(self.paginator, KeysetPagination):
+            return self._list_by_body(request, *args, **kwargs)
+
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        paginator = self.paginator
+        etag = self._etag(request, (self.get_page_version(page), paginator.has_next, paginator.count))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return self._validated(response, etag)
+
+    def _list_by_body(self, request, *args, **kwargs):
+        # Fallback: the page as serialized covers its rows, nested data and counts.
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        etag = self._etag(request, response.data)
+        return self._validated(get_conditional_response(request, etag=etag, response=response), etag)
@@ -3,12 +3,20 @@ Custom exception handlers for DRF.
 """
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
+from rest_framework.exceptions import APIException
 from rest_framework import status
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class ConflictError(APIException):
+    """The resource changed since the client read it (HTTP 409)."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The resource was modified by another request.'
+    default_code = 'conflict'
+
+
 def custom_exception_handler(exc, context):
     """
     Custom exception handler that returns consistent error responses.
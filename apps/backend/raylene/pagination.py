@@ -0,0 +1,229 @@
+"""
+Shared pagination classes.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` on PostgreSQL.
+
+    Returns None on backends without a cheap estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Django paginator that uses the planner estimate instead of COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        return estimate if estimate is not None else super().count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on ``(ordering field, id)``.
+
+    Each page is a single indexed range scan starting after the last row of
+    the previous page, so page N costs the same as page 1 and no COUNT(*) is
+    issued. The cursor is an opaque token holding that last position. The
+    ordering field may be nullable: NULLs sort last ascending and first
+    descending, matching PostgreSQL's index order.
+
+    The ordering field is the view's ``keyset_ordering``, else the first
+    field chosen by the view's ``OrderingFilter`` (``?ordering=``), else
+    ``ordering``. Subclasses that set ``count_query_param`` return a total
+    on request: ``?count=estimate`` (the planner estimate on PostgreSQL,
+    exact elsewhere) or ``?count=exact``.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = None
+    ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering field name, prefixed with '-' for descending."""
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering:
+            return ordering
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                fields = backend().get_ordering(request, queryset, view)
+                if fields:
+                    return fields[0]
+        return self.ordering
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_count(self, queryset, request):
+        """Return ``(count, exact)`` as requested, or ``(None, None)``."""
+        mode = request.query_params.get(self.count_query_param) if self.count_query_param else None
+        if mode not in ('estimate', 'exact'):
+            return None, None
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate, False
+        return queryset.count(), True
+
+    def get_field(self, queryset, name):
+        """Return the model field or annotation output field called ``name``."""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(name)
+
+    def order_queryset(self, queryset, field, descending):
+        """Apply the keyset ordering (field then id) to ``queryset``."""
+        model_field = self.get_field(queryset, field)
+        if descending:
+            expr = F(field).desc(nulls_first=True) if model_field.null else F(field).desc()
+            return queryset.order_by(expr, '-pk')
+        expr = F(field).asc(nulls_last=True) if model_field.null else F(field).asc()
+        return queryset.order_by(expr, 'pk')
+
+    def position_filter(self, field, descending, value, pk):
+        """Return a Q selecting rows strictly after ``(value, pk)``."""
+        after, bound = ('lt', 'lte') if descending else ('gt', 'gte')
+        pk_after = Q(**{f'pk__{after}': pk})
+        if value is None:
+            if descending:
+                # NULLs come first: remaining NULLs, then every non-NULL row.
+                return (Q(**{f'{field}__isnull': True}) & pk_after) | Q(**{f'{field}__isnull': False})
+            return Q(**{f'{field}__isnull': True}) & pk_after
+        # The leading inclusive bound lets the database start an index range
+        # scan at ``value`` instead of evaluating the OR for every row.
+        position = Q(**{f'{field}__{bound}': value}) & (Q(**{f'{field}__{after}': value}) | pk_after)
+        if not descending:
+            position |= Q(**{f'{field}__isnull': True})
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(request, queryset, view)
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+        model_field = self.get_field(queryset, self.field)
+        self.count, self.count_exact = self.get_count(queryset, request)
+
+        queryset = self.order_queryset(queryset, self.field, self.descending)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            try:
+                value = model_field.to_python(cursor['v']) if cursor['v'] is not None else None
+                pk = queryset.model._meta.pk.to_python(cursor['id'])
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self.position_filter(self.field, self.descending, value, pk))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_position = self.position_of(rows[-1]) if rows else None
+        return rows
+
+    def position_of(self, obj):
+        value = getattr(obj, self.field)
+        return {'v': value.isoformat() if hasattr(value, 'isoformat') else value, 'id': str(obj.pk)}
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if not isinstance(cursor, dict) or 'id' not in cursor or 'v' not in cursor:
+                raise ValueError
+            return cursor
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        token = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position)
+
+    def get_paginated_response(self, data):
+        payload = {'next': self.get_next_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_exact'] = self.count_exact
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        properties = {
+            'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'results': schema,
+        }
+        if self.count_query_param:
+            properties['count'] = {'type': 'integer', 'nullable': True}
+            properties['count_exact'] = {'type': 'boolean', 'nullable': True}
+        return {'type': 'object', 'properties': properties}
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Opaque cursor from the previous page\'s next link.',
+             'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f'Results per page (max {self.max_page_size}).',
+             'schema': {'type': 'integer'}},
+        ]
+        if self.count_query_param:
+            parameters.append(
+                {'name': self.count_query_param, 'required': False, 'in': 'query',
+                 'description': 'Include a total: "estimate" or "exact".',
+                 'schema': {'type': 'string', 'enum': ['estimate', 'exact']}}
+            )
+        return parameters
+
+
+class CountedKeysetPagination(KeysetPagination):
+    """Keyset pagination with optional ``?count=estimate|exact`` totals."""
+
+    count_query_param = 'count'
@@ -0,0 +1,56 @@
+"""
+Per-endpoint database query budgets.
+
+Views declare how many queries each action may run::
+
+    class ApplicationViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
+        query_budget = {'list': 2, 'retrieve': 3}
+
+Every request is counted. Going over budget logs a warning, and
+``manage.py check_query_budgets`` fails when any budget is exceeded on
+seeded data, so an N+1 regression shows up before it reaches production.
+The count and budget are left on the response as ``query_count`` and
+``query_budget``.
+"""
+import logging
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """Count the queries of each request against ``query_budget[action]``."""
+
+    # Action name -> maximum queries. APIViews without actions use the
+    # lower-cased HTTP method ('get', 'post', ...).
+    query_budget = {}
+
+    def get_query_budget(self):
+        action = getattr(self, 'action', None) or self.request.method.lower()
+        return self.query_budget.get(action)
+
+    def dispatch(self, request, *args, **kwargs):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        budget = self.get_query_budget()
+        response.query_count = counter.count
+        response.query_budget = budget
+        if budget is not None and counter.count > budget and response.status_code < 400:
+            logger.warning(
+                'Query budget exceeded: %s %s ran %d queries (budget %d)',
+                request.method, request.path, counter.count, budget,
+            )
+        return response
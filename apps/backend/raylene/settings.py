@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'billing',
     'communications',
     'content',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
@@ -160,7 +161,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -180,8 +181,10 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # Rotated refresh tokens are revoked by accounts.revocation (cache-backed, no DB)
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # last_login is written behind by accounts.touch (see TOUCH_FLUSH_INTERVAL)
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -189,8 +192,25 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_HTTP_ONLY': True,
     'AUTH_COOKIE_SECURE': not DEBUG,
     'AUTH_COOKIE_SAMESITE': 'Lax',
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.ClaimsTokenRefreshSerializer',
 }
 
+# Seconds between write-behind flushes of last_login style touches (0 = write through)
+TOUCH_FLUSH_INTERVAL = config('TOUCH_FLUSH_INTERVAL', default=30, cast=int)
+
+# Hand committed audit batches to a Celery worker instead of inserting inline
+AUDIT_LOG_ASYNC = config('AUDIT_LOG_ASYNC', default=False, cast=bool)
+
+# Audit log months kept in the hot table before being archived to NDJSON
+AUDIT_RETENTION_MONTHS = config('AUDIT_RETENTION_MONTHS', default=12, cast=int)
+AUDIT_ARCHIVE_DIR = config('AUDIT_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'audit_logs'))
+
+# Secrets for encrypted model fields (comma-separated, newest first; older keys only decrypt)
+FIELD_ENCRYPTION_KEYS = config('FIELD_ENCRYPTION_KEYS', default=SECRET_KEY, cast=lambda v: [s.strip() for s in str(v).split(',') if s.strip()])
+# Secret for keyed-HMAC blind indexes of encrypted fields (changing it requires a reindex)
+BLIND_INDEX_KEY = config('BLIND_INDEX_KEY', default=SECRET_KEY)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -222,6 +242,27 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache Configuration
+# Shared between workers so per-user role versions and other invalidation
+# stamps are seen by every process. Local memory is used in development.
+USE_REDIS_CACHE = config('USE_REDIS_CACHE', default=not DEBUG, cast=bool)
+
+if USE_REDIS_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_URL', default=config('REDIS_URL', default='redis://localhost:6379/1')),
+            'KEY_PREFIX': 'raylene',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'raylene',
+        }
+    }
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='')
@@ -268,6 +309,10 @@ TWILIO_PHONE_NUMBER = config('TWILIO_PHONE_NUMBER', default='')
 
 # Frontend URL
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+# Link emailed to imported clients; {uid} and {token} are posted to /api/auth/set-password/
+SET_PASSWORD_URL = config('SET_PASSWORD_URL', default=FRONTEND_URL + '/set-password/{uid}/{token}')
+# Processes hashing passwords for client imports made through the API
+IMPORT_HASH_WORKERS = config('IMPORT_HASH_WORKERS', default=2, cast=int)
 
 # Security Settings
 SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=False, cast=bool)
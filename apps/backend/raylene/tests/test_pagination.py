@@ -0,0 +1,80 @@
+"""
+Keyset pagination, exercised through the application list.
+"""
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from applications.models import Application
+
+
+@pytest.fixture
+def applications(client_user, application_type):
+    now = timezone.now()
+    # Pairs share a created_at, so pages must break ties on id.
+    return [
+        Application.objects.create(client=client_user, application_type=application_type,
+                                   created_at=now - datetime.timedelta(minutes=n // 2))
+        for n in range(9)
+    ]
+
+
+def walk(api, url):
+    seen, pages = [], 0
+    while url:
+        response = api.get(url)
+        assert response.status_code == 200, response.data
+        seen += [row['id'] for row in response.data['results']]
+        url = response.data['next']
+        pages += 1
+    return seen, pages
+
+
+@pytest.mark.django_db
+def test_pages_cover_every_row_once_in_order(api, client_user, applications):
+    api.force_authenticate(client_user)
+    seen, pages = walk(api, '/api/applications/?page_size=2')
+
+    expected = Application.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+    assert seen == [str(pk) for pk in expected]
+    assert pages == 5
+
+
+@pytest.mark.django_db
+def test_ascending_ordering_and_nullable_fields(api, client_user, applications):
+    Application.objects.filter(pk__in=[a.pk for a in applications[:4]]).update(submitted_at=timezone.now())
+    api.force_authenticate(client_user)
+
+    seen, _ = walk(api, '/api/applications/?page_size=4&ordering=submitted_at')
+
+    assert sorted(seen) == sorted(str(a.pk) for a in applications)
+    # NULLs sort last ascending.
+    assert set(seen[:4]) == {str(a.pk) for a in applications[:4]}
+
+
+@pytest.mark.django_db
+def test_rows_inserted_behind_the_cursor_do_not_shift_pages(api, client_user, application_type, applications):
+    api.force_authenticate(client_user)
+    first = api.get('/api/applications/?page_size=3')
+    Application.objects.create(client=client_user, application_type=application_type)
+
+    second = api.get(first.data['next'])
+
+    assert not {row['id'] for row in first.data['results']} & {row['id'] for row in second.data['results']}
+    assert len(second.data['results']) == 3
+
+
+@pytest.mark.django_db
+def test_counts_only_on_request(api, client_user, applications):
+    api.force_authenticate(client_user)
+    assert 'count' not in api.get('/api/applications/').data
+    response = api.get('/api/applications/?count=exact&page_size=2')
+    assert (response.data['count'], response.data['count_exact']) == (9, True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', ['garbage', 'eyJ2IjoxfQ', 'eyJ2IjoieCIsImlkIjoieSJ9'])
+def test_invalid_cursor_is_not_found(api, client_user, applications, cursor):
+    api.force_authenticate(client_user)
+    assert api.get(f'/api/applications/?cursor={cursor}').status_code == 404
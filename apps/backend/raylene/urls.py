@@ -27,6 +27,7 @@ urlpatterns = [
     path('api/auth/', include('accounts.urls')),
     path('api/me/', include('accounts.urls')),
     path('api/applications/', include('applications.urls')),
+    path('api/documents/', include('documents.urls')),
     path('api/bookings/', include('bookings.urls')),
     path('api/billing/', include('billing.urls')),
     path('api/communications/', include('communications.urls')),